@@ -3,12 +3,15 @@ from django.contrib import admin
 
 # Local imports
 from .models import (
+    BookedSeat,
     BookedShowDetail,
     Booking,
+    IdempotencyKey,
     Movie,
     Screen,
     ScreenSeatTypesMapping,
     Seat,
+    SeatHold,
     ShowDetail,
     ShowSeatPrice,
 )
@@ -23,3 +26,6 @@ admin.site.register(ShowDetail)
 admin.site.register(ShowSeatPrice)
 admin.site.register(Booking)
 admin.site.register(BookedShowDetail)
+admin.site.register(BookedSeat)
+admin.site.register(SeatHold)
+admin.site.register(IdempotencyKey)
@@ -5,3 +5,11 @@ from django.apps import AppConfig
 class MovieConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "movie"
+
+    def ready(self) -> None:
+        # Local imports
+        from . import catalog_cache, seat_events, signals  # noqa: F401
+        from .seat_index import seat_index
+
+        seat_index.add_listener(seat_events.seats_changed)
+        seat_index.add_listener(catalog_cache.seats_changed)
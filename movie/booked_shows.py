@@ -0,0 +1,91 @@
+# Python imports
+from datetime import date, timedelta
+from typing import List, Optional
+
+# Django imports
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+# Local imports
+from .catalog_cache import SURROGATE_KEYS, object_key, table_changed
+from .models import BookedShowDetail, ShowDetail
+from .show_catalog import refresh_show_catalog
+
+
+def show_dates(show_detail: ShowDetail, date_from: date, date_to: date) -> List[date]:
+    # the dates the show runs on within the range
+    first = max(show_detail.start_date, date_from)
+    last = min(show_detail.end_date, date_to)
+    return [first + timedelta(days=day) for day in range((last - first).days + 1)]
+
+
+def materialize_booked_shows(
+    show_detail: ShowDetail, date_from: date, date_to: date
+) -> int:
+    """
+    Creates the booked shows of the dates of the show within the range that do
+    not exist yet, in one statement. A date created meanwhile by another
+    request is skipped by the unique constraint instead of failing.
+    """
+    existing = BookedShowDetail.objects.filter(
+        show_detail=show_detail, show_date__range=(date_from, date_to)
+    ).values_list("show_date", flat=True)
+    dates = sorted(set(show_dates(show_detail, date_from, date_to)) - set(existing))
+    if not dates:
+        return 0
+
+    booked_shows = [
+        BookedShowDetail(
+            show_detail=show_detail,
+            show_date=show_date,
+            available_seats=show_detail.available_seats,
+        )
+        for show_date in dates
+    ]
+    with transaction.atomic():
+        BookedShowDetail.objects.bulk_create(booked_shows, ignore_conflicts=True)
+        # bulk_create sends no post_save, the cached responses of the show are
+        # invalidated as the signal would
+        table_changed(
+            BookedShowDetail,
+            [SURROGATE_KEYS[BookedShowDetail], object_key(booked_shows[0])],
+        )
+        refresh_show_catalog([show_detail.id], dates)
+    return len(dates)
+
+
+def materialize_window(show_detail: ShowDetail, days: Optional[int] = None) -> int:
+    """
+    Creates the booked shows of the dates of the show from today on, for
+    BOOKED_SHOW_WINDOW_DAYS days unless told otherwise
+    """
+    if days is None:
+        days = settings.BOOKED_SHOW_WINDOW_DAYS
+    if days <= 0:
+        return 0
+    first = timezone.localdate()
+    return materialize_booked_shows(
+        show_detail, first, first + timedelta(days=days - 1)
+    )
+
+
+def get_booked_show(
+    show_detail: ShowDetail, show_date: date
+) -> Optional[BookedShowDetail]:
+    """
+    Returns the booked show of a date of the show, created on its first
+    booking or lookup, or None when the show does not run on that date
+    """
+    if not show_detail.start_date <= show_date <= show_detail.end_date:
+        return None
+
+    booked_shows = BookedShowDetail.objects.filter(
+        show_detail=show_detail, show_date=show_date
+    )
+    booked_show = booked_shows.first()
+    if booked_show is None:
+        materialize_booked_shows(show_detail, show_date, show_date)
+        booked_show = booked_shows.get()
+    booked_show.show_detail = show_detail
+    return booked_show
@@ -0,0 +1,130 @@
+# Python imports
+from contextlib import nullcontext
+from typing import List, Optional
+
+# Django imports
+from django.conf import settings
+from django.db import connection, transaction
+
+# Local imports
+from .models import (
+    BookedSeat,
+    BookedShowDetail,
+    Booking,
+    ScreenSeatTypesMapping,
+    Seat,
+    SeatType,
+    ShowCatalog,
+    ShowDetail,
+)
+from .seat_index import seat_index
+
+# Checks the show date and the seats, decrements the counter and the catalog
+# row and inserts the booking, its ledger rows and its seat rows in one
+# statement. It returns no
+# row when a check fails and raises IntegrityError when a seat is taken.
+BOOK_SEATS_SQL = """
+WITH show AS (
+    SELECT booked_show.id, show_detail.id AS show_detail_id, show_detail.screen_id
+    FROM {booked_show} booked_show
+    JOIN {show_detail} show_detail ON show_detail.id = booked_show.show_detail_id
+    WHERE booked_show.id = %(booked_show_id)s
+        AND NOT show_detail.flash_sale
+        AND booked_show.show_date
+            BETWEEN show_detail.start_date AND show_detail.end_date
+        AND (
+            SELECT count(*)
+            FROM {seat} seat
+            JOIN {seat_type} seat_type ON seat_type.id = seat.type_id
+            WHERE seat.id = ANY(%(seat_ids)s)
+                AND seat_type.screen_id = show_detail.screen_id
+        ) = %(total_seat)s
+),
+counter AS (
+    UPDATE {booked_show} booked_show
+    SET available_seats = booked_show.available_seats - %(total_seat)s
+    FROM show
+    WHERE booked_show.id = show.id
+        AND booked_show.available_seats >= %(total_seat)s
+    RETURNING show.id, show.show_detail_id, show.screen_id
+),
+seat_types AS (
+    SELECT
+        count(*) FILTER (WHERE seat_type.seat_type = %(platinum)s) AS platinum,
+        count(*) FILTER (WHERE seat_type.seat_type = %(gold)s) AS gold,
+        count(*) FILTER (WHERE seat_type.seat_type = %(silver)s) AS silver
+    FROM {seat} seat
+    JOIN {seat_type} seat_type ON seat_type.id = seat.type_id
+    WHERE seat.id = ANY(%(seat_ids)s)
+),
+catalog AS (
+    UPDATE {catalog} catalog
+    SET available_seats = catalog.available_seats - %(total_seat)s,
+        platinum_seats = catalog.platinum_seats - seat_types.platinum,
+        gold_seats = catalog.gold_seats - seat_types.gold,
+        silver_seats = catalog.silver_seats - seat_types.silver
+    FROM counter, seat_types
+    WHERE catalog.booked_show_id = counter.id
+),
+booking AS (
+    INSERT INTO {booking} (user_id, showtime_id, booked_show_id)
+    SELECT %(user_id)s, show_detail_id, id FROM counter
+    RETURNING id, booked_show_id
+),
+ledger AS (
+    INSERT INTO {booked_seat} (booked_show_id, seat_id, booking_id)
+    SELECT booking.booked_show_id, seat_id, booking.id
+    FROM booking CROSS JOIN unnest(%(seat_ids)s::bigint[]) AS seat_id
+    RETURNING booking_id, seat_id
+),
+seats AS (
+    INSERT INTO {booking_seats} (booking_id, seat_id)
+    SELECT booking_id, seat_id FROM ledger
+)
+SELECT booking.id, counter.screen_id FROM booking, counter
+"""
+
+
+def booking_sql_enabled() -> bool:
+    return settings.BOOKING_SQL_FAST_PATH and connection.vendor == "postgresql"
+
+
+def book_seats_sql(
+    user_id: int, booked_show_id: int, seat_ids: List[int]
+) -> Optional[int]:
+    """
+    Books the seats in one round trip and returns the booking id, or None when
+    the show, the show date, the seats or the seat counter do not allow it
+    """
+    sql = BOOK_SEATS_SQL.format(
+        booked_show=BookedShowDetail._meta.db_table,
+        show_detail=ShowDetail._meta.db_table,
+        seat=Seat._meta.db_table,
+        seat_type=ScreenSeatTypesMapping._meta.db_table,
+        booking=Booking._meta.db_table,
+        booked_seat=BookedSeat._meta.db_table,
+        booking_seats=Booking.seats.through._meta.db_table,
+        catalog=ShowCatalog._meta.db_table,
+    )
+    params = {
+        "booked_show_id": booked_show_id,
+        "user_id": user_id,
+        "seat_ids": seat_ids,
+        "total_seat": len(seat_ids),
+        "platinum": SeatType.PLATINUM.value,
+        "gold": SeatType.GOLD.value,
+        "silver": SeatType.SILVER.value,
+    }
+
+    # the statement commits on its own, a savepoint is needed only to keep an
+    # outer transaction usable after a conflict
+    savepoint = transaction.atomic() if connection.in_atomic_block else nullcontext()
+    with savepoint, connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        row = cursor.fetchone()
+    if row is None:
+        return None
+
+    booking_id, screen_id = row
+    transaction.on_commit(lambda: seat_index.book(booked_show_id, seat_ids, screen_id))
+    return booking_id
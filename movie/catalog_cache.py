@@ -0,0 +1,274 @@
+# Python imports
+import hashlib
+import logging
+import threading
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Set, Type
+
+# Django imports
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Now
+from django.utils import timezone
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+# External imports
+from rest_framework.response import Response
+
+# Local imports
+from .models import (
+    BookedSeat,
+    BookedShowDetail,
+    Movie,
+    Screen,
+    ScreenSeatTypesMapping,
+    ShowDetail,
+    ShowSeatPrice,
+    TableVersion,
+)
+
+logger = logging.getLogger(__name__)
+
+# the surrogate key of the responses built from each catalog table
+SURROGATE_KEYS: Dict[Type[models.Model], str] = {
+    Movie: "movie",
+    Screen: "screen",
+    ScreenSeatTypesMapping: "screen",
+    ShowDetail: "show",
+    ShowSeatPrice: "show",
+    BookedShowDetail: "show",
+    BookedSeat: "show",
+}
+# the field naming the object a row belongs to, when it is not the row itself
+OBJECT_FIELDS: Dict[Type[models.Model], str] = {
+    ScreenSeatTypesMapping: "screen_id",
+    ShowSeatPrice: "show_detail_id",
+    BookedShowDetail: "show_detail_id",
+}
+# the tables written by every booking of every show, their versions are
+# bumped at most once in a while instead of on every write
+COALESCED_TABLES = {BookedSeat._meta.db_table}
+PURGE_TIMEOUT = 5
+
+_pending = threading.local()
+
+
+def object_key(instance: models.Model) -> str:
+    model = type(instance)
+    object_id = getattr(instance, OBJECT_FIELDS.get(model, "pk"))
+    return f"{SURROGATE_KEYS[model]}:{object_id}"
+
+
+def table_changed(model: Type[models.Model], keys: Iterable[str]) -> None:
+    """
+    Bumps the version of the table and purges the surrogate keys once the
+    transaction commits, every write of a transaction is counted once
+    """
+    changes = getattr(_pending, "changes", None)
+    if changes is None:
+        changes = _pending.changes = defaultdict(set)
+    changes[model._meta.db_table].update(keys)
+    # the changes of a rolled back transaction are flushed with the next one,
+    # which only invalidates more than needed
+    transaction.on_commit(flush_table_changes)
+
+
+def flush_table_changes() -> None:
+    changes: Optional[Dict[str, Set[str]]] = getattr(_pending, "changes", None)
+    if not changes:
+        return
+    _pending.changes = None
+    bump_table_versions(changes)
+    purge_surrogate_keys(set().union(*changes.values()))
+
+
+def bump_table_versions(tables: Iterable[str]) -> None:
+    # bumped after the commit, a response read meanwhile pairs the new rows
+    # with the old version and is only sent again in full
+    tables = sorted(tables)
+    now = timezone.now()
+    coalesced = [table for table in tables if table in COALESCED_TABLES]
+    tables = [table for table in tables if table not in COALESCED_TABLES]
+    if coalesced:
+        bump_coalesced_versions(coalesced, now)
+    if not tables:
+        return
+    updated = TableVersion.objects.filter(table__in=tables).update(
+        version=F("version") + 1, updated_at=now
+    )
+    if updated < len(tables):
+        TableVersion.objects.bulk_create(
+            [TableVersion(table=table, version=1, updated_at=now) for table in tables],
+            ignore_conflicts=True,
+        )
+
+
+def bump_coalesced_versions(tables: List[str], now: datetime) -> None:
+    """
+    Bumps the versions of tables written by every booking at most once per
+    CATALOG_SEAT_VERSION_SECONDS, on the clock of the database. A write
+    within that time of the last bump is covered by catalog_cache, which
+    answers no 304 until the time has passed.
+    """
+    interval = timedelta(seconds=settings.CATALOG_SEAT_VERSION_SECONDS)
+    # a recent row is skipped without waiting for the lock of its bump
+    updated = TableVersion.objects.filter(
+        table__in=tables, updated_at__lte=Now() - interval
+    ).update(version=F("version") + 1, updated_at=Now())
+    if updated < len(tables):
+        TableVersion.objects.bulk_create(
+            [TableVersion(table=table, version=1, updated_at=now) for table in tables],
+            ignore_conflicts=True,
+        )
+
+
+def seats_changed(
+    booked_show_id: int, seat_ids: List[int], screen_id: int, booked: bool
+) -> None:
+    # the free seats of the show list follow the seat ledger
+    table_changed(BookedSeat, [SURROGATE_KEYS[BookedSeat]])
+
+
+def catalog_cache(
+    *tables: Type[models.Model], etag_func: Optional[Callable] = None
+) -> Callable:
+    """
+    Answers a GET of the view with 304 when its If-None-Match or
+    If-Modified-Since header still matches the versions of the given tables,
+    and marks its responses for a caching proxy
+
+    A list response carries the surrogate keys of the tables, a detail response
+    the key of its object in place of the key of the first table. `etag_func`
+    returns what else the response depends on for a request.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs) -> Response:
+            # the versions are read before the rows, never after
+            versions = sorted(
+                TableVersion.objects.filter(
+                    table__in=[model._meta.db_table for model in tables]
+                )
+                .annotate(now=Now())
+                .values_list("table", "version", "updated_at", "now")
+            )
+            # a table bumped moments ago may have writes its version does not
+            # count yet, its responses are identified by the time instead
+            interval = timedelta(seconds=settings.CATALOG_SEAT_VERSION_SECONDS)
+            versions = [
+                (table, version, updated_at)
+                if table not in COALESCED_TABLES or updated_at <= now - interval
+                else (table, f"{version}@{now.timestamp()}", now)
+                for table, version, updated_at, now in versions
+            ]
+
+            keys = [SURROGATE_KEYS[model] for model in tables]
+            if "pk" in kwargs:
+                keys[0] = f"{keys[0]}:{kwargs['pk']}"
+
+            etag = quote_etag(
+                hashlib.sha256(
+                    "\n".join(
+                        [
+                            request.get_full_path(),
+                            request.accepted_renderer.media_type,
+                            etag_func(request) if etag_func else "",
+                            ",".join(
+                                f"{table}.{version}" for table, version, _ in versions
+                            ),
+                        ]
+                    ).encode()
+                ).hexdigest()[:32]
+            )
+            last_modified = max(
+                (updated_at.timestamp() for _, _, updated_at in versions),
+                default=None,
+            )
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view(self, request, *args, **kwargs)
+            if response.status_code not in (200, 304):
+                return response
+
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            # clients revalidate every time, the proxy keeps the response until
+            # its surrogate keys are purged
+            patch_cache_control(response, no_cache=True)
+            patch_vary_headers(response, ["Authorization"])
+            response[
+                "Surrogate-Control"
+            ] = f"max-age={settings.CATALOG_SURROGATE_MAX_AGE}"
+            response["Surrogate-Key"] = " ".join(dict.fromkeys(keys))
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class SurrogateKeyPurger(threading.Thread):
+    """
+    SurrogateKeyPurger: It sends the purged surrogate keys to the caching proxy,
+    keys purged while a request is in flight are sent together with the next one
+    """
+
+    def __init__(self, url: str) -> None:
+        super().__init__(name="surrogate-key-purger", daemon=True)
+        self.url = url
+        self.keys: Set[str] = set()
+        self.condition = threading.Condition()
+
+    def purge(self, keys: Iterable[str]) -> None:
+        with self.condition:
+            self.keys.update(keys)
+            self.condition.notify()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.keys:
+                    self.condition.wait()
+                keys, self.keys = self.keys, set()
+            self.send(keys)
+
+    def send(self, keys: Set[str]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            method="PURGE",
+            headers={"Surrogate-Key": " ".join(sorted(keys))},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=PURGE_TIMEOUT):  # noqa: S310
+                pass
+        except OSError:
+            logger.exception("purging surrogate keys failed")
+
+
+_purger: Optional[SurrogateKeyPurger] = None
+_purger_lock = threading.Lock()
+
+
+def purge_surrogate_keys(keys: Iterable[str]) -> None:
+    global _purger
+    if not settings.SURROGATE_PURGE_URL:
+        return
+    with _purger_lock:
+        if _purger is None or not _purger.is_alive():
+            _purger = SurrogateKeyPurger(settings.SURROGATE_PURGE_URL)
+            _purger.start()
+    _purger.purge(keys)
@@ -0,0 +1,17 @@
+# Python imports
+from datetime import date
+
+
+class DateConverter:
+    """
+    DateConverter: It matches an ISO date such as 2030-12-01 in a url path
+    """
+
+    regex = r"\d{4}-\d{2}-\d{2}"
+
+    def to_python(self, value: str) -> date:
+        # a ValueError makes the url not match, so an invalid date is a 404
+        return date.fromisoformat(value)
+
+    def to_url(self, value: date) -> str:
+        return value.isoformat()
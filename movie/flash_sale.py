@@ -0,0 +1,237 @@
+# Python imports
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+# Django imports
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+# External imports
+from rest_framework import status
+
+# Local imports
+from .models import BookedSeat, BookedShowDetail, Booking
+from .seat_index import seat_index
+from .seat_layout import get_screen_layout
+from .utils import claim_seats, expire_seat_holds, take_seats
+
+
+class SeatsUnavailableError(Exception):
+    """Raised to roll back a batch when the seat counter would go negative"""
+
+
+class FlashSaleBatchError(Exception):
+    """Raised to the requests of a batch that failed, from the error of the batch"""
+
+
+class PendingBooking:
+    """
+    PendingBooking: It stores a booking request waiting in a flash sale queue
+
+    Fields:
+        user (User): It stores user
+        seat_ids (list): It stores the requested seat ids
+        status (int): It stores the HTTP status of the outcome, None while queued
+        booking (Booking): It stores the booking once committed
+        error (Exception): It stores the error of the batch when it failed
+        lead (bool): It stores whether the request has to drain the next batch
+    """
+
+    def __init__(self, user, seat_ids: List[int]) -> None:
+        self.user = user
+        self.seat_ids = seat_ids
+        self.status: Optional[int] = None
+        self.booking: Optional[Booking] = None
+        self.error: Optional[Exception] = None
+        self.lead = False
+        self.event = threading.Event()
+
+
+class FlashSaleQueue:
+    """
+    FlashSaleQueue: It serializes the bookings of one BookedShowDetail.
+
+    The first request to find the queue idle becomes the leader and commits the
+    next batch of queued bookings in one transaction, then hands leadership to
+    the oldest request still queued. A single request drains the queue at any
+    time and no request waits for more than the batches ahead of it.
+
+    A queue is kept while requests are submitted to it, `requests` counts them
+    under the lock of the queues and the last one out removes the queue.
+    """
+
+    def __init__(self, booked_show_id: int, max_batch: int, max_size: int) -> None:
+        self.booked_show_id = booked_show_id
+        self.max_batch = max_batch
+        self.max_size = max_size
+        self.requests = 0
+        self._pending: "deque[PendingBooking]" = deque()
+        self._leading = False
+        self._lock = threading.Lock()
+
+    def submit(
+        self, user, booked_show: BookedShowDetail, seat_ids: List[int], timeout: float
+    ) -> PendingBooking:
+        pending = PendingBooking(user, seat_ids)
+        with self._lock:
+            if len(self._pending) >= self.max_size:
+                pending.status = status.HTTP_503_SERVICE_UNAVAILABLE
+                return pending
+            self._pending.append(pending)
+            if not self._leading:
+                self._leading = pending.lead = True
+
+        if not pending.lead and not pending.event.wait(timeout):
+            with self._lock:
+                # give up only while still queued, a taken batch is committed
+                if not pending.lead and pending in self._pending:
+                    self._pending.remove(pending)
+                    pending.status = status.HTTP_503_SERVICE_UNAVAILABLE
+                    return pending
+            pending.event.wait()
+
+        if pending.lead:
+            self.drain(booked_show)
+        if pending.error is not None:
+            raise FlashSaleBatchError(
+                f"The flash sale batch of booked show {self.booked_show_id} failed"
+            ) from pending.error
+        return pending
+
+    def drain(self, booked_show: BookedShowDetail) -> None:
+        with self._lock:
+            batch = [
+                self._pending.popleft()
+                for _ in range(min(self.max_batch, len(self._pending)))
+            ]
+        try:
+            commit_batch(booked_show, batch)
+        except Exception as error:
+            # the requests of the batch are answered with its error, not as busy
+            for pending in batch:
+                if pending.status is None:
+                    pending.status = status.HTTP_500_INTERNAL_SERVER_ERROR
+                    pending.error = error
+            raise
+        finally:
+            for pending in batch:
+                pending.event.set()
+
+            with self._lock:
+                if self._pending:
+                    self._pending[0].lead = True
+                    self._pending[0].event.set()
+                else:
+                    self._leading = False
+
+
+def commit_batch(booked_show: BookedShowDetail, batch: List[PendingBooking]) -> None:
+    screen_id = booked_show.show_detail.screen_id
+    layout = get_screen_layout(screen_id)
+    expire_seat_holds(booked_show.id)
+
+    # settle conflicts inside the batch on the bitmap, first come first served
+    booked = seat_index.get(booked_show.id, screen_id)
+    accepted = []
+    for pending in batch:
+        mask = layout.mask(pending.seat_ids)
+        if booked & mask:
+            pending.status = status.HTTP_409_CONFLICT
+            continue
+        booked |= mask
+        accepted.append(pending)
+    if not accepted:
+        return
+
+    try:
+        with transaction.atomic():
+            bookings = Booking.objects.bulk_create(
+                Booking(
+                    user=pending.user,
+                    showtime=booked_show.show_detail,
+                    booked_show=booked_show,
+                )
+                for pending in accepted
+            )
+            BookedSeat.objects.bulk_create(
+                BookedSeat(booked_show=booked_show, seat_id=seat_id, booking=booking)
+                for pending, booking in zip(accepted, bookings)
+                for seat_id in pending.seat_ids
+            )
+            Booking.seats.through.objects.bulk_create(
+                Booking.seats.through(booking=booking, seat_id=seat_id)
+                for pending, booking in zip(accepted, bookings)
+                for seat_id in pending.seat_ids
+            )
+
+            # one counter update and row lock for the whole batch
+            seat_ids = [seat_id for pending in accepted for seat_id in pending.seat_ids]
+            if not take_seats(booked_show.id, screen_id, seat_ids):
+                raise SeatsUnavailableError()
+    except (IntegrityError, SeatsUnavailableError):
+        # another worker took a seat or the counter drifted, commit one by one
+        seat_index.invalidate(booked_show.id)
+        for pending in accepted:
+            commit_one(booked_show, pending)
+        return
+
+    for pending, booking in zip(accepted, bookings):
+        pending.booking = booking
+        pending.status = status.HTTP_201_CREATED
+    seat_index.book(booked_show.id, seat_ids, screen_id)
+
+
+def commit_one(booked_show: BookedShowDetail, pending: PendingBooking) -> None:
+    try:
+        with transaction.atomic():
+            booking = Booking.objects.create(
+                user=pending.user,
+                showtime=booked_show.show_detail,
+                booked_show=booked_show,
+            )
+            claim_seats(booking, pending.seat_ids)
+            if not take_seats(
+                booked_show.id, booked_show.show_detail.screen_id, pending.seat_ids
+            ):
+                raise SeatsUnavailableError()
+    except IntegrityError:
+        pending.status = status.HTTP_409_CONFLICT
+    except SeatsUnavailableError:
+        pending.status = status.HTTP_400_BAD_REQUEST
+    else:
+        pending.booking = booking
+        pending.status = status.HTTP_201_CREATED
+
+
+_queues: Dict[int, FlashSaleQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def submit_flash_sale(
+    user, booked_show: BookedShowDetail, seat_ids: List[int], timeout: float
+) -> PendingBooking:
+    """
+    Queues the booking with the others of the booked show and waits for its
+    batch. The queue of a show lives as long as requests are submitted to it,
+    so a worker keeps the queues of the shows being booked alone.
+    """
+    with _queues_lock:
+        queue = _queues.get(booked_show.id)
+        if queue is None:
+            queue = _queues[booked_show.id] = FlashSaleQueue(
+                booked_show.id,
+                max_batch=settings.FLASH_SALE_BATCH_SIZE,
+                max_size=settings.FLASH_SALE_QUEUE_SIZE,
+            )
+        queue.requests += 1
+
+    try:
+        return queue.submit(user, booked_show, seat_ids, timeout)
+    finally:
+        with _queues_lock:
+            queue.requests -= 1
+            # every queued request is still submitting, so the last one out
+            # leaves the queue idle and drained
+            if not queue.requests:
+                del _queues[booked_show.id]
@@ -0,0 +1,148 @@
+# Python imports
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+# Django imports
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+# External imports
+from rest_framework import status
+from rest_framework.response import Response
+
+# Local imports
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def idempotent(view: Callable) -> Callable:
+    """
+    Runs a view once per Idempotency-Key header of a user and returns the
+    stored response to every retry of the same request until the key expires
+    """
+
+    @wraps(view)
+    def wrapper(self, request, *args, **kwargs) -> Response:
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(self, request, *args, **kwargs)
+        if not key or len(key) > 255:
+            return Response(
+                {"message": "Idempotency key is invalid"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request)
+        record, created = reserve_idempotency_key(request.user, key, fingerprint)
+        if not created:
+            return replay_response(record, fingerprint)
+
+        # only the holder of the lease stores or releases the key, a retry
+        # that took it over owns it from then on
+        owned = IdempotencyKey.objects.filter(
+            id=record.id, locked_until=record.locked_until
+        )
+        try:
+            response = view(self, request, *args, **kwargs)
+        except Exception:
+            owned.delete()
+            raise
+
+        # server errors are not stored so the retry runs the request again
+        if response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            owned.delete()
+        else:
+            owned.update(
+                status_code=response.status_code,
+                response=response.data,
+                locked_until=None,
+            )
+        return response
+
+    return wrapper
+
+
+def request_fingerprint(request) -> str:
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    payload = "\n".join([request.method, request.get_full_path(), body])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def reserve_idempotency_key(
+    user, key: str, fingerprint: str
+) -> Tuple[Optional[IdempotencyKey], bool]:
+    """
+    Returns the new key of the request and True, or the stored key of an earlier
+    request and False. The stored key is None if it was released meanwhile.
+    The key of a request whose lease passed without a response, left by a
+    crashed worker, is taken over and returned with True.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(hours=settings.IDEMPOTENCY_KEY_HOURS)
+    locked_until = now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=expires_at,
+                    locked_until=locked_until,
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is None:
+                return record, False
+            if record.expires_at <= now:
+                # an expired key can be used again
+                record.delete()
+                continue
+            if (
+                record.status_code is None
+                and record.fingerprint == fingerprint
+                # keys reserved before leases were stored have none
+                and (record.locked_until is None or record.locked_until <= now)
+                and take_over_idempotency_key(record, locked_until)
+            ):
+                return record, True
+            return record, False
+    return record, False
+
+
+def take_over_idempotency_key(record: IdempotencyKey, locked_until) -> bool:
+    # conditional on the stale lease, so one of the racing retries takes it
+    taken = IdempotencyKey.objects.filter(
+        id=record.id, status_code__isnull=True, locked_until=record.locked_until
+    ).update(locked_until=locked_until)
+    if taken:
+        record.locked_until = locked_until
+    return bool(taken)
+
+
+def replay_response(record: Optional[IdempotencyKey], fingerprint: str) -> Response:
+    if record is not None and record.fingerprint != fingerprint:
+        return Response(
+            {"message": "Idempotency key is used by another request"},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if record is None or record.status_code is None:
+        return Response(
+            {"message": "Request with this idempotency key is in progress"},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    response = Response(record.response, status=record.status_code)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def expire_idempotency_keys() -> int:
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,235 @@
+# Python imports
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Django imports
+from django.apps import apps
+from django.db import DatabaseError, transaction
+
+# the statements whose plans can use an index
+EXPLAINED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+# the tables of postgresql and of django itself are not advised on
+SKIPPED_TABLES = re.compile(r"\b(pg_\w+|information_schema|django_migrations)\b")
+IN_LIST = re.compile(r"IN \((?:%s, )*%s\)")
+LIMIT = re.compile(r"\b(LIMIT|OFFSET) \d+")
+LITERAL = re.compile(r"'(?:[^']|'')*'")
+CAST = re.compile(r"::[a-z ]+")
+COMPARISON = re.compile(r"\b([a-z_][a-z0-9_]*)\)?\s*(=|<>|<=|>=|<|>|~~\*?|IS)\s")
+
+INDEX_SQL = """
+SELECT
+    table_class.relname,
+    index_class.relname,
+    idx.indisunique,
+    ARRAY(
+        SELECT attribute.attname
+        FROM unnest(idx.indkey) WITH ORDINALITY AS key(attnum, position)
+        JOIN pg_attribute AS attribute
+            ON attribute.attrelid = idx.indrelid AND attribute.attnum = key.attnum
+        ORDER BY key.position
+    )
+FROM pg_index AS idx
+JOIN pg_class AS index_class ON index_class.oid = idx.indexrelid
+JOIN pg_class AS table_class ON table_class.oid = idx.indrelid
+JOIN pg_am AS am ON am.oid = index_class.relam
+WHERE table_class.relname = ANY(%s)
+    AND am.amname = 'btree'
+    -- expression, partial and pattern_ops indexes answer other lookups
+    AND idx.indexprs IS NULL
+    AND idx.indpred IS NULL
+    AND NOT EXISTS (
+        SELECT 1
+        FROM unnest(idx.indclass) AS class(oid)
+        JOIN pg_opclass AS opclass ON opclass.oid = class.oid
+        WHERE NOT opclass.opcdefault
+    )
+ORDER BY 1, 2
+"""
+
+
+def query_shape(sql: str) -> str:
+    # the statements differing only in the length of an IN list or a limit
+    # have one plan shape
+    return LIMIT.sub(r"\1 ?", IN_LIST.sub("IN (%s)", sql))
+
+
+@dataclass
+class QueryShape:
+    sql: str
+    params: Optional[tuple]
+    calls: int = 0
+
+
+@dataclass
+class MissingIndex:
+    table: str
+    columns: Tuple[str, ...]
+    calls: int = 0
+    shapes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BTreeIndex:
+    table: str
+    name: str
+    unique: bool
+    columns: Tuple[str, ...]
+
+
+@dataclass
+class RedundantIndex:
+    table: str
+    name: str
+    columns: Tuple[str, ...]
+    covered_by: str
+
+
+class QueryShapeRecorder:
+    """
+    QueryShapeRecorder: It records the shape of every statement sent to the
+    database, to be installed with connection.execute_wrapper()
+    """
+
+    def __init__(self) -> None:
+        self.shapes: Dict[str, QueryShape] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().split(" ", 1)[0].upper()
+        if (
+            not many
+            and statement in EXPLAINED_STATEMENTS
+            and not SKIPPED_TABLES.search(sql)
+        ):
+            shape = query_shape(sql)
+            if shape not in self.shapes:
+                self.shapes[shape] = QueryShape(sql=sql, params=params)
+            self.shapes[shape].calls += 1
+        return execute(sql, params, many, context)
+
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def index_columns(*conditions: str) -> Tuple[str, ...]:
+    """
+    Returns the columns of an index answering the conditions, the columns
+    compared for equality first and then a single range, the ranges after it
+    could not bound the scan of the index
+    """
+    comparisons = [
+        comparison
+        for condition in conditions
+        for comparison in COMPARISON.findall(CAST.sub("", LITERAL.sub("''", condition)))
+    ]
+    equal = [column for column, operator in comparisons if operator == "="]
+    ranged = [column for column, operator in comparisons if operator != "="]
+    return tuple(dict.fromkeys(equal + ranged[:1]))
+
+
+def missing_indexes(connection, shapes: Dict[str, QueryShape]) -> List[MissingIndex]:
+    """
+    Explains every shape with sequential scans priced out, so each table is
+    read through an index whenever one can be used at all. A scan still
+    filtering rows by columns its index condition does not cover reads rows
+    an index over those columns would skip, the index is reported with the
+    columns of the condition leading.
+    """
+    indexes = btree_indexes(connection)
+    unique = {index.name for index in indexes if index.unique}
+    missing: Dict[Tuple[str, Tuple[str, ...]], MissingIndex] = {}
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for shape, query in shapes.items():
+            try:
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute(f"EXPLAIN (FORMAT JSON) {query.sql}", query.params)
+                    (plan,) = cursor.fetchone()
+            except DatabaseError:
+                # statements on tables dropped by the tests cannot be explained
+                continue
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            for node in plan_nodes(plan[0]["Plan"]):
+                if "Relation Name" not in node or "Filter" not in node:
+                    continue
+                # a lookup of a unique key reads one row whatever it filters
+                if "Index Cond" in node and node.get("Index Name") in unique:
+                    continue
+                columns = index_columns(node.get("Index Cond", ""), node["Filter"])
+                if set(columns) <= set(index_columns(node.get("Index Cond", ""))):
+                    continue
+                # an index over the columns exists, the planner preferred
+                # another one for the order or the size of the tables
+                if any(
+                    index.table == node["Relation Name"]
+                    and set(index.columns[: len(columns)]) == set(columns)
+                    for index in indexes
+                ):
+                    continue
+                key = (node["Relation Name"], columns)
+                if key not in missing:
+                    missing[key] = MissingIndex(table=key[0], columns=columns)
+                missing[key].calls += query.calls
+                missing[key].shapes.append(shape)
+    return sorted(missing.values(), key=lambda index: -index.calls)
+
+
+def btree_indexes(connection) -> List[BTreeIndex]:
+    tables = sorted(
+        {
+            model._meta.db_table
+            for model in apps.get_models(include_auto_created=True)
+            if model._meta.managed and not model._meta.proxy
+        }
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(INDEX_SQL, [tables])
+        return [
+            BTreeIndex(table, name, unique, tuple(columns))
+            for table, name, unique, columns in cursor.fetchall()
+        ]
+
+
+def redundant_indexes(connection) -> List[RedundantIndex]:
+    """
+    Returns the btree indexes of the models whose lookups another index
+    already answers, either as a leading part of its columns or, for unique
+    ones, as a unique index over part of the same columns
+    """
+    indexes = defaultdict(list)
+    for index in btree_indexes(connection):
+        indexes[index.table].append(index)
+
+    redundant = []
+    for table_indexes in indexes.values():
+        for index in table_indexes:
+            for other in table_indexes:
+                if other.name == index.name:
+                    continue
+                if index.unique:
+                    covered = other.unique and set(other.columns) < set(index.columns)
+                else:
+                    # of two equal indexes the unique one, or else the first,
+                    # is kept
+                    covered = other.columns[: len(index.columns)] == index.columns and (
+                        other.unique
+                        or len(other.columns) > len(index.columns)
+                        or other.name < index.name
+                    )
+                if covered:
+                    redundant.append(
+                        RedundantIndex(
+                            table=index.table,
+                            name=index.name,
+                            columns=index.columns,
+                            covered_by=other.name,
+                        )
+                    )
+                    break
+    return redundant
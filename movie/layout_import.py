@@ -0,0 +1,199 @@
+# Python imports
+import csv
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, NamedTuple, Tuple
+
+# Django imports
+from django.db import connection
+
+# Local imports
+from .models import (
+    LayoutTemplate,
+    LayoutTemplateSeat,
+    Screen,
+    ScreenSeatTypesMapping,
+    Seat,
+    SeatType,
+)
+from .utils import insert_seats, row_label
+
+LAYOUT_FORMATS = ("csv", "jsonl")
+LAYOUT_COLUMNS = ("row", "column", "seat_type")
+MAX_POSITION = 999
+MAX_SEAT_NUMBER = Seat._meta.get_field("seat_number").max_length
+
+# the seats are copied between a screen and a template without leaving the
+# database, whatever the size of the layout
+SAVE_TEMPLATE_SQL = """
+INSERT INTO {template_seat} (template_id, seat_type, seat_number, raw, col)
+SELECT %s, seat_type.seat_type, seat.seat_number, seat.raw, seat.col
+FROM {seat} AS seat
+JOIN {seat_type} AS seat_type ON seat_type.id = seat.type_id
+WHERE seat_type.screen_id = %s
+"""
+CLONE_TEMPLATE_SQL = """
+INSERT INTO {seat} (seat_number, raw, col, type_id)
+SELECT template_seat.seat_number, template_seat.raw, template_seat.col, seat_type.id
+FROM {template_seat} AS template_seat
+JOIN {seat_type} AS seat_type
+    ON seat_type.seat_type = template_seat.seat_type AND seat_type.screen_id = %s
+WHERE template_seat.template_id = %s
+"""
+
+
+class LayoutImportError(Exception):
+    """Raised with the line of a layout file that cannot be imported"""
+
+
+class LayoutSeat(NamedTuple):
+    seat_type: str
+    seat_number: str
+    raw: int
+    col: int
+
+
+def read_layout(lines: Iterable[str], layout_format: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Yields every record of a layout file with its line number, a csv file
+    with a header of row, column, seat_type and an optional seat_number, or
+    a file of one json object per line
+    """
+    if layout_format == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            missing = set(LAYOUT_COLUMNS) - set(reader.fieldnames or [])
+            if missing:
+                raise LayoutImportError(
+                    f"Line 1: missing columns {', '.join(sorted(missing))}"
+                )
+            for record in reader:
+                yield reader.line_num, record
+        except csv.Error as error:
+            raise LayoutImportError(f"Line {reader.line_num}: {error}") from error
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise LayoutImportError(f"Line {line_number}: {error}") from error
+        if not isinstance(record, dict):
+            raise LayoutImportError(f"Line {line_number}: expected an object")
+        yield line_number, record
+
+
+def layout_seat(record: dict) -> LayoutSeat:
+    for column in LAYOUT_COLUMNS:
+        if record.get(column) in (None, ""):
+            raise ValueError(f"{column} is required")
+    raw, col = int(record["row"]), int(record["column"])
+    for name, position in (("row", raw), ("column", col)):
+        if not 1 <= position <= MAX_POSITION:
+            raise ValueError(f"{name} must be between 1 and {MAX_POSITION}")
+    seat_type = str(record["seat_type"]).strip().upper()
+    if seat_type not in SeatType.values or seat_type == SeatType.UNKNOWN:
+        raise ValueError(f"unknown seat type {record['seat_type']}")
+    seat_number = str(record.get("seat_number") or f"{row_label(raw)}{col}").strip()
+    if len(seat_number) > MAX_SEAT_NUMBER:
+        raise ValueError(f"seat number is longer than {MAX_SEAT_NUMBER} characters")
+    if not seat_number.isprintable():
+        raise ValueError("seat number has control characters")
+    return LayoutSeat(seat_type, seat_number, raw, col)
+
+
+def layout_seats(lines: Iterable[str], layout_format: str) -> Iterator[LayoutSeat]:
+    """
+    Validates the seats of a layout file one line at a time, only the
+    positions and seat numbers already read are kept to find repeated ones
+    """
+    positions = set()
+    seat_numbers = set()
+    for line_number, record in read_layout(lines, layout_format):
+        try:
+            seat = layout_seat(record)
+        except (TypeError, ValueError) as error:
+            raise LayoutImportError(f"Line {line_number}: {error}") from error
+        if (seat.raw, seat.col) in positions:
+            raise LayoutImportError(
+                f"Line {line_number}: row {seat.raw} column {seat.col} is given twice"
+            )
+        if seat.seat_number in seat_numbers:
+            raise LayoutImportError(
+                f"Line {line_number}: seat number {seat.seat_number} is given twice"
+            )
+        positions.add((seat.raw, seat.col))
+        seat_numbers.add(seat.seat_number)
+        yield seat
+
+
+def import_screen_layout(
+    screen_number: int, seats: Iterable[LayoutSeat], batch_size: int
+) -> Screen:
+    """
+    Creates the screen with the seats of a layout, inserted a batch at a time
+    while the file is still being read. It is called within a transaction, an
+    invalid line raises after some batches are written.
+    """
+    screen = Screen.objects.create(screen_number=screen_number, total_seat=0)
+    seat_types: Dict[str, int] = {}
+    seats = iter(seats)
+    while batch := list(islice(seats, batch_size)):
+        for seat in batch:
+            if seat.seat_type not in seat_types:
+                seat_types[seat.seat_type] = ScreenSeatTypesMapping.objects.create(
+                    screen=screen, seat_type=seat.seat_type
+                ).id
+        insert_seats(
+            [
+                (seat.seat_number, seat.raw, seat.col, seat_types[seat.seat_type])
+                for seat in batch
+            ]
+        )
+        screen.total_seat += len(batch)
+    if not screen.total_seat:
+        raise LayoutImportError("The layout has no seats")
+
+    screen.save(update_fields=["total_seat"])
+    return screen
+
+
+def save_layout_template(name: str, screen: Screen) -> LayoutTemplate:
+    """
+    Saves the seats of the screen as a named layout template, copied within
+    the database in one statement
+    """
+    template = LayoutTemplate.objects.create(name=name, total_seat=screen.total_seat)
+    copy_seats(SAVE_TEMPLATE_SQL, [template.id, screen.id])
+    return template
+
+
+def clone_layout_template(screen_number: int, template: LayoutTemplate) -> Screen:
+    """
+    Creates the screen with the seats of a layout template, copied within the
+    database in one statement
+    """
+    screen = Screen.objects.create(
+        screen_number=screen_number, total_seat=template.total_seat
+    )
+    seat_types = (
+        template.seats.order_by("seat_type")
+        .values_list("seat_type", flat=True)
+        .distinct()
+    )
+    for seat_type in seat_types:
+        ScreenSeatTypesMapping.objects.create(screen=screen, seat_type=seat_type)
+    copy_seats(CLONE_TEMPLATE_SQL, [screen.id, template.id])
+    return screen
+
+
+def copy_seats(sql: str, params: list) -> None:
+    sql = sql.format(
+        seat=Seat._meta.db_table,
+        seat_type=ScreenSeatTypesMapping._meta.db_table,
+        template_seat=LayoutTemplateSeat._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
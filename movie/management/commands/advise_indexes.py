@@ -0,0 +1,60 @@
+# Django imports
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import get_runner
+
+# App imports
+from movie.index_advisor import (
+    QueryShapeRecorder,
+    missing_indexes,
+    redundant_indexes,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the test suite while recording the shape of every query it sends, "
+        "then explain each shape on the test database and report the filters "
+        "no index answers and the indexes another index already covers. Only "
+        "queries of the main thread are recorded."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("test_labels", nargs="*", default=["movie", "user"])
+
+    def handle(self, *args, **options) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("The index advisor explains queries on postgresql")
+
+        recorder = QueryShapeRecorder()
+        report = {}
+
+        class AdvisorRunner(get_runner(settings)):
+            def teardown_databases(self, old_config, **kwargs) -> None:
+                # advised on the test database, before it is dropped
+                report["missing"] = missing_indexes(connection, recorder.shapes)
+                report["redundant"] = redundant_indexes(connection)
+                super().teardown_databases(old_config, **kwargs)
+
+        runner = AdvisorRunner(verbosity=0, interactive=False)
+        with connection.execute_wrapper(recorder):
+            failures = runner.run_tests(options["test_labels"])
+        if failures:
+            self.stderr.write(f"{failures} tests failed, their queries are included")
+
+        self.stdout.write(f"Recorded {len(recorder.shapes)} query shapes")
+        self.stdout.write("\nFilters without an index:")
+        for index in report["missing"]:
+            self.stdout.write(
+                f"  {index.table} ({', '.join(index.columns)}): "
+                f"{index.calls} calls of {len(index.shapes)} shapes"
+            )
+            for shape in index.shapes[:3]:
+                self.stdout.write(f"    {shape[:200]}")
+        self.stdout.write("\nRedundant indexes:")
+        for index in report["redundant"]:
+            self.stdout.write(
+                f"  {index.table}.{index.name} ({', '.join(index.columns)}) "
+                f"is covered by {index.covered_by}"
+            )
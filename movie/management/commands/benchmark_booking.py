@@ -0,0 +1,126 @@
+# Python imports
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import time as show_time
+
+# Django imports
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+# External imports
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+# App imports
+from movie.models import BookedShowDetail, Movie, ShowDetail
+from movie.utils import create_screen_with_seats
+from movie.views import BookingViewSet
+from user.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark parallel bookings of one show through the direct booking path "
+        "and the flash sale queue. It creates and removes its own user, screen "
+        "and show in the configured database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=32)
+        parser.add_argument("--rows", type=int, default=30)
+        parser.add_argument("--columns", type=int, default=40)
+
+    def handle(self, *args, **options) -> None:
+        for flash_sale in (False, True):
+            result = self.run_benchmark(flash_sale=flash_sale, **options)
+            self.stdout.write(
+                "{mode:<10} {requests} requests, {booked} booked, "
+                "{throughput:.0f} bookings/s, p50 {p50:.1f} ms, p99 {p99:.1f} ms".format(
+                    mode="flash sale" if flash_sale else "direct", **result
+                )
+            )
+
+    def run_benchmark(
+        self,
+        flash_sale: bool,
+        requests: int,
+        workers: int,
+        rows: int,
+        columns: int,
+        **_,
+    ) -> dict:
+        name = uuid.uuid4().hex[:8]
+        user = User.objects.create(username=name, email=f"{name}@benchmark.local")
+        movie = Movie.objects.create(
+            title=name, description=name, release_date=date.today()
+        )
+        screen = create_screen_with_seats(
+            screen_number=0,
+            seat_types=[{"seat_type": "GOLD", "rows": rows, "columns": columns}],
+        )
+        try:
+            show_detail = ShowDetail.objects.create(
+                movie=movie,
+                screen=screen,
+                start_time=show_time(12),
+                end_time=show_time(15),
+                start_date=movie.release_date,
+                end_date=movie.release_date,
+                available_seats=screen.total_seat,
+                flash_sale=flash_sale,
+            )
+            booked_show = BookedShowDetail.objects.create(
+                show_detail=show_detail,
+                show_date=movie.release_date,
+                available_seats=screen.total_seat,
+            )
+            seat_ids = sorted(
+                screen.seat_screen.values_list("seat_type_screen__id", flat=True)
+            )
+            return self.book(user, booked_show, seat_ids, requests, workers)
+        finally:
+            screen.delete()
+            movie.delete()
+            user.delete()
+
+    def book(
+        self, user, booked_show, seat_ids: list, requests: int, workers: int
+    ) -> dict:
+        factory = APIRequestFactory()
+        view = BookingViewSet.as_view({"post": "booking"})
+
+        def book_one(index: int) -> tuple:
+            # pairs of seats, requests past the screen size conflict
+            seats = [
+                seat_ids[(index * 2) % len(seat_ids)],
+                seat_ids[(index * 2 + 1) % len(seat_ids)],
+            ]
+            request = factory.post(
+                f"/api/v1/show/detail/{booked_show.id}/book/",
+                {"seats": seats},
+                format="json",
+            )
+            force_authenticate(request, user=user)
+            try:
+                started = time.perf_counter()
+                response = view(request, show_id=booked_show.id)
+                return response.status_code, time.perf_counter() - started
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(book_one, range(requests)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        booked = sum(1 for status_code, _ in results if status_code == 201)
+        return {
+            "requests": requests,
+            "booked": booked,
+            "throughput": booked / elapsed,
+            "p50": latencies[len(latencies) // 2] * 1000,
+            "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        }
@@ -0,0 +1,93 @@
+# Python imports
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+# App imports
+from movie.models import Screen, ScreenSeatTypesMapping, Seat
+from movie.utils import create_screen_with_seats, row_label
+
+# seats of the layouts, laid out 10 seats to a row
+LAYOUTS = (50, 200, 500, 1000, 2000, 5000)
+SEAT_TYPES = ["SILVER", "GOLD", "PLATINUM"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare creating the seats of a screen one INSERT at a time with the "
+        "single bulk statement of create_screen_with_seats, for layouts of 50 to "
+        "5000 seats. Every screen is rolled back after it is created. The COPY "
+        "of the seats on postgresql is not counted among the queries."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options) -> None:
+        self.stdout.write(f"{'seats':>6} {'mode':<9} {'queries':>8} {'ms':>10}")
+        for seats in LAYOUTS:
+            seat_types = new_seat_types(seats)
+            for mode, create in (
+                ("per seat", create_screen_seat_by_seat),
+                ("bulk", create_screen_with_seats),
+            ):
+                queries, elapsed = self.measure(create, seat_types, options["repeat"])
+                self.stdout.write(
+                    f"{seats:>6} {mode:<9} {queries:>8} {elapsed * 1000:>10.1f}"
+                )
+
+    def measure(self, create, seat_types: list, repeat: int) -> tuple:
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        elapsed = 0.0
+        for _ in range(repeat):
+            queries.clear()
+            with transaction.atomic(), connection.execute_wrapper(count_query):
+                started = time.perf_counter()
+                create(0, seat_types)
+                elapsed += time.perf_counter() - started
+                transaction.set_rollback(True)
+        return len(queries), elapsed / repeat
+
+
+def new_seat_types(seats: int) -> list:
+    # the rows split between the seat types, the first ones get the remainder
+    rows = seats // 10
+    return [
+        {
+            "seat_type": seat_type,
+            "rows": rows // len(SEAT_TYPES) + (index < rows % len(SEAT_TYPES)),
+            "columns": 10,
+        }
+        for index, seat_type in enumerate(SEAT_TYPES)
+    ]
+
+
+def create_screen_seat_by_seat(screen_number, seat_types: list) -> Screen:
+    # the seats created one at a time, as screens were created before
+    screen = Screen.objects.create(screen_number=screen_number)
+    first_row = 1
+    for seat_type in seat_types:
+        screen_seat = ScreenSeatTypesMapping.objects.create(
+            screen=screen, seat_type=seat_type["seat_type"]
+        )
+        for row in range(first_row, first_row + seat_type["rows"]):
+            for column in range(1, seat_type["columns"] + 1):
+                Seat.objects.create(
+                    seat_number=f"{row_label(row)}{column}",
+                    raw=row,
+                    col=column,
+                    type=screen_seat,
+                )
+        first_row += seat_type["rows"]
+    screen.total_seat = sum(
+        seat_type["rows"] * seat_type["columns"] for seat_type in seat_types
+    )
+    screen.save()
+    return screen
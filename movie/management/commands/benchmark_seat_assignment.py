@@ -0,0 +1,47 @@
+# Python imports
+import random
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand
+
+# App imports
+from movie.seat_assignment import find_best_seats
+
+# Local imports
+from .benchmark_seat_map import new_layout
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the best seat assignment for screens of growing size with part of "
+        "the seats booked. It runs in memory and does not touch the database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--booked", type=float, default=0.5)
+        parser.add_argument("--count", type=int, default=6)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options) -> None:
+        random.seed(0)
+        self.stdout.write(f"{'seats':>6} {'median ms':>10} {'max ms':>10}")
+        for rows, columns in ((10, 20), (40, 38), (60, 80)):
+            layout = new_layout(rows, columns)
+            booked = 0
+            for position in random.sample(
+                range(len(layout.seat_ids)),
+                int(len(layout.seat_ids) * options["booked"]),
+            ):
+                booked |= 1 << position
+
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                find_best_seats(layout, booked, options["count"])
+                timings.append(time.perf_counter() - started)
+            timings.sort()
+            self.stdout.write(
+                f"{len(layout.seat_ids):>6} {timings[len(timings) // 2] * 1000:>10.3f} "
+                f"{timings[-1] * 1000:>10.3f}"
+            )
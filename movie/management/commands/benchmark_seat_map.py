@@ -0,0 +1,71 @@
+# Python imports
+import random
+import time
+
+# Django imports
+from django.core.management.base import BaseCommand
+
+# External imports
+from rest_framework.renderers import JSONRenderer
+
+# App imports
+from movie.seat_layout import ScreenLayout
+
+SEAT_TYPES = ["SILVER", "GOLD", "PLATINUM"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the size and serialization time of the JSON seat list with the "
+        "compact seat map, for screens of growing size with part of the seats "
+        "booked. It runs in memory and does not touch the database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--booked", type=float, default=0.3)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options) -> None:
+        renderer = JSONRenderer()
+        random.seed(0)
+        self.stdout.write(
+            f"{'seats':>6} {'format':<18} {'bytes':>8} {'serialize ms':>13}"
+        )
+        for rows, columns in ((10, 20), (30, 50), (60, 80)):
+            layout = new_layout(rows, columns)
+            booked = 0
+            for position in random.sample(
+                range(len(layout.seat_ids)),
+                int(len(layout.seat_ids) * options["booked"]),
+            ):
+                booked |= 1 << position
+
+            formats = {
+                "json seat list": lambda: layout.free_seats(booked),
+                "seat map": lambda: layout.seat_map(booked),
+                "seat map, cached": lambda: layout.seat_map(booked, with_layout=False),
+            }
+            for name, build in formats.items():
+                started = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    body = renderer.render(build())
+                elapsed = (time.perf_counter() - started) / options["repeat"]
+                self.stdout.write(
+                    f"{len(layout.seat_ids):>6} {name:<18} {len(body):>8} "
+                    f"{elapsed * 1000:>13.3f}"
+                )
+
+
+def new_layout(rows: int, columns: int) -> ScreenLayout:
+    seats = [
+        (
+            row * columns + column,
+            f"{row + 1}{column + 1}",
+            SEAT_TYPES[row * len(SEAT_TYPES) // rows],
+            row + 1,
+            column + 1,
+        )
+        for row in range(rows)
+        for column in range(columns)
+    ]
+    return ScreenLayout.from_seats(1, seats)
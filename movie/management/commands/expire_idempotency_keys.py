@@ -0,0 +1,13 @@
+# Django imports
+from django.core.management.base import BaseCommand
+
+# App imports
+from movie.idempotency import expire_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete the stored responses of expired idempotency keys"
+
+    def handle(self, *args, **options) -> None:
+        deleted = expire_idempotency_keys()
+        self.stdout.write(f"Deleted {deleted} idempotency keys")
@@ -0,0 +1,13 @@
+# Django imports
+from django.core.management.base import BaseCommand
+
+# App imports
+from movie.utils import expire_seat_holds
+
+
+class Command(BaseCommand):
+    help = "Release the seats of expired seat holds"
+
+    def handle(self, *args, **options) -> None:
+        released = expire_seat_holds()
+        self.stdout.write(f"Released {released} held seats")
@@ -0,0 +1,62 @@
+# Python imports
+from pathlib import Path
+
+# Django imports
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# App imports
+from movie.layout_import import (
+    LAYOUT_FORMATS,
+    LayoutImportError,
+    import_screen_layout,
+    layout_seats,
+    save_layout_template,
+)
+from movie.models import LayoutTemplate
+
+
+class Command(BaseCommand):
+    help = (
+        "Create a screen from a layout file of one seat per line, a csv file "
+        "with a row,column,seat_type[,seat_number] header or a jsonl file of "
+        "objects with the same keys. The file is read and its seats inserted "
+        "a batch at a time, an invalid line rolls the screen back."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path")
+        parser.add_argument("--screen-number", type=int, required=True)
+        parser.add_argument("--format", choices=LAYOUT_FORMATS)
+        parser.add_argument("--template", help="Also save the layout as a template")
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.LAYOUT_IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options) -> None:
+        path = Path(options["path"])
+        layout_format = options["format"] or path.suffix.lstrip(".").lower()
+        if layout_format not in LAYOUT_FORMATS:
+            raise CommandError(f"--format is one of {', '.join(LAYOUT_FORMATS)}")
+        template = options["template"]
+        if template and LayoutTemplate.objects.filter(name=template).exists():
+            raise CommandError(f"The layout template {template} already exists")
+
+        try:
+            with transaction.atomic(), path.open(
+                encoding="utf-8-sig", newline=""
+            ) as lines:
+                screen = import_screen_layout(
+                    options["screen_number"],
+                    layout_seats(lines, layout_format),
+                    options["batch_size"],
+                )
+                if template:
+                    save_layout_template(template, screen)
+        except (LayoutImportError, OSError, UnicodeDecodeError) as error:
+            raise CommandError(str(error)) from error
+
+        self.stdout.write(
+            f"Created screen {screen.screen_number} with {screen.total_seat} seats"
+        )
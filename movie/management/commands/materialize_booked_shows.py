@@ -0,0 +1,34 @@
+# Python imports
+from datetime import timedelta
+
+# Django imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# App imports
+from movie.booked_shows import materialize_window
+from movie.models import ShowDetail
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the booked shows of the coming days of every running show, "
+        "the dates of a show are otherwise created when first booked or looked "
+        "up. Meant to run daily so the show catalog covers the window."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--days", type=int, default=settings.BOOKED_SHOW_WINDOW_DAYS
+        )
+
+    def handle(self, *args, **options) -> None:
+        days = options["days"]
+        first = timezone.localdate()
+        shows = ShowDetail.objects.filter(
+            end_date__gte=first, start_date__lte=first + timedelta(days=days - 1)
+        )
+
+        created = sum(materialize_window(show, days) for show in shows.iterator())
+        self.stdout.write(f"Created {created} booked shows for the next {days} days")
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:40
+
+# Django imports
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_booked_seats(apps, schema_editor):
+    Booking = apps.get_model("movie", "Booking")
+    BookedSeat = apps.get_model("movie", "BookedSeat")
+
+    booked_seats = [
+        BookedSeat(
+            booked_show_id=booking_seat.booking.booked_show_id,
+            seat_id=booking_seat.seat_id,
+            booking_id=booking_seat.booking_id,
+        )
+        for booking_seat in Booking.seats.through.objects.filter(
+            booking__booked_show__isnull=False
+        )
+        .select_related("booking")
+        .order_by("booking_id")
+    ]
+    # an already double-booked seat keeps its first booking in the ledger
+    BookedSeat.objects.bulk_create(booked_seats, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0003_alter_movie_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BookedSeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "booked_show",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booked_seat_booked_show",
+                        to="movie.bookedshowdetail",
+                    ),
+                ),
+                (
+                    "booking",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booked_seat_booking",
+                        to="movie.booking",
+                    ),
+                ),
+                (
+                    "seat",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="booked_seat_seat",
+                        to="movie.seat",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="bookedseat",
+            constraint=models.UniqueConstraint(
+                fields=("booked_show", "seat"), name="unique_booked_show_seat"
+            ),
+        ),
+        migrations.RunPython(backfill_booked_seats, migrations.RunPython.noop),
+    ]
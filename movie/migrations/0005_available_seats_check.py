@@ -0,0 +1,37 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:43
+
+# Django imports
+from django.db import migrations, models
+
+
+def clamp_available_seats(apps, schema_editor):
+    # the read-modify-write of the counters could drive them below zero when
+    # bookings raced, such a show has no seats left and is clamped to zero so
+    # the check constraints can be added
+    for model_name in ["BookedShowDetail", "ShowDetail"]:
+        model = apps.get_model("movie", model_name)
+        model.objects.filter(available_seats__lt=0).update(available_seats=0)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0004_booked_seat"),
+    ]
+
+    operations = [
+        migrations.RunPython(clamp_available_seats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="bookedshowdetail",
+            constraint=models.CheckConstraint(
+                check=models.Q(("available_seats__gte", 0)),
+                name="booked_show_detail_available_seats_gte_0",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="showdetail",
+            constraint=models.CheckConstraint(
+                check=models.Q(("available_seats__gte", 0)),
+                name="show_detail_available_seats_gte_0",
+            ),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:49
+
+# Django imports
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("movie", "0005_available_seats_check"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SeatHold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="bookedseat",
+            name="booking",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="booked_seat_booking",
+                to="movie.booking",
+            ),
+        ),
+        migrations.AddField(
+            model_name="seathold",
+            name="booked_show",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="seat_hold_booked_show",
+                to="movie.bookedshowdetail",
+            ),
+        ),
+        migrations.AddField(
+            model_name="seathold",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="seat_hold_user",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="bookedseat",
+            name="hold",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="booked_seat_hold",
+                to="movie.seathold",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bookedseat",
+            constraint=models.CheckConstraint(
+                check=models.Q(
+                    ("booking__isnull", False), ("hold__isnull", False), _connector="OR"
+                ),
+                name="booked_seat_booking_or_hold",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seathold",
+            index=models.Index(
+                fields=["booked_show", "expires_at"], name="seat_hold_show_expires_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seathold",
+            index=models.Index(
+                fields=["user", "expires_at"], name="seat_hold_user_expires_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:58
+
+# Django imports
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0006_seat_hold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="showdetail",
+            name="flash_sale",
+            field=models.BooleanField(default=False),
+        ),
+    ]
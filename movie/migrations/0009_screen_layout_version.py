@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 05:25
+
+# Django imports
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0008_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="screen",
+            name="layout_version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 05:57
+
+# Django imports
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0010_table_version"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(fields=["user", "-id"], name="booking_user_id_idx"),
+        ),
+    ]
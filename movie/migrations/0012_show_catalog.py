@@ -0,0 +1,151 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:05
+
+# Python imports
+from collections import Counter, defaultdict
+from datetime import datetime
+
+# Django imports
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+SEAT_TYPE_FIELDS = {
+    "PLATINUM": "platinum_seats",
+    "GOLD": "gold_seats",
+    "SILVER": "silver_seats",
+}
+
+
+def backfill_show_catalog(apps, schema_editor):
+    BookedShowDetail = apps.get_model("movie", "BookedShowDetail")
+    BookedSeat = apps.get_model("movie", "BookedSeat")
+    Seat = apps.get_model("movie", "Seat")
+    ShowCatalog = apps.get_model("movie", "ShowCatalog")
+    ShowSeatPrice = apps.get_model("movie", "ShowSeatPrice")
+
+    prices = {
+        price["show_detail_id"]: (price["min_price"], price["max_price"])
+        for price in ShowSeatPrice.objects.values("show_detail_id").annotate(
+            min_price=Min("price"), max_price=Max("price")
+        )
+    }
+    seats = defaultdict(Counter)
+    for seat in Seat.objects.values("type__screen_id", "type__seat_type").annotate(
+        count=Count("id")
+    ):
+        seats[seat["type__screen_id"]][seat["type__seat_type"]] = seat["count"]
+    booked = defaultdict(Counter)
+    for booked_seat in (
+        BookedSeat.objects.filter(booking__isnull=False)
+        .values("booked_show_id", "seat__type__seat_type")
+        .annotate(count=Count("id"))
+    ):
+        booked[booked_seat["booked_show_id"]][
+            booked_seat["seat__type__seat_type"]
+        ] = booked_seat["count"]
+
+    catalog = []
+    for booked_show in BookedShowDetail.objects.select_related(
+        "show_detail__movie", "show_detail__screen"
+    ).iterator():
+        show_detail = booked_show.show_detail
+        min_price, max_price = prices.get(show_detail.id, (None, None))
+        catalog.append(
+            ShowCatalog(
+                booked_show=booked_show,
+                show_detail=show_detail,
+                movie_id=show_detail.movie_id,
+                title=show_detail.movie.title,
+                screen_id=show_detail.screen_id,
+                screen_number=show_detail.screen.screen_number,
+                show_date=booked_show.show_date,
+                starts_at=timezone.make_aware(
+                    datetime.combine(booked_show.show_date, show_detail.start_time)
+                ),
+                ends_at=timezone.make_aware(
+                    datetime.combine(booked_show.show_date, show_detail.end_time)
+                ),
+                min_price=min_price,
+                max_price=max_price,
+                available_seats=booked_show.available_seats,
+                flash_sale=show_detail.flash_sale,
+                **{
+                    field: seats[show_detail.screen_id][seat_type]
+                    - booked[booked_show.id][seat_type]
+                    for seat_type, field in SEAT_TYPE_FIELDS.items()
+                },
+            )
+        )
+    ShowCatalog.objects.bulk_create(catalog, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0011_booking_user_id_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShowCatalog",
+            fields=[
+                (
+                    "booked_show",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="catalog",
+                        serialize=False,
+                        to="movie.bookedshowdetail",
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("screen_number", models.IntegerField()),
+                ("show_date", models.DateField()),
+                ("starts_at", models.DateTimeField()),
+                ("ends_at", models.DateTimeField()),
+                ("min_price", models.FloatField(blank=True, null=True)),
+                ("max_price", models.FloatField(blank=True, null=True)),
+                ("available_seats", models.IntegerField()),
+                ("platinum_seats", models.IntegerField(default=0)),
+                ("gold_seats", models.IntegerField(default=0)),
+                ("silver_seats", models.IntegerField(default=0)),
+                ("flash_sale", models.BooleanField(default=False)),
+                (
+                    "movie",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="catalog",
+                        to="movie.movie",
+                    ),
+                ),
+                (
+                    "screen",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="catalog",
+                        to="movie.screen",
+                    ),
+                ),
+                (
+                    "show_detail",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="catalog",
+                        to="movie.showdetail",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["starts_at"], name="show_catalog_starts_at_idx"
+                    ),
+                    models.Index(
+                        fields=["movie", "starts_at"], name="show_catalog_movie_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_show_catalog, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Django imports
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import DatabaseError, migrations, transaction
+
+
+def create_search_indexes(apps, schema_editor):
+    # full-text and trigram indexes only exist on postgresql, other databases
+    # search in memory
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    Movie = apps.get_model("movie", "Movie")
+    # the expression of search.SEARCH_VECTOR, repeated so the migration stays
+    # as it is, the planner only uses the index for the very same expression
+    schema_editor.add_index(
+        Movie,
+        GinIndex(
+            SearchVector("title", "description", config="english"),
+            name="movie_search_idx",
+        ),
+    )
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+    try:
+        # the role may not be allowed to create extensions, search then goes
+        # without typo matching
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        return
+    schema_editor.add_index(
+        Movie,
+        GinIndex(
+            fields=["title"], opclasses=["gin_trgm_ops"], name="movie_title_trgm_idx"
+        ),
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS movie_title_trgm_idx")
+    schema_editor.execute("DROP INDEX IF EXISTS movie_search_idx")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0012_show_catalog"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
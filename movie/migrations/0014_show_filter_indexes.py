@@ -0,0 +1,31 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:20
+
+# Django imports
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0013_movie_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bookedshowdetail",
+            index=models.Index(
+                fields=["show_date", "show_detail"], name="booked_show_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showdetail",
+            index=models.Index(
+                fields=["movie", "start_time"], name="show_movie_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showdetail",
+            index=models.Index(
+                fields=["screen", "start_time"], name="show_screen_time_idx"
+            ),
+        ),
+    ]
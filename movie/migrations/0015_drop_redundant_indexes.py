@@ -0,0 +1,96 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:35
+
+# Django imports
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("movie", "0014_show_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="bookedseat",
+            name="booked_show",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="booked_seat_booked_show",
+                to="movie.bookedshowdetail",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="booking",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="booking_user",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="idempotencykey",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="idempotency_key_user",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="seathold",
+            name="booked_show",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="seat_hold_booked_show",
+                to="movie.bookedshowdetail",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="seathold",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="seat_hold_user",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="showcatalog",
+            name="movie",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="catalog",
+                to="movie.movie",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="showdetail",
+            name="movie",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="showtime_movie",
+                to="movie.movie",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="showdetail",
+            name="screen",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="showtime_screen",
+                to="movie.screen",
+            ),
+        ),
+    ]
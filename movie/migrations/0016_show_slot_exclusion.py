@@ -0,0 +1,96 @@
+# Django imports
+from django.db import migrations
+
+# the expressions of show_schedule.show_slot(), repeated so the migration stays
+# as it is, the planner only probes the index for the very same expressions
+SHOW_SLOT_SQL = """
+ALTER TABLE movie_showdetail ADD CONSTRAINT show_detail_slot_excl
+EXCLUDE USING gist (
+    int8range(screen_id, screen_id, '[]') WITH &&,
+    daterange(start_date, end_date, '[]') WITH &&,
+    tsrange(
+        ('2000-01-01')::date + start_time, ('2000-01-01')::date + end_time
+    ) WITH &&
+)
+"""
+# the shows whose ranges cannot be built, range constructors raise on a lower
+# bound above the upper one, before any overlap is checked
+INVERTED_SQL = """
+SELECT id
+FROM movie_showdetail
+WHERE start_time > end_time OR start_date > end_date
+ORDER BY id
+"""
+# the pairs of shows the constraint would reject, the earlier check of the
+# serializers let partly overlapping shows through
+CONFLICTS_SQL = """
+SELECT show_detail.id, other.id
+FROM movie_showdetail AS show_detail
+JOIN movie_showdetail AS other
+    ON other.id > show_detail.id
+    AND other.screen_id = show_detail.screen_id
+    AND daterange(other.start_date, other.end_date, '[]')
+        && daterange(show_detail.start_date, show_detail.end_date, '[]')
+    AND tsrange(
+        ('2000-01-01')::date + other.start_time,
+        ('2000-01-01')::date + other.end_time
+    ) && tsrange(
+        ('2000-01-01')::date + show_detail.start_time,
+        ('2000-01-01')::date + show_detail.end_time
+    )
+ORDER BY show_detail.id, other.id
+"""
+# the shows and pairs listed in the error, the others are counted
+LISTED_CONFLICTS = 50
+
+
+def listed(items: list) -> str:
+    text = ", ".join(items[:LISTED_CONFLICTS])
+    if len(items) > LISTED_CONFLICTS:
+        text += f" and {len(items) - LISTED_CONFLICTS} more"
+    return text
+
+
+def add_show_slot_constraint(apps, schema_editor):
+    # range types and exclusion constraints are postgresql only, other
+    # databases rely on the check of the serializers
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    # an exclusion constraint cannot be added NOT VALID, the overlapping
+    # shows have to be moved or deleted before it is added
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(INVERTED_SQL)
+        inverted = [str(show) for show, in cursor.fetchall()]
+        if inverted:
+            raise RuntimeError(
+                f"{len(inverted)} shows start after they end, in time or date, and "
+                f"must be rescheduled or deleted before show_detail_slot_excl is "
+                f"added, as show id: {listed(inverted)}"
+            )
+        cursor.execute(CONFLICTS_SQL)
+        conflicts = [f"({show}, {other})" for show, other in cursor.fetchall()]
+    if conflicts:
+        raise RuntimeError(
+            f"{len(conflicts)} pairs of shows overlap on the same screen and must "
+            f"be rescheduled or deleted before show_detail_slot_excl is added, "
+            f"as (show id, show id): {listed(conflicts)}"
+        )
+    schema_editor.execute(SHOW_SLOT_SQL)
+
+
+def remove_show_slot_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "ALTER TABLE movie_showdetail DROP CONSTRAINT IF EXISTS show_detail_slot_excl"
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0015_drop_redundant_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_show_slot_constraint, remove_show_slot_constraint),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:52
+
+# Django imports
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0016_show_slot_exclusion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LayoutTemplate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("total_seat", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="LayoutTemplateSeat",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "seat_type",
+                    models.CharField(
+                        choices=[
+                            ("PLATINUM", "Platinum"),
+                            ("GOLD", "Gold"),
+                            ("SILVER", "Silver"),
+                            ("UNKNOWN", "Unknown"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("seat_number", models.CharField(max_length=10)),
+                ("raw", models.CharField(max_length=3)),
+                ("col", models.CharField(max_length=3)),
+                (
+                    "template",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seats",
+                        to="movie.layouttemplate",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="layouttemplateseat",
+            constraint=models.UniqueConstraint(
+                fields=("template", "raw", "col"), name="unique_layout_template_seat"
+            ),
+        ),
+    ]
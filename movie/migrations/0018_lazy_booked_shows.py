@@ -0,0 +1,40 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:59
+
+# Django imports
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0017_layout_template"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="bookedshowdetail",
+            name="booked_show_date_idx",
+        ),
+        migrations.AlterField(
+            model_name="bookedshowdetail",
+            name="show_detail",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="booked_show_detail",
+                to="movie.showdetail",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="showdetail",
+            index=models.Index(
+                fields=["end_date", "start_date"], name="show_end_date_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="bookedshowdetail",
+            constraint=models.UniqueConstraint(
+                fields=("show_detail", "show_date"), name="unique_booked_show_date"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.4 on 2026-10-18 08:11
+
+# Django imports
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("movie", "0018_lazy_booked_shows"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="locked_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -2,6 +2,7 @@
 import uuid
 
 # Django imports
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -16,10 +17,13 @@ class Screen(models.Model):
     Fields:
         screen_number (int): It stores the screen number
         total_seat (int): It stores the total seat
+        layout_version (int): It stores the version of the seat layout, bumped
+            whenever the screen or its seat types change
     """
 
     screen_number = models.IntegerField(null=False)
     total_seat = models.IntegerField(null=True, blank=True)
+    layout_version = models.PositiveIntegerField(default=1)
 
     def __str__(self) -> str:
         return f"{self.screen_number} - {self.total_seat}"
@@ -117,19 +121,41 @@ class ShowDetail(models.Model):
         available_seats (int): It stores available seats
         start_date (date): It stores start date
         end_date (date): It stores end date
+        flash_sale (bool): It stores whether bookings go through the flash sale queue
     """
 
+    # indexed as the leading column of show_movie_time_idx
     movie = models.ForeignKey(
-        Movie, related_name="showtime_movie", on_delete=models.CASCADE
+        Movie, related_name="showtime_movie", on_delete=models.CASCADE, db_index=False
     )
     start_time = models.TimeField()
     end_time = models.TimeField()
+    # indexed as the leading column of show_screen_time_idx
     screen = models.ForeignKey(
-        Screen, related_name="showtime_screen", on_delete=models.CASCADE
+        Screen,
+        related_name="showtime_screen",
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     available_seats = models.IntegerField()
     start_date = models.DateField()
     end_date = models.DateField()
+    flash_sale = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(available_seats__gte=0),
+                name="show_detail_available_seats_gte_0",
+            )
+        ]
+        indexes = [
+            # the shows of a movie or a screen within a time window
+            models.Index(fields=["movie", "start_time"], name="show_movie_time_idx"),
+            models.Index(fields=["screen", "start_time"], name="show_screen_time_idx"),
+            # the shows running within a date range, most of them ended before it
+            models.Index(fields=["end_date", "start_date"], name="show_end_date_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.movie.title} at {self.start_time}"
@@ -167,12 +193,29 @@ class BookedShowDetail(models.Model):
         available_seats (int): It stores available seats
     """
 
+    # indexed as the leading column of unique_booked_show_date
     show_detail = models.ForeignKey(
-        ShowDetail, on_delete=models.CASCADE, related_name="booked_show_detail"
+        ShowDetail,
+        on_delete=models.CASCADE,
+        related_name="booked_show_detail",
+        db_index=False,
     )
     show_date = models.DateField()
     available_seats = models.IntegerField()
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(available_seats__gte=0),
+                name="booked_show_detail_available_seats_gte_0",
+            ),
+            # the dates are created on first use, two requests creating the
+            # same one end up with a single row
+            models.UniqueConstraint(
+                fields=["show_detail", "show_date"], name="unique_booked_show_date"
+            ),
+        ]
+
 
 class Booking(models.Model):
     """
@@ -185,8 +228,9 @@ class Booking(models.Model):
         seats (Seat): It stores seats
     """
 
+    # indexed as the leading column of booking_user_id_idx
     user = models.ForeignKey(
-        User, related_name="booking_user", on_delete=models.CASCADE
+        User, related_name="booking_user", on_delete=models.CASCADE, db_index=False
     )
     showtime = models.ForeignKey(
         ShowDetail,
@@ -204,5 +248,270 @@ class Booking(models.Model):
     )
     seats = models.ManyToManyField(Seat, related_name="booking_seats")
 
+    class Meta:
+        indexes = [
+            # the bookings of a user are listed newest first
+            models.Index(fields=["user", "-id"], name="booking_user_id_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.user.username} - {self.showtime}"
+
+
+class SeatHold(models.Model):
+    """
+    SeatHold: It stores seats reserved for a user until they expire or are booked
+
+    Fields:
+        user (User): It stores user
+        booked_show (BookedShowDetail): It stores booked show
+        expires_at (datetime): It stores the hold expiry time
+    """
+
+    # both indexed as the leading column of the indexes with expires_at
+    user = models.ForeignKey(
+        User, related_name="seat_hold_user", on_delete=models.CASCADE, db_index=False
+    )
+    booked_show = models.ForeignKey(
+        BookedShowDetail,
+        on_delete=models.CASCADE,
+        related_name="seat_hold_booked_show",
+        db_index=False,
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["booked_show", "expires_at"],
+                name="seat_hold_show_expires_idx",
+            ),
+            models.Index(
+                fields=["user", "expires_at"], name="seat_hold_user_expires_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.booked_show_id} until {self.expires_at}"
+
+
+class BookedSeat(models.Model):
+    """
+    BookedSeat: It stores the seat ledger of a booked show
+
+    Fields:
+        booked_show (BookedShowDetail): It stores booked show
+        seat (Seat): It stores seat
+        booking (Booking): It stores booking, empty while the seat is held
+        hold (SeatHold): It stores seat hold, empty once the seat is booked
+    """
+
+    # indexed as the leading column of unique_booked_show_seat
+    booked_show = models.ForeignKey(
+        BookedShowDetail,
+        on_delete=models.CASCADE,
+        related_name="booked_seat_booked_show",
+        db_index=False,
+    )
+    seat = models.ForeignKey(
+        Seat, on_delete=models.CASCADE, related_name="booked_seat_seat"
+    )
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name="booked_seat_booking",
+        null=True,
+        blank=True,
+    )
+    hold = models.ForeignKey(
+        SeatHold,
+        on_delete=models.CASCADE,
+        related_name="booked_seat_hold",
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["booked_show", "seat"], name="unique_booked_show_seat"
+            ),
+            models.CheckConstraint(
+                check=models.Q(booking__isnull=False) | models.Q(hold__isnull=False),
+                name="booked_seat_booking_or_hold",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.booked_show_id} - {self.seat_id}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    IdempotencyKey: It stores the response of a request sent with an
+    Idempotency-Key header so a retry of the request gets it back
+
+    Fields:
+        user (User): It stores user
+        key (str): It stores the idempotency key sent by the client
+        fingerprint (str): It stores the hash of the request method, path and body
+        status_code (int): It stores the response status, empty while in progress
+        response (dict): It stores the response data
+        expires_at (datetime): It stores the time after which the key can be reused
+        locked_until (datetime): It stores the end of the lease of the request in
+            progress, a retry takes the key over once it passes
+    """
+
+    # indexed as the leading column of unique_idempotency_key_user_key
+    user = models.ForeignKey(
+        User,
+        related_name="idempotency_key_user",
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_idempotency_key_user_key"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id} - {self.key}"
+
+
+class TableVersion(models.Model):
+    """
+    TableVersion: It counts the writes to a catalog table, the responses built
+    from the table are identified by its version instead of their content
+
+    Fields:
+        table (str): It stores the name of the table
+        version (int): It stores the number of writes to the table
+        updated_at (datetime): It stores the time of the last write to the table
+    """
+
+    table = models.CharField(max_length=63, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.table} - {self.version}"
+
+
+class ShowCatalog(models.Model):
+    """
+    ShowCatalog: It stores a show date with everything a show listing shows,
+    kept up to date by the scheduling, pricing and booking writes
+
+    Fields:
+        booked_show (BookedShowDetail): It stores booked show
+        show_detail (ShowDetail): It stores show detail
+        movie (Movie): It stores movie
+        title (str): It stores the movie title
+        screen (Screen): It stores screen
+        screen_number (int): It stores the screen number
+        show_date (date): It stores the show date
+        starts_at (datetime): It stores the start of the show on its date
+        ends_at (datetime): It stores the end of the show on its date
+        min_price (float): It stores the lowest seat price
+        max_price (float): It stores the highest seat price
+        available_seats (int): It stores the seats left
+        platinum_seats (int): It stores the platinum seats left
+        gold_seats (int): It stores the gold seats left
+        silver_seats (int): It stores the silver seats left
+        flash_sale (bool): It stores whether the show is sold through the queue
+    """
+
+    booked_show = models.OneToOneField(
+        BookedShowDetail,
+        primary_key=True,
+        related_name="catalog",
+        on_delete=models.CASCADE,
+    )
+    show_detail = models.ForeignKey(
+        ShowDetail, related_name="catalog", on_delete=models.CASCADE
+    )
+    # indexed as the leading column of show_catalog_movie_idx
+    movie = models.ForeignKey(
+        Movie, related_name="catalog", on_delete=models.CASCADE, db_index=False
+    )
+    title = models.CharField(max_length=255)
+    screen = models.ForeignKey(Screen, related_name="catalog", on_delete=models.CASCADE)
+    screen_number = models.IntegerField()
+    show_date = models.DateField()
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    min_price = models.FloatField(null=True, blank=True)
+    max_price = models.FloatField(null=True, blank=True)
+    available_seats = models.IntegerField()
+    platinum_seats = models.IntegerField(default=0)
+    gold_seats = models.IntegerField(default=0)
+    silver_seats = models.IntegerField(default=0)
+    flash_sale = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["starts_at"], name="show_catalog_starts_at_idx"),
+            models.Index(fields=["movie", "starts_at"], name="show_catalog_movie_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.title} - {self.starts_at}"
+
+
+class LayoutTemplate(models.Model):
+    """
+    LayoutTemplate: It stores a named seat layout new screens are cloned from
+
+    Fields:
+        name (str): It stores the template name
+        total_seat (int): It stores the number of seats
+        created_at (datetime): It stores the creation time
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    total_seat = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class LayoutTemplateSeat(models.Model):
+    """
+    LayoutTemplateSeat: It stores a seat of a layout template
+
+    Fields:
+        template (LayoutTemplate): It stores the layout template
+        seat_type (SeatType): It stores the seat type
+        seat_number (str): It stores the seat number
+        raw (int): It stores the row number of seat
+        col (int): It stores the col number of seat
+    """
+
+    template = models.ForeignKey(
+        LayoutTemplate, related_name="seats", on_delete=models.CASCADE, db_index=False
+    )
+    seat_type = models.CharField(max_length=10, choices=SeatType.choices)
+    seat_number = models.CharField(max_length=10)
+    raw = models.CharField(max_length=3)
+    col = models.CharField(max_length=3)
+
+    class Meta:
+        constraints = [
+            # also the index of the seats of a template
+            models.UniqueConstraint(
+                fields=["template", "raw", "col"], name="unique_layout_template_seat"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.template_id} - {self.seat_number}"
@@ -0,0 +1,12 @@
+# External imports
+from rest_framework.renderers import JSONRenderer
+
+
+class SeatMapRenderer(JSONRenderer):
+    """
+    SeatMapRenderer: It renders the compact seat map of a show date, asked for
+    with `Accept: application/vnd.theater.seatmap+json` or `?format=seatmap`
+    """
+
+    media_type = "application/vnd.theater.seatmap+json"
+    format = "seatmap"
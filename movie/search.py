@@ -0,0 +1,86 @@
+# Python imports
+import difflib
+from typing import List
+
+# Django imports
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.functions import Greatest
+
+# Local imports
+from .models import Movie
+
+SEARCH_CONFIG = "english"
+# the index of migration 0013 is built on this very expression, so the planner
+# uses it for the match
+SEARCH_VECTOR = SearchVector("title", "description", config=SEARCH_CONFIG)
+SEARCH_INDEX = "movie_search_idx"
+TRIGRAM_INDEX = "movie_title_trgm_idx"
+TRIGRAM_EXTENSION = "pg_trgm"
+# below this similarity a title is not taken for a misspelling of the query
+FUZZY_CUTOFF = 0.3
+
+_trigram_enabled = {}
+
+
+def trigram_enabled() -> bool:
+    if connection.alias not in _trigram_enabled:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = %s", [TRIGRAM_EXTENSION]
+            )
+            _trigram_enabled[connection.alias] = cursor.fetchone() is not None
+    return _trigram_enabled[connection.alias]
+
+
+def search_movies(query: str, limit: int) -> List[Movie]:
+    """
+    Returns the movies best matching the query, ranked by full-text relevance
+    over the title and description and by title similarity for misspellings
+    """
+    if connection.vendor != "postgresql":
+        return search_movies_fallback(query, limit)
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    movies = Movie.objects.annotate(
+        search=SEARCH_VECTOR, rank=SearchRank(SEARCH_VECTOR, search_query)
+    )
+    matches = Q(search=search_query)
+    if trigram_enabled():
+        # title % query is answered by the trigram index of the titles
+        movies = movies.annotate(similarity=TrigramSimilarity("title", query))
+        matches |= Q(title__trigram_similar=query)
+    else:
+        movies = movies.annotate(similarity=Value(0.0))
+    return list(
+        movies.filter(matches).order_by(Greatest("rank", "similarity").desc(), "title")[
+            :limit
+        ]
+    )
+
+
+def search_movies_fallback(query: str, limit: int) -> List[Movie]:
+    # without postgresql the movies are matched in memory, enough for tests
+    words = query.lower().split()
+    movies = list(Movie.objects.all())
+
+    def score(movie: Movie) -> float:
+        title = movie.title.lower()
+        if all(word in title for word in words):
+            return 1.0
+        if all(word in f"{title} {movie.description.lower()}" for word in words):
+            return 0.5
+        return difflib.SequenceMatcher(None, query.lower(), title).ratio()
+
+    scored = [(score(movie), movie) for movie in movies]
+    ranked = sorted(
+        (item for item in scored if item[0] >= FUZZY_CUTOFF),
+        key=lambda item: (-item[0], item[1].title),
+    )
+    return [movie for _, movie in ranked[:limit]]
@@ -0,0 +1,88 @@
+# Python imports
+from typing import List, Optional, Tuple
+
+# Local imports
+from .seat_layout import ScreenLayout, iter_bits
+
+
+def find_best_seats(
+    layout: ScreenLayout, booked: int, count: int, seat_type: Optional[str] = None
+) -> List[int]:
+    """
+    Returns the seat ids of the best `count` free seats, preferring one
+    contiguous block in the middle row of the section and the middle of that
+    row, then the largest free block topped up with the nearest free seats.
+    An empty list means the section has not enough free seats.
+    """
+    section = layout.type_masks.get(seat_type, 0) if seat_type else layout.full_mask
+    free = ~booked & section
+    if count <= 0 or free.bit_count() < count:
+        return []
+
+    rows = rows_by_preference(layout, section)
+
+    # starts has a bit for every seat that begins a free run of `count` seats
+    starts = free
+    for length in range(1, count):
+        starts &= (free >> length) & (layout.adjacent >> (length - 1))
+    if starts:
+        position = best_block(layout, rows, starts, count)
+        return list(layout.seat_ids[position : position + count])
+
+    return near_adjacent_seats(layout, rows, free, count)
+
+
+def rows_by_preference(layout: ScreenLayout, section: int) -> List[Tuple[int, int]]:
+    rows = [(raw, row_mask & section) for raw, row_mask in layout.rows]
+    rows = [(raw, row_mask) for raw, row_mask in rows if row_mask]
+    middle = (rows[0][0] + rows[-1][0]) / 2
+    # the middle row of the section first, the row behind it before the one in front
+    return sorted(rows, key=lambda row: (abs(row[0] - middle), -row[0]))
+
+
+def best_block(
+    layout: ScreenLayout, rows: List[Tuple[int, int]], starts: int, count: int
+) -> int:
+    cols = layout.cols
+    for _, row_mask in rows:
+        candidates = starts & row_mask
+        if not candidates:
+            continue
+
+        row_positions = list(iter_bits(row_mask))
+        row_center = cols[row_positions[0]] + cols[row_positions[-1]]
+        return min(
+            iter_bits(candidates),
+            key=lambda position: abs(
+                cols[position] + cols[position + count - 1] - row_center
+            ),
+        )
+    raise ValueError("starts has no bit in the section rows")
+
+
+def near_adjacent_seats(
+    layout: ScreenLayout, rows: List[Tuple[int, int]], free: int, count: int
+) -> List[int]:
+    # grow the free runs until none is left to find the largest block
+    starts, length = free, 1
+    while length < count:
+        longer = starts & (free >> length) & (layout.adjacent >> (length - 1))
+        if not longer:
+            break
+        starts, length = longer, length + 1
+
+    anchor = best_block(layout, rows, starts, length)
+    block = list(range(anchor, anchor + length))
+    anchor_raw = layout.raws[anchor]
+    anchor_col = (layout.cols[anchor] + layout.cols[anchor + length - 1]) / 2
+
+    # top up with the free seats closest to the block, nearest rows first
+    block_mask = ((1 << length) - 1) << anchor
+    nearest = sorted(
+        iter_bits(free & ~block_mask),
+        key=lambda position: (
+            abs(layout.raws[position] - anchor_raw),
+            abs(layout.cols[position] - anchor_col),
+        ),
+    )
+    return [layout.seat_ids[position] for position in block + nearest[: count - length]]
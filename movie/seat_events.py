@@ -0,0 +1,255 @@
+# Python imports
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+# Django imports
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, connections
+
+# Local imports
+from .seat_index import seat_index
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "movie_seat_changes"
+# pg_notify refuses payloads of 8000 bytes and more
+NOTIFY_MAX_PAYLOAD = 7900
+WORKER_ID = uuid.uuid4().hex
+# the notify bridges hold this advisory lock, shared, while they listen
+LISTENER_LOCK = 0x5EA7
+LISTENERS_SQL = """
+SELECT EXISTS (
+    SELECT 1 FROM pg_locks
+    WHERE locktype = 'advisory' AND classid = 0 AND objid = %s AND objsubid = 1
+        AND granted AND pid <> %s
+)
+"""
+
+
+class SeatEventSubscription:
+    """
+    SeatEventSubscription: It stores the seat events of a BookedShowDetail
+    waiting to be streamed to one watcher
+
+    An idle watcher is a coroutine waiting on an empty queue, it costs no
+    thread and no database connection. A watcher too slow to drain its queue
+    gets a single reset event and has to fetch the seats again.
+    """
+
+    def __init__(self, booked_show_id: int, max_size: int) -> None:
+        self.booked_show_id = booked_show_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(max_size)
+        self.overflow = False
+
+    def put(self, event: dict) -> None:
+        # runs on the event loop of the watcher
+        if self.overflow:
+            return
+        if self.queue.full():
+            self.overflow = True
+            event = {"type": "reset", "booked_show": self.booked_show_id}
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event["type"] == "reset":
+            self.overflow = False
+        return event
+
+
+class SeatEventBroker:
+    """
+    SeatEventBroker: It fans the seat changes of this worker out to the watchers
+    of each BookedShowDetail connected to this worker
+    """
+
+    def __init__(self) -> None:
+        self._subscriptions: Dict[int, Set[SeatEventSubscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, booked_show_id: int) -> SeatEventSubscription:
+        subscription = SeatEventSubscription(
+            booked_show_id, settings.SEAT_EVENTS_QUEUE_SIZE
+        )
+        with self._lock:
+            self._subscriptions[booked_show_id].add(subscription)
+        start_notify_bridge()
+        return subscription
+
+    def unsubscribe(self, subscription: SeatEventSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.booked_show_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.booked_show_id]
+
+    def publish(self, booked_show_id: int, event: dict) -> None:
+        # safe to call from any thread, the event is handed to each watcher loop
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(booked_show_id, ()))
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.put, event)
+
+    def watcher_count(self, booked_show_id: int) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(booked_show_id, ()))
+
+    def reset(self) -> None:
+        # the watchers fetch the seats again, the changes they missed included
+        with self._lock:
+            booked_show_ids = list(self._subscriptions)
+        for booked_show_id in booked_show_ids:
+            seat_index.invalidate(booked_show_id)
+            self.publish(
+                booked_show_id, {"type": "reset", "booked_show": booked_show_id}
+            )
+
+
+seat_event_broker = SeatEventBroker()
+
+
+def notify_enabled() -> bool:
+    return settings.SEAT_EVENTS_NOTIFY and connection.vendor == "postgresql"
+
+
+def seats_changed(
+    booked_show_id: int, seat_ids: List[int], screen_id: int, booked: bool
+) -> None:
+    """
+    Publishes a change of the seat bitmap index to the watchers of this worker
+    and, through NOTIFY, to the other workers
+    """
+    event = {
+        "type": "booked" if booked else "released",
+        "booked_show": booked_show_id,
+        "seats": seat_ids,
+    }
+    seat_event_broker.publish(booked_show_id, event)
+    if not notify_enabled() or not remote_listeners():
+        return
+
+    payload = json.dumps({**event, "screen": screen_id, "origin": WORKER_ID})
+    if len(payload) > NOTIFY_MAX_PAYLOAD:
+        payload = json.dumps(
+            {
+                "type": "reset",
+                "booked_show": booked_show_id,
+                "screen": screen_id,
+                "origin": WORKER_ID,
+            }
+        )
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, payload])
+
+
+_listeners_checked_at: Optional[float] = None
+_listeners = False
+
+
+def remote_listeners() -> bool:
+    """
+    Returns whether the notify bridge of another worker listens, checked once
+    every SEAT_EVENTS_LISTENERS_SECONDS so most changes send no query at all
+    """
+    global _listeners, _listeners_checked_at
+    now = time.monotonic()
+    if (
+        _listeners_checked_at is None
+        or now - _listeners_checked_at >= settings.SEAT_EVENTS_LISTENERS_SECONDS
+    ):
+        own_pid = _bridge.pid if _bridge is not None else 0
+        with connection.cursor() as cursor:
+            cursor.execute(LISTENERS_SQL, [LISTENER_LOCK, own_pid])
+            _listeners = cursor.fetchone()[0]
+        _listeners_checked_at = now
+    return _listeners
+
+
+def remote_seats_changed(payload: str) -> None:
+    event = json.loads(payload)
+    if event.pop("origin") == WORKER_ID:
+        return
+
+    # keep the bitmaps of this worker in step with the other workers
+    booked_show_id = event["booked_show"]
+    screen_id = event.pop("screen")
+    if event["type"] == "reset":
+        seat_index.invalidate(booked_show_id)
+    elif event["type"] == "booked":
+        seat_index.book(booked_show_id, event["seats"], screen_id, notify=False)
+    else:
+        seat_index.release(booked_show_id, event["seats"], screen_id, notify=False)
+    seat_event_broker.publish(booked_show_id, event)
+
+
+class NotifyBridge(threading.Thread):
+    """
+    NotifyBridge: It listens to the seat changes of the other workers on a
+    dedicated database connection and hands them to this worker
+    """
+
+    def __init__(self) -> None:
+        super().__init__(name="seat-events-notify", daemon=True)
+        self.stopped = threading.Event()
+        self.pid = 0
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                self.listen()
+            except DatabaseError:
+                logger.exception("seat events notify bridge lost its connection")
+                self.stopped.wait(settings.SEAT_EVENTS_HEARTBEAT_SECONDS)
+
+    def listen(self) -> None:
+        wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+        wrapper.ensure_connection()
+        try:
+            raw = wrapper.connection
+            raw.autocommit = True
+            self.pid = raw.get_backend_pid()
+            with raw.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                cursor.execute("SELECT pg_advisory_lock_shared(%s)", [LISTENER_LOCK])
+            # the other workers notice the lock within their next check, the
+            # changes they made meanwhile were not notified
+            reset_at = time.monotonic() + settings.SEAT_EVENTS_LISTENERS_SECONDS
+            while not self.stopped.is_set():
+                if reset_at is not None and time.monotonic() >= reset_at:
+                    reset_at = None
+                    seat_event_broker.reset()
+                readable, _, _ = select.select([raw], [], [], 1)
+                if not readable:
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    remote_seats_changed(raw.notifies.pop(0).payload)
+        finally:
+            wrapper.close()
+
+
+_bridge: Optional[NotifyBridge] = None
+_bridge_lock = threading.Lock()
+
+
+def start_notify_bridge() -> None:
+    global _bridge
+    if not notify_enabled():
+        return
+    with _bridge_lock:
+        if _bridge is None or not _bridge.is_alive():
+            _bridge = NotifyBridge()
+            _bridge.start()
@@ -0,0 +1,209 @@
+# Python imports
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Django imports
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+# Local imports
+from .models import BookedSeat
+from .seat_layout import ScreenLayout, get_screen_layout, get_screen_layouts
+
+logger = logging.getLogger(__name__)
+
+
+class SeatAvailabilityIndex:
+    """
+    SeatAvailabilityIndex: It stores the booked seats of every BookedShowDetail as
+    a bitmap, one bit per seat in the screen layout order.
+
+    Entries are rebuilt from the seat ledger on a miss or after `ttl` seconds, so
+    another worker's writes become visible, and are updated in place by the
+    booking and cancellation paths once their transaction commits. An entry is
+    also rebuilt once a hold it counts expires, the seats of expired holds are
+    free whether or not the holds were swept yet. At most `max_entries` bitmaps
+    are kept, evicting the least recently used. A bitmap is only read with the
+    layout version it was built from.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[int, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[int, List[int], int, bool], None]] = []
+
+    def get(self, booked_show_id: int, screen_id: int) -> int:
+        return self.get_many([booked_show_id], screen_id)[booked_show_id]
+
+    def get_many(
+        self, booked_show_ids: Iterable[int], screen_id: int
+    ) -> Dict[int, int]:
+        return self.get_shows(dict.fromkeys(booked_show_ids, screen_id))
+
+    def get_shows(self, screen_ids: Dict[int, int]) -> Dict[int, int]:
+        """
+        Returns the bitmaps of the booked shows given as booked show id to screen
+        id, rebuilding the missing ones with one query
+        """
+        layouts = get_screen_layouts(screen_ids.values())
+        bitmaps = {}
+        missing = {}
+        now = time.monotonic()
+        with self._lock:
+            for booked_show_id, screen_id in screen_ids.items():
+                entry = self._entries.get(booked_show_id)
+                if (
+                    entry is None
+                    or now > entry[1]
+                    or entry[2] != layouts[screen_id].version
+                ):
+                    missing[booked_show_id] = screen_id
+                    continue
+                self._entries.move_to_end(booked_show_id)
+                bitmaps[booked_show_id] = entry[0]
+
+        if missing:
+            bitmaps.update(self._load(missing, layouts))
+        return bitmaps
+
+    def book(
+        self,
+        booked_show_id: int,
+        seat_ids: Iterable[int],
+        screen_id: int,
+        notify: bool = True,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        # held seats are given with the expiry of their hold
+        seat_ids = list(seat_ids)
+        self._update(booked_show_id, seat_ids, screen_id, True, expires_at)
+        if notify:
+            self._notify(booked_show_id, seat_ids, screen_id, booked=True)
+
+    def release(
+        self,
+        booked_show_id: int,
+        seat_ids: Iterable[int],
+        screen_id: int,
+        notify: bool = True,
+    ) -> None:
+        seat_ids = list(seat_ids)
+        self._update(booked_show_id, seat_ids, screen_id, False)
+        if notify:
+            self._notify(booked_show_id, seat_ids, screen_id, booked=False)
+
+    def add_listener(
+        self, listener: Callable[[int, List[int], int, bool], None]
+    ) -> None:
+        """
+        Calls `listener(booked_show_id, seat_ids, screen_id, booked)` for every
+        seat booked or released through the index
+        """
+        self._listeners.append(listener)
+
+    def invalidate(self, booked_show_id: int) -> None:
+        with self._lock:
+            self._entries.pop(booked_show_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def memory_usage(self) -> int:
+        with self._lock:
+            return sum(sys.getsizeof(entry[0]) for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _notify(
+        self, booked_show_id: int, seat_ids: List[int], screen_id: int, booked: bool
+    ) -> None:
+        for listener in self._listeners:
+            listener(booked_show_id, seat_ids, screen_id, booked)
+
+    def _update(
+        self,
+        booked_show_id: int,
+        seat_ids: List[int],
+        screen_id: int,
+        booked: bool,
+        expires_at: Optional[datetime] = None,
+    ) -> None:
+        layout = get_screen_layout(screen_id)
+        with self._lock:
+            entry = self._entries.get(booked_show_id)
+            if entry is None:
+                return
+            if entry[2] != layout.version or not layout.contains(seat_ids):
+                # built from another layout, rebuild it on the next read
+                del self._entries[booked_show_id]
+                return
+            mask = layout.mask(seat_ids)
+            bitmap = entry[0] | mask if booked else entry[0] & ~mask
+            stale_at = entry[1]
+            if expires_at is not None:
+                stale_at = min(stale_at, monotonic_deadline(expires_at))
+            self._entries[booked_show_id] = (bitmap, stale_at, entry[2])
+
+    def _load(
+        self, screen_ids: Dict[int, int], layouts: Dict[int, ScreenLayout]
+    ) -> Dict[int, int]:
+        loaded_at = time.monotonic()
+        bitmaps = dict.fromkeys(screen_ids, 0)
+        stale_at = dict.fromkeys(screen_ids, loaded_at + self.ttl)
+        # the seats of expired holds are left out, swept or not
+        booked_seats = (
+            BookedSeat.objects.filter(booked_show_id__in=screen_ids)
+            .filter(Q(hold__isnull=True) | Q(hold__expires_at__gt=timezone.now()))
+            .values_list("booked_show_id", "seat_id", "hold__expires_at")
+        )
+        for booked_show_id, seat_id, expires_at in booked_seats:
+            if expires_at is not None:
+                stale_at[booked_show_id] = min(
+                    stale_at[booked_show_id], monotonic_deadline(expires_at)
+                )
+            layout = layouts[screen_ids[booked_show_id]]
+            position = layout.positions.get(seat_id)
+            if position is None:
+                # a seat of another screen, booked before the show was moved or
+                # backfilled from such a booking, takes no seat of this layout
+                logger.warning(
+                    "seat %s of booked show %s is not in the layout of screen %s",
+                    seat_id,
+                    booked_show_id,
+                    layout.screen_id,
+                )
+                continue
+            bitmaps[booked_show_id] |= 1 << position
+
+        with self._lock:
+            for booked_show_id, bitmap in bitmaps.items():
+                version = layouts[screen_ids[booked_show_id]].version
+                self._entries[booked_show_id] = (
+                    bitmap,
+                    stale_at[booked_show_id],
+                    version,
+                )
+                self._entries.move_to_end(booked_show_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return bitmaps
+
+
+def monotonic_deadline(expires_at: datetime) -> float:
+    # the monotonic time at which a wall clock time is reached
+    return time.monotonic() + (expires_at - timezone.now()).total_seconds()
+
+
+seat_index = SeatAvailabilityIndex(
+    max_entries=settings.SEAT_INDEX_MAX_ENTRIES, ttl=settings.SEAT_INDEX_TTL
+)
@@ -0,0 +1,283 @@
+# Python imports
+import base64
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Django imports
+from django.conf import settings
+from django.core.cache import cache
+
+# Local imports
+from .models import Screen, Seat
+
+
+@dataclass(frozen=True)
+class ScreenLayout:
+    """
+    ScreenLayout: It stores the seats of a screen in bit order, row by row and
+    column by column, so neighbouring seats of a row are neighbouring bits
+
+    Fields:
+        screen_id (int): It stores the screen id
+        version (int): It stores the layout version of the screen
+        seat_ids (tuple): It stores the seat id of every bit position
+        seat_numbers (tuple): It stores the seat number of every bit position
+        seat_types (tuple): It stores the seat type of every bit position
+        raws (tuple): It stores the row number of every bit position
+        cols (tuple): It stores the column number of every bit position
+        positions (dict): It stores the bit position of every seat id
+        adjacent (int): It stores a bit for every seat whose next bit is the
+            seat right beside it in the same row
+        rows (tuple): It stores the (row number, row mask) of every row
+        type_masks (dict): It stores the mask of every seat type
+    """
+
+    screen_id: int
+    version: int
+    seat_ids: Tuple[int, ...]
+    seat_numbers: Tuple[str, ...]
+    seat_types: Tuple[str, ...]
+    raws: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    positions: Dict[int, int]
+    adjacent: int
+    rows: Tuple[Tuple[int, int], ...]
+    type_masks: Dict[str, int]
+
+    @classmethod
+    def from_seats(
+        cls, screen_id: int, seats: Iterable[Sequence], version: int = 1
+    ) -> "ScreenLayout":
+        seats = sorted(
+            (
+                (seat_id, seat_number, seat_type, int(raw), int(col))
+                for seat_id, seat_number, seat_type, raw, col in seats
+            ),
+            key=lambda seat: (seat[3], seat[4], seat[0]),
+        )
+
+        adjacent = 0
+        rows: Dict[int, int] = {}
+        type_masks: Dict[str, int] = {}
+        for position, (_, _, seat_type, raw, col) in enumerate(seats):
+            bit = 1 << position
+            rows[raw] = rows.get(raw, 0) | bit
+            type_masks[seat_type] = type_masks.get(seat_type, 0) | bit
+            if position + 1 < len(seats):
+                next_seat = seats[position + 1]
+                if next_seat[3] == raw and next_seat[4] == col + 1:
+                    adjacent |= bit
+
+        return cls(
+            screen_id=screen_id,
+            version=version,
+            seat_ids=tuple(seat[0] for seat in seats),
+            seat_numbers=tuple(seat[1] for seat in seats),
+            seat_types=tuple(seat[2] for seat in seats),
+            raws=tuple(seat[3] for seat in seats),
+            cols=tuple(seat[4] for seat in seats),
+            positions={seat[0]: position for position, seat in enumerate(seats)},
+            adjacent=adjacent,
+            rows=tuple(sorted(rows.items())),
+            type_masks=type_masks,
+        )
+
+    @property
+    def full_mask(self) -> int:
+        return (1 << len(self.seat_ids)) - 1
+
+    def mask(self, seat_ids: Iterable[int]) -> int:
+        bitmap = 0
+        for seat_id in seat_ids:
+            bitmap |= 1 << self.positions[seat_id]
+        return bitmap
+
+    def contains(self, seat_ids: Iterable[int]) -> bool:
+        return all(seat_id in self.positions for seat_id in seat_ids)
+
+    def free_seats(self, booked: int) -> List[dict]:
+        seats = []
+        for position in iter_bits(~booked & self.full_mask):
+            seats.append(
+                {
+                    "seat_number": self.seat_numbers[position],
+                    "type__seat_type": self.seat_types[position],
+                    "id": self.seat_ids[position],
+                }
+            )
+        return seats
+
+    @property
+    def key(self) -> str:
+        # every screen starts at version 1, the screen tells the layouts apart
+        return f"{self.screen_id}:{self.version}"
+
+    def seat_map(self, booked: int, with_layout: bool = True) -> dict:
+        """
+        Returns the compact seat map of the screen: the free seats as a base64
+        bitmap in layout order, bit 0 of the first byte being the first seat,
+        and the seat types as runs of [seat type, seat count]. The seats
+        themselves are only included with `with_layout`, for clients whose
+        layout is stale or of another screen.
+        """
+        free = ~booked & self.full_mask
+        size = (len(self.seat_ids) + 7) // 8
+        seat_map = {
+            "layout": {"screen": self.screen_id, "version": self.version},
+            "free": base64.b64encode(free.to_bytes(size, "little")).decode(),
+            "legend": self.type_runs(),
+        }
+        if with_layout:
+            seat_map["seats"] = {
+                "id": list(self.seat_ids),
+                "seat_number": list(self.seat_numbers),
+                "row": list(self.raws),
+                "column": list(self.cols),
+            }
+        return seat_map
+
+    def type_runs(self) -> List[list]:
+        runs: List[list] = []
+        for seat_type in self.seat_types:
+            if runs and runs[-1][0] == seat_type:
+                runs[-1][1] += 1
+            else:
+                runs.append([seat_type, 1])
+        return runs
+
+
+def iter_bits(bitmap: int) -> Iterable[int]:
+    while bitmap:
+        low_bit = bitmap & -bitmap
+        yield low_bit.bit_length() - 1
+        bitmap ^= low_bit
+
+
+class ScreenLayoutCache:
+    """
+    ScreenLayoutCache: It stores the layout of the most recently used screens
+    in process, backed by the shared Django cache.
+
+    A layout is immutable and stored under its screen's layout version, so a
+    shared entry never goes stale: editing a screen or its seat types bumps the
+    version and the next caller that knows the new version loads it again.
+    Callers without a version get the layout already in process.
+    """
+
+    def __init__(self, max_entries: int, timeout: int) -> None:
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries: "OrderedDict[int, ScreenLayout]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(
+        self,
+        screen_ids: Iterable[int],
+        versions: Optional[Dict[int, int]] = None,
+    ) -> Dict[int, ScreenLayout]:
+        versions = versions or {}
+        layouts = {}
+        missing = []
+        with self._lock:
+            for screen_id in set(screen_ids):
+                layout = self._entries.get(screen_id)
+                if layout is None or layout.version < versions.get(screen_id, 0):
+                    missing.append(screen_id)
+                    continue
+                self._entries.move_to_end(screen_id)
+                layouts[screen_id] = layout
+
+        if missing:
+            layouts.update(self._load(missing, versions))
+        return layouts
+
+    def invalidate(self, screen_id: Optional[int] = None) -> None:
+        with self._lock:
+            if screen_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(screen_id, None)
+
+    def _load(
+        self, screen_ids: List[int], versions: Dict[int, int]
+    ) -> Dict[int, ScreenLayout]:
+        # the shared cache answers for the screens whose version is known
+        unknown = [screen_id for screen_id in screen_ids if screen_id not in versions]
+        if unknown:
+            versions = {
+                **versions,
+                **dict(
+                    Screen.objects.filter(id__in=unknown).values_list(
+                        "id", "layout_version"
+                    )
+                ),
+            }
+        keys = {
+            screen_id: layout_cache_key(screen_id, versions.get(screen_id, 0))
+            for screen_id in screen_ids
+        }
+        shared = cache.get_many(keys.values())
+        layouts = {
+            screen_id: shared[key] for screen_id, key in keys.items() if key in shared
+        }
+
+        missing = [screen_id for screen_id in screen_ids if screen_id not in layouts]
+        if missing:
+            seats: Dict[int, list] = {screen_id: [] for screen_id in missing}
+            rows = Seat.objects.filter(type__screen_id__in=missing).values_list(
+                "type__screen_id", "id", "seat_number", "type__seat_type", "raw", "col"
+            )
+            for screen_id, *seat in rows:
+                seats[screen_id].append(seat)
+
+            loaded = {
+                screen_id: ScreenLayout.from_seats(
+                    screen_id, screen_seats, versions.get(screen_id, 0)
+                )
+                for screen_id, screen_seats in seats.items()
+            }
+            cache.set_many(
+                {keys[screen_id]: layout for screen_id, layout in loaded.items()},
+                self.timeout,
+            )
+            layouts.update(loaded)
+
+        with self._lock:
+            for screen_id, layout in layouts.items():
+                current = self._entries.get(screen_id)
+                if current is None or current.version <= layout.version:
+                    self._entries[screen_id] = layout
+                self._entries.move_to_end(screen_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return layouts
+
+
+def layout_cache_key(screen_id: int, version: int) -> str:
+    return f"movie:screen-layout:{screen_id}:{version}"
+
+
+layout_cache = ScreenLayoutCache(
+    max_entries=settings.SCREEN_LAYOUT_CACHE_SIZE,
+    timeout=settings.SCREEN_LAYOUT_CACHE_TIMEOUT,
+)
+
+
+def get_screen_layout(screen_id: int, version: Optional[int] = None) -> ScreenLayout:
+    versions = None if version is None else {screen_id: version}
+    return layout_cache.get_many([screen_id], versions)[screen_id]
+
+
+def get_screen_layouts(
+    screen_ids: Iterable[int], versions: Optional[Dict[int, int]] = None
+) -> Dict[int, ScreenLayout]:
+    """
+    Returns the layout of every screen, loading the missing ones at once
+    """
+    return layout_cache.get_many(screen_ids, versions)
+
+
+def invalidate_screen_layout(screen_id: Optional[int] = None) -> None:
+    layout_cache.invalidate(screen_id)
@@ -1,20 +1,36 @@
 # Python imports
-from datetime import timedelta
+from datetime import date, time
+from typing import List, Optional
+
+# Django imports
+from django.db import IntegrityError, models, transaction
 
 # External imports
 from rest_framework import serializers
 
 # Local imports
+from .booked_shows import materialize_window
+from .layout_import import LAYOUT_FORMATS
 from .models import (
+    BookedSeat,
     BookedShowDetail,
     Booking,
+    LayoutTemplate,
     Movie,
     Screen,
     ScreenSeatTypesMapping,
-    Seat,
+    SeatHold,
+    SeatType,
+    ShowCatalog,
     ShowDetail,
     ShowSeatPrice,
 )
+from .seat_index import seat_index
+from .seat_layout import get_screen_layout
+from .show_schedule import SHOW_CONFLICT_MESSAGE, is_show_conflict, overlapping_shows
+from .utils import adjust_show_seats, free_seats_by_show
+
+SHOW_SEATS_MESSAGE = "Seats of a show cannot be fewer than its booked seats"
 
 
 class SeatTypeSerializer(serializers.ModelSerializer):
@@ -32,15 +48,64 @@ class ScreenSerializer(serializers.ModelSerializer):
 
 
 class SeatSerializer(serializers.Serializer):
-    rows = serializers.IntegerField()
-    columns = serializers.IntegerField()
+    # row and column numbers are stored in up to three digits
+    rows = serializers.IntegerField(min_value=1, max_value=999)
+    columns = serializers.IntegerField(min_value=1, max_value=999)
     order = serializers.IntegerField()
     seat_type = serializers.CharField()
 
 
 class AddScreenSerializer(serializers.Serializer):
     screen_number = serializers.IntegerField()
-    seat_types = SeatSerializer(many=True)
+    seat_types = SeatSerializer(many=True, required=False)
+    # a screen is laid out either by its seat types or by a layout template
+    template = serializers.SlugRelatedField(
+        slug_field="name", queryset=LayoutTemplate.objects.all(), required=False
+    )
+
+    def validate_seat_types(self, seat_types: List[dict]) -> List[dict]:
+        if sum(seat_type["rows"] for seat_type in seat_types) > 999:
+            raise serializers.ValidationError("A screen has at most 999 rows")
+        return seat_types
+
+    def validate(self, data: dict) -> dict:
+        if ("seat_types" in data) == ("template" in data):
+            raise serializers.ValidationError(
+                "Either seat_types or template is required"
+            )
+        return data
+
+
+class LayoutTemplateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LayoutTemplate
+        fields = ["id", "name", "total_seat", "created_at"]
+        read_only_fields = ("id", "total_seat", "created_at")
+
+
+class ImportLayoutSerializer(serializers.Serializer):
+    screen_number = serializers.IntegerField()
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=LAYOUT_FORMATS, required=False)
+    template = serializers.CharField(max_length=100, required=False)
+
+    def validate_template(self, name: str) -> str:
+        if LayoutTemplate.objects.filter(name=name).exists():
+            raise serializers.ValidationError(
+                "A layout template with this name already exists"
+            )
+        return name
+
+    def validate(self, data: dict) -> dict:
+        # the format is told by the extension of the file unless it is given
+        if "format" not in data:
+            extension = data["file"].name.rsplit(".", 1)[-1].lower()
+            if extension not in LAYOUT_FORMATS:
+                raise serializers.ValidationError(
+                    {"format": f"One of {', '.join(LAYOUT_FORMATS)} is required"}
+                )
+            data["format"] = extension
+        return data
 
 
 class MovieSerializer(serializers.ModelSerializer):
@@ -50,6 +115,10 @@ class MovieSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
+class MovieSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=255)
+
+
 class UpdateShowSerializer(serializers.ModelSerializer):
     class Meta:
         model = ShowDetail
@@ -62,6 +131,7 @@ class UpdateShowSerializer(serializers.ModelSerializer):
             "available_seats",
             "start_date",
             "end_date",
+            "flash_sale",
         ]
         read_only_fields = ("id",)
         extra_kwargs = {
@@ -69,11 +139,68 @@ class UpdateShowSerializer(serializers.ModelSerializer):
             "start_time": {"required": False},
             "end_time": {"required": False},
             "screen": {"required": False},
-            "available_seats": {"required": False},
+            "available_seats": {"required": False, "min_value": 0},
             "start_date": {"required": False},
             "end_date": {"required": False},
+            "flash_sale": {"required": False},
         }
 
+    def validate(self, attrs) -> dict:
+        slot = {
+            field: attrs.get(field, getattr(self.instance, field))
+            for field in ["screen", "start_date", "end_date", "start_time", "end_time"]
+        }
+        if not set(slot) & set(attrs):
+            return attrs
+
+        if slot["start_time"] >= slot["end_time"]:
+            raise serializers.ValidationError("Start time must be before end time")
+        if slot["start_date"] > slot["end_date"]:
+            raise serializers.ValidationError("Start date must be before end date")
+        # the booked and held seats of the show are seats of its screen
+        if (
+            slot["screen"].id != self.instance.screen_id
+            and BookedSeat.objects.filter(
+                booked_show__show_detail=self.instance
+            ).exists()
+        ):
+            raise serializers.ValidationError(
+                "Screen of a show with bookings or holds cannot be changed"
+            )
+        if overlapping_shows(
+            slot["screen"].id,
+            slot["start_date"],
+            slot["end_date"],
+            slot["start_time"],
+            slot["end_time"],
+            exclude=self.instance.id,
+        ).exists():
+            raise serializers.ValidationError(SHOW_CONFLICT_MESSAGE)
+        return attrs
+
+    def update(self, instance: ShowDetail, validated_data: dict) -> ShowDetail:
+        # the seats are changed by the difference in the database, with the
+        # seats left of the show dates, instead of saving the row as read
+        available_seats = validated_data.pop("available_seats", None)
+        try:
+            with transaction.atomic():
+                for field, value in validated_data.items():
+                    setattr(instance, field, value)
+                instance.save(update_fields=list(validated_data))
+                if available_seats is not None and not adjust_show_seats(
+                    instance.id, available_seats - instance.available_seats
+                ):
+                    raise serializers.ValidationError(
+                        {"available_seats": [SHOW_SEATS_MESSAGE]}
+                    )
+        except IntegrityError as error:
+            if is_show_conflict(error):
+                raise serializers.ValidationError(SHOW_CONFLICT_MESSAGE) from error
+            raise
+        if available_seats is not None:
+            instance.available_seats = available_seats
+        return instance
+
 
 class ShowPricesSerializer(serializers.ModelSerializer):
     class Meta:
@@ -88,6 +215,40 @@ class BookedShowDetailSerializer(serializers.ModelSerializer):
         fields = ["id", "show_date", "available_seats", "show_detail"]
 
 
+class ShowDateSeatsSerializer(BookedShowDetailSerializer):
+    seats = serializers.SerializerMethodField()
+
+    class Meta(BookedShowDetailSerializer.Meta):
+        fields = BookedShowDetailSerializer.Meta.fields + ["seats"]
+
+    def get_seats(self, obj) -> list:
+        # the bitmap of this show date is kept up to date by bookings and holds
+        screen = obj.show_detail.screen
+        layout = get_screen_layout(screen.id, screen.layout_version)
+        return layout.free_seats(seat_index.get(obj.id, screen.id))
+
+
+class ShowDateSeatMapSerializer(BookedShowDetailSerializer):
+    def to_representation(self, instance) -> dict:
+        data = super().to_representation(instance)
+        screen = instance.show_detail.screen
+        layout = get_screen_layout(screen.id, screen.layout_version)
+        # the seats are left out for a client already holding this layout
+        with_layout = self.context.get("layout") != layout.key
+        booked = seat_index.get(instance.id, screen.id)
+        data.update(layout.seat_map(booked, with_layout=with_layout))
+        return data
+
+
+class ShowDetailListSerializer(serializers.ListSerializer):
+    def to_representation(self, data) -> list:
+        # compute the free seats of the whole page at once instead of per show
+        shows = list(data.all() if isinstance(data, models.Manager) else data)
+        if "seats" in self.child.fields:
+            self.context["free_seats"] = free_seats_by_show(shows)
+        return super().to_representation(shows)
+
+
 class ShowDetailSerializer(serializers.ModelSerializer):
     show_prices = ShowPricesSerializer(many=True)
     booked_show = BookedShowDetailSerializer(many=True, required=False)
@@ -114,20 +275,61 @@ class ShowDetailSerializer(serializers.ModelSerializer):
             "screen_number",
             "seats",
             "booked_show",
+            "flash_sale",
         ]
         read_only_fields = ("id", "title", "screen_number")
+        list_serializer_class = ShowDetailListSerializer
+        # nested or computed fields, only sent in a sparse fieldset when expanded
+        expandable_fields = ["show_prices", "seats", "booked_show"]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    @classmethod
+    def sparse_fields(cls, query_params) -> Optional[List[str]]:
+        """
+        Returns the fields asked for with ?fields= and ?expand=, or None for
+        every field when neither is given
+        """
+        if "fields" not in query_params and "expand" not in query_params:
+            return None
+
+        if "fields" in query_params:
+            fields = split_names(query_params["fields"])
+        else:
+            fields = [
+                field_name
+                for field_name in cls.Meta.fields
+                if field_name not in cls.Meta.expandable_fields
+            ]
+        expand = split_names(query_params.get("expand", ""))
+
+        unknown = set(fields) - set(cls.Meta.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": f"Unknown fields: {', '.join(sorted(unknown))}"}
+            )
+        unknown = set(expand) - set(cls.Meta.expandable_fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {"expand": f"Unknown fields: {', '.join(sorted(unknown))}"}
+            )
+        return [
+            field_name
+            for field_name in cls.Meta.fields
+            if field_name in fields or field_name in expand
+        ]
 
     def get_seats(self, obj) -> list:
         if isinstance(obj, ShowDetail):
-            booked_seat = Booking.objects.filter(showtime__id=obj.id).values_list(
-                "seats", flat=True
-            )
-            seats = (
-                Seat.objects.filter(type__screen=obj.screen)
-                .values("seat_number", "type__seat_type", "id")
-                .exclude(id__in=booked_seat)
-            )
-            return seats
+            free_seats = self.context.get("free_seats")
+            if free_seats is None or obj.id not in free_seats:
+                free_seats = free_seats_by_show([obj])
+            return free_seats[obj.id]
         return None
 
     def validate(self, attrs) -> dict:
@@ -144,17 +346,10 @@ class ShowDetailSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Start date must be before end date")
 
         # check in ShowDetail if any other show is ongoing in same time and same screen
-        show_detail = ShowDetail.objects.filter(
-            start_time__range=(start_time, end_time),
-            end_time__range=(start_time, end_time),
-            start_date__range=(start_date, end_date),
-            end_date__range=(start_date, end_date),
-            screen=attrs["screen"],
-        )
-        if show_detail:
-            raise serializers.ValidationError(
-                "Another show is ongoing in same time and same screen"
-            )
+        if overlapping_shows(
+            attrs["screen"].id, start_date, end_date, start_time, end_time
+        ).exists():
+            raise serializers.ValidationError(SHOW_CONFLICT_MESSAGE)
         return attrs
 
     def save(self) -> dict:
@@ -164,29 +359,78 @@ class ShowDetailSerializer(serializers.ModelSerializer):
         show_prices = validated_data.pop("show_prices")
 
         # create show detail
-        show_detail = ShowDetail.objects.create(
-            **validated_data, available_seats=available_seats
-        )
+        try:
+            with transaction.atomic():
+                show_detail = ShowDetail.objects.create(
+                    **validated_data, available_seats=available_seats
+                )
+        except IntegrityError as error:
+            if is_show_conflict(error):
+                raise serializers.ValidationError(SHOW_CONFLICT_MESSAGE) from error
+            raise
 
         # set show price for each type of seats
         for show_price in show_prices:
             ShowSeatPrice.objects.create(show_detail=show_detail, **show_price)
 
-        # get start and end day from show detail
-        show_start_date = show_detail.start_date
-        show_end_date = show_detail.end_date
-
-        # create booked show detail for each day
-        for day in range((show_end_date - show_start_date).days + 1):
-            BookedShowDetail.objects.create(
-                show_detail=show_detail,
-                show_date=show_start_date + timedelta(days=day),
-                available_seats=available_seats,
-            )
+        # only the dates of the coming days are created up front, the later
+        # ones are created when they are first booked or looked up
+        materialize_window(show_detail)
 
         return self.validated_data
 
 
+def split_names(names: str) -> List[str]:
+    return [name.strip() for name in names.split(",") if name.strip()]
+
+
+class ShowDetailFilterSerializer(serializers.Serializer):
+    movie = serializers.UUIDField(required=False)
+    screen = serializers.IntegerField(required=False)
+    date = serializers.DateField(required=False)
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    time_from = serializers.TimeField(required=False)
+    time_to = serializers.TimeField(required=False)
+
+    def validate(self, data: dict) -> dict:
+        # a single date is the range of that date alone
+        if "date" in data:
+            data["date_from"] = data["date_to"] = data.pop("date")
+        if data.get("date_from", date.min) > data.get("date_to", date.max):
+            raise serializers.ValidationError("Date from must be before date to")
+        if data.get("time_from", time.min) > data.get("time_to", time.max):
+            raise serializers.ValidationError("Time from must be before time to")
+        return data
+
+
+class ShowCatalogSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShowCatalog
+        fields = [
+            "booked_show",
+            "show_detail",
+            "movie",
+            "title",
+            "screen",
+            "screen_number",
+            "show_date",
+            "starts_at",
+            "ends_at",
+            "min_price",
+            "max_price",
+            "available_seats",
+            "platinum_seats",
+            "gold_seats",
+            "silver_seats",
+            "flash_sale",
+        ]
+
+
+class ShowCatalogFilterSerializer(serializers.Serializer):
+    movie = serializers.UUIDField(required=False)
+
+
 class UserShowDetailSerializer(serializers.ModelSerializer):
     available_seats = serializers.IntegerField(
         source="screen.total_seat", required=False
@@ -219,3 +463,42 @@ class BookingSerializer(serializers.ModelSerializer):
         model = Booking
         fields = ["seats", "show_time", "show_date"]
         read_only_fields = ("id", "show_time")
+
+
+class BookSeatsSerializer(serializers.Serializer):
+    seats = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+
+class CancelBookingSerializer(serializers.Serializer):
+    bookings = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    booked_show = serializers.IntegerField(required=False)
+
+    def validate(self, attrs) -> dict:
+        if "bookings" not in attrs and "booked_show" not in attrs:
+            raise serializers.ValidationError("Bookings or booked show is required")
+        return attrs
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    # the seats are checked against the cached screen layout, not the seat table
+    seats = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False
+    )
+
+    class Meta:
+        model = SeatHold
+        fields = ["id", "booked_show", "expires_at", "seats"]
+        read_only_fields = ("id", "booked_show", "expires_at")
+
+
+class ConfirmHoldSerializer(serializers.Serializer):
+    hold = serializers.IntegerField()
+
+
+class BestAvailableSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1)
+    seat_type = serializers.ChoiceField(choices=SeatType.choices, required=False)
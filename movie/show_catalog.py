@@ -0,0 +1,172 @@
+# Python imports
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Django imports
+from django.db import models
+from django.db.models import Case, F, Max, Min, Value, When
+from django.utils import timezone
+
+# Local imports
+from .models import (
+    BookedSeat,
+    BookedShowDetail,
+    Seat,
+    SeatType,
+    ShowCatalog,
+    ShowSeatPrice,
+)
+from .seat_layout import get_screen_layout
+
+# the seats left column of every seat type, other seat types only count in total
+SEAT_TYPE_FIELDS = {
+    SeatType.PLATINUM: "platinum_seats",
+    SeatType.GOLD: "gold_seats",
+    SeatType.SILVER: "silver_seats",
+}
+
+
+def show_datetime(show_date, show_time) -> datetime:
+    return timezone.make_aware(datetime.combine(show_date, show_time))
+
+
+def today() -> str:
+    return timezone.localdate().isoformat()
+
+
+def refresh_show_catalog(
+    show_detail_ids: Iterable[int], show_dates: Optional[Iterable[date]] = None
+) -> int:
+    """
+    Rebuilds the catalog rows of every date of the shows, or of the given dates
+    alone, from the scheduling, pricing and booking tables, with a fixed number
+    of queries
+    """
+    show_detail_ids = list(show_detail_ids)
+    booked_shows = BookedShowDetail.objects.filter(show_detail_id__in=show_detail_ids)
+    if show_dates is not None:
+        booked_shows = booked_shows.filter(show_date__in=list(show_dates))
+    booked_shows = list(
+        booked_shows.select_related("show_detail__movie", "show_detail__screen").defer(
+            "show_detail__movie__description"
+        )
+    )
+    if not booked_shows:
+        return 0
+
+    prices = {
+        price["show_detail_id"]: (price["min_price"], price["max_price"])
+        for price in ShowSeatPrice.objects.filter(show_detail_id__in=show_detail_ids)
+        .values("show_detail_id")
+        .annotate(min_price=Min("price"), max_price=Max("price"))
+    }
+    booked: Dict[int, Counter] = defaultdict(Counter)
+    for booked_seat in (
+        BookedSeat.objects.filter(booked_show__in=booked_shows, booking__isnull=False)
+        .values("booked_show_id", "seat__type__seat_type")
+        .annotate(count=models.Count("id"))
+    ):
+        booked[booked_seat["booked_show_id"]][
+            booked_seat["seat__type__seat_type"]
+        ] = booked_seat["count"]
+
+    # counted from the seat table, a layout being edited is not cached here
+    seats: Dict[int, Counter] = defaultdict(Counter)
+    for seat in (
+        Seat.objects.filter(
+            type__screen_id__in={
+                booked_show.show_detail.screen_id for booked_show in booked_shows
+            }
+        )
+        .values("type__screen_id", "type__seat_type")
+        .annotate(count=models.Count("id"))
+    ):
+        seats[seat["type__screen_id"]][seat["type__seat_type"]] = seat["count"]
+
+    catalog = []
+    for booked_show in booked_shows:
+        show_detail = booked_show.show_detail
+        min_price, max_price = prices.get(show_detail.id, (None, None))
+        seats_left = {
+            field: seats[show_detail.screen_id][seat_type]
+            - booked[booked_show.id][seat_type]
+            for seat_type, field in SEAT_TYPE_FIELDS.items()
+        }
+        catalog.append(
+            ShowCatalog(
+                booked_show=booked_show,
+                show_detail=show_detail,
+                movie_id=show_detail.movie_id,
+                title=show_detail.movie.title,
+                screen_id=show_detail.screen_id,
+                screen_number=show_detail.screen.screen_number,
+                show_date=booked_show.show_date,
+                starts_at=show_datetime(booked_show.show_date, show_detail.start_time),
+                ends_at=show_datetime(booked_show.show_date, show_detail.end_time),
+                min_price=min_price,
+                max_price=max_price,
+                available_seats=booked_show.available_seats,
+                flash_sale=show_detail.flash_sale,
+                **seats_left,
+            )
+        )
+
+    ShowCatalog.objects.bulk_create(
+        catalog,
+        update_conflicts=True,
+        unique_fields=["booked_show"],
+        update_fields=[
+            field.name
+            for field in ShowCatalog._meta.concrete_fields
+            if not field.primary_key
+        ],
+    )
+    return len(catalog)
+
+
+def seat_type_counts(screen_id: int, seat_ids: Iterable[int]) -> Counter:
+    layout = get_screen_layout(screen_id)
+    return Counter(
+        layout.seat_types[layout.positions[seat_id]]
+        for seat_id in seat_ids
+        if seat_id in layout.positions
+    )
+
+
+def adjust_catalog_seats(seats: Dict[int, Tuple[int, List[int]]], booked: bool) -> None:
+    """
+    Takes the booked seats out of the seats left of the catalog rows, or gives
+    the released ones back, given as booked show id to (screen id, seat ids),
+    with one UPDATE for all of them
+    """
+    if not seats:
+        return
+    sign = -1 if booked else 1
+    counts = {
+        booked_show_id: seat_type_counts(screen_id, seat_ids)
+        for booked_show_id, (screen_id, seat_ids) in seats.items()
+    }
+
+    def change(seat_types: Iterable[str]) -> Case:
+        return Case(
+            *[
+                When(
+                    booked_show_id=booked_show_id,
+                    then=Value(
+                        sign * sum(count[seat_type] for seat_type in seat_types)
+                    ),
+                )
+                for booked_show_id, count in counts.items()
+            ],
+            default=Value(0),
+            output_field=models.IntegerField(),
+        )
+
+    ShowCatalog.objects.filter(booked_show_id__in=counts).update(
+        available_seats=F("available_seats") + change(SeatType.values),
+        **{
+            field: F(field) + change([seat_type])
+            for seat_type, field in SEAT_TYPE_FIELDS.items()
+        },
+    )
@@ -0,0 +1,105 @@
+# Python imports
+from datetime import date, time
+from typing import Optional, Tuple
+
+# Django imports
+from django.contrib.postgres.fields import (
+    BigIntegerRangeField,
+    DateRangeField,
+    DateTimeRangeField,
+)
+from django.db import IntegrityError, connection, models
+from django.db.models import ExpressionWrapper, F, Func, QuerySet, Value
+from django.db.models.functions import Cast
+
+# Local imports
+from .models import ShowDetail
+
+# the exclusion constraint of migration 0016, built on show_slot() of the
+# columns, a probe with the same expressions is answered by its GiST index
+SHOW_SLOT_CONSTRAINT = "show_detail_slot_excl"
+SHOW_CONFLICT_MESSAGE = "Another show is ongoing in same time and same screen"
+# time has no range type, the times of day are laid on this one day
+SLOT_DAY = "2000-01-01"
+
+
+class Int8Range(Func):
+    function = "int8range"
+    output_field = BigIntegerRangeField()
+
+
+class DateRange(Func):
+    function = "daterange"
+    output_field = DateRangeField()
+
+
+class TimestampRange(Func):
+    # tsrange, without a time zone the expression can be indexed
+    function = "tsrange"
+    output_field = DateTimeRangeField()
+
+
+def time_of_day(time_expression) -> ExpressionWrapper:
+    return ExpressionWrapper(
+        Cast(Value(SLOT_DAY), models.DateField()) + time_expression,
+        output_field=models.DateTimeField(),
+    )
+
+
+def show_slot(screen, start_date, end_date, start_time, end_time) -> Tuple[Func, ...]:
+    """
+    Returns the ranges two shows of one screen may not both overlap in, the
+    screen as a range of one id, every date from start to end date and the
+    time of day from start time up to end time
+    """
+    return (
+        Int8Range(screen, screen, Value("[]")),
+        DateRange(start_date, end_date, Value("[]")),
+        TimestampRange(time_of_day(start_time), time_of_day(end_time)),
+    )
+
+
+def overlapping_shows(
+    screen_id: int,
+    start_date: date,
+    end_date: date,
+    start_time: time,
+    end_time: time,
+    exclude: Optional[int] = None,
+) -> QuerySet:
+    """
+    Returns the shows of the screen running on any of the dates at any time
+    of day between start and end time
+    """
+    shows = ShowDetail.objects.all()
+    if exclude is not None:
+        shows = shows.exclude(id=exclude)
+    if connection.vendor != "postgresql":
+        return shows.filter(
+            screen_id=screen_id,
+            start_date__lte=end_date,
+            end_date__gte=start_date,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
+        )
+
+    screens, dates, times = show_slot(
+        F("screen"), F("start_date"), F("end_date"), F("start_time"), F("end_time")
+    )
+    probe = show_slot(
+        Value(screen_id),
+        Value(start_date),
+        Value(end_date),
+        Value(start_time),
+        Value(end_time),
+    )
+    return shows.alias(screens=screens, dates=dates, times=times).filter(
+        screens__overlap=probe[0], dates__overlap=probe[1], times__overlap=probe[2]
+    )
+
+
+def is_show_conflict(error: IntegrityError) -> bool:
+    # a show written alongside another of the same slot is caught by the
+    # exclusion constraint once its checks passed
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == SHOW_SLOT_CONSTRAINT
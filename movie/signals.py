@@ -0,0 +1,75 @@
+# Django imports
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Local imports
+from .catalog_cache import SURROGATE_KEYS, object_key, table_changed
+from .models import (
+    BookedShowDetail,
+    Movie,
+    Screen,
+    ScreenSeatTypesMapping,
+    ShowCatalog,
+    ShowDetail,
+    ShowSeatPrice,
+)
+from .seat_layout import invalidate_screen_layout, layout_cache_key
+from .show_catalog import refresh_show_catalog
+
+
+def bump_layout_version(screen_id: int) -> None:
+    # other workers see the new version with the screen row and reload the layout
+    Screen.objects.filter(id=screen_id).update(layout_version=F("layout_version") + 1)
+    transaction.on_commit(lambda: invalidate_screen_layout(screen_id))
+
+
+@receiver(post_save, sender=Screen)
+def screen_saved(sender, instance, created, **kwargs) -> None:
+    if not created:
+        bump_layout_version(instance.id)
+        ShowCatalog.objects.filter(screen=instance).update(
+            screen_number=instance.screen_number
+        )
+
+
+@receiver(post_delete, sender=Screen)
+def screen_deleted(sender, instance, **kwargs) -> None:
+    cache.delete(layout_cache_key(instance.id, instance.layout_version))
+    transaction.on_commit(lambda: invalidate_screen_layout(instance.id))
+
+
+@receiver(post_save, sender=ScreenSeatTypesMapping)
+@receiver(post_delete, sender=ScreenSeatTypesMapping)
+def screen_seat_type_changed(sender, instance, **kwargs) -> None:
+    bump_layout_version(instance.screen_id)
+    # the seats left of every seat type follow the layout
+    refresh_show_catalog(
+        ShowDetail.objects.filter(screen_id=instance.screen_id).values_list(
+            "id", flat=True
+        )
+    )
+
+
+@receiver(post_save, sender=Movie)
+def movie_saved(sender, instance, created, **kwargs) -> None:
+    if not created:
+        ShowCatalog.objects.filter(movie=instance).update(title=instance.title)
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+@receiver(post_save, sender=Screen)
+@receiver(post_delete, sender=Screen)
+@receiver(post_save, sender=ScreenSeatTypesMapping)
+@receiver(post_delete, sender=ScreenSeatTypesMapping)
+@receiver(post_save, sender=ShowDetail)
+@receiver(post_delete, sender=ShowDetail)
+@receiver(post_save, sender=ShowSeatPrice)
+@receiver(post_delete, sender=ShowSeatPrice)
+@receiver(post_save, sender=BookedShowDetail)
+@receiver(post_delete, sender=BookedShowDetail)
+def catalog_changed(sender, instance, **kwargs) -> None:
+    table_changed(sender, [SURROGATE_KEYS[sender], object_key(instance)])
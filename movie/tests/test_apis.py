@@ -1,9 +1,65 @@
+# Python imports
+import asyncio
+import base64
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+# Django imports
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
 # External imports
 from rest_framework import status
+from rest_framework.test import APIClient
 
 # App imports
+from movie.flash_sale import FlashSaleBatchError, FlashSaleQueue, _queues
+from movie.models import (
+    BookedSeat,
+    BookedShowDetail,
+    Booking,
+    IdempotencyKey,
+    LayoutTemplate,
+    Screen,
+    ScreenSeatTypesMapping,
+    Seat,
+    SeatHold,
+    ShowCatalog,
+    ShowDetail,
+    TableVersion,
+)
+from movie.search import trigram_enabled
+from movie.seat_events import (
+    LISTENER_LOCK,
+    remote_seats_changed,
+    seat_event_broker,
+    seats_changed,
+)
+from movie.seat_index import SeatAvailabilityIndex, seat_index
+from movie.seat_layout import get_screen_layout, invalidate_screen_layout
+from movie.show_schedule import is_show_conflict
+from movie.utils import delete_seat_holds
+from movie.views import ShowCatalogPagination
 from tests.test_helpers.constants import DEFAULT_DATABASE
-from tests.test_helpers.testing import APIBaseTestCase
+from tests.test_helpers.model_factory import (
+    new_booked_show_detail,
+    new_movie,
+    new_screen,
+    new_screen_seat_types_mappings,
+    new_seats,
+    new_show_detail,
+)
+from tests.test_helpers.testing import APIBaseTestCase, APIBaseTransactionTestCase
 
 # Local imports
 from .logger import TestingLogger as Logger
@@ -52,6 +108,269 @@ class ScreenAPITestCase(APIBaseTestCase):
 
         self.screen_id = response["id"]
 
+    def test_create_screen_seat_numbering(self) -> None:
+        """
+        testcase for the rows, columns and labels of the seats of a new screen.
+        """
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            "/api/v1/screen/",
+            data={
+                "screen_number": 2,
+                "seat_types": [
+                    {"seat_type": "GOLD", "rows": 25, "columns": 12, "order": 2},
+                    {"seat_type": "SILVER", "rows": 2, "columns": 3, "order": 1},
+                ],
+            },
+            headers=headers,
+            format="json",
+        )
+        Logger.info(
+            {
+                "message": "create screen with numbered seats",
+                "response": response.content,
+                "event": "test_create_screen_seat_numbering",
+            }
+        )
+        seats = Seat.objects.filter(type__screen_id=response.json()["id"])
+        labels = {
+            (int(seat.raw), int(seat.col)): (seat.seat_number, seat.type.seat_type)
+            for seat in seats.select_related("type")
+        }
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(labels), 306)
+        self.assertEqual(len({label for label, _ in labels.values()}), 306)
+        self.assertEqual(labels[1, 1], ("A1", "SILVER"))
+        self.assertEqual(labels[2, 3], ("B3", "SILVER"))
+        self.assertEqual(labels[3, 1], ("C1", "GOLD"))
+        self.assertEqual(labels[26, 12], ("Z12", "GOLD"))
+        self.assertEqual(labels[27, 1], ("AA1", "GOLD"))
+        self.assertEqual(max(labels), (27, 12))
+
+    def screen_seats(self, screen_id: int) -> dict:
+        seats = Seat.objects.filter(type__screen_id=screen_id).select_related("type")
+        return {
+            (int(seat.raw), int(seat.col)): (seat.seat_number, seat.type.seat_type)
+            for seat in seats
+        }
+
+    @override_settings(LAYOUT_IMPORT_BATCH_SIZE=3)
+    def test_import_screen_layout(self) -> None:
+        """
+        testcase for the importing a screen layout with aisles and uneven rows.
+        """
+        layout = (
+            "row,column,seat_type,seat_number\n"
+            "1,1,GOLD,\n"
+            "1,2,GOLD,\n"
+            "1,4,GOLD,\n"
+            "1,5,GOLD,\n"
+            "2,2,platinum,\n"
+            "2,3,PLATINUM,\n"
+            "2,4,PLATINUM,BOX1\n"
+        )
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            "/api/v1/screen/import/",
+            data={
+                "screen_number": 2,
+                "template": "aisle",
+                "file": SimpleUploadedFile("layout.csv", layout.encode()),
+            },
+            headers=headers,
+            format="multipart",
+        )
+        Logger.info(
+            {
+                "message": "import screen layout",
+                "response": response.content,
+                "event": "test_import_screen_layout",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["total_seat"], 7)
+        self.assertEqual(len(response["seat_type"]), 2)
+        self.assertEqual(
+            self.screen_seats(response["id"]),
+            {
+                (1, 1): ("A1", "GOLD"),
+                (1, 2): ("A2", "GOLD"),
+                (1, 4): ("A4", "GOLD"),
+                (1, 5): ("A5", "GOLD"),
+                (2, 2): ("B2", "PLATINUM"),
+                (2, 3): ("B3", "PLATINUM"),
+                (2, 4): ("BOX1", "PLATINUM"),
+            },
+        )
+        self.assertEqual(LayoutTemplate.objects.get(name="aisle").seats.count(), 7)
+
+    def test_import_screen_layout_invalid_line(self) -> None:
+        """
+        testcase for the importing a screen layout with a seat given twice.
+        """
+        layout = (
+            '{"row": 1, "column": 1, "seat_type": "GOLD"}\n'
+            '{"row": 1, "column": 2, "seat_type": "GOLD"}\n'
+            '{"row": 1, "column": 1, "seat_type": "SILVER"}\n'
+        )
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            "/api/v1/screen/import/",
+            data={
+                "screen_number": 2,
+                "template": "broken",
+                "file": SimpleUploadedFile("layout.jsonl", layout.encode()),
+            },
+            headers=headers,
+            format="multipart",
+        )
+        Logger.info(
+            {
+                "message": "import invalid screen layout",
+                "response": response.content,
+                "event": "test_import_screen_layout_invalid_line",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["message"], "Line 3: row 1 column 1 is given twice"
+        )
+        self.assertFalse(Screen.objects.filter(screen_number=2).exists())
+        self.assertFalse(LayoutTemplate.objects.exists())
+
+    def test_import_screen_layout_seat_numbers(self) -> None:
+        """
+        testcase for the importing a screen layout with unusual seat numbers.
+        """
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        seat_numbers = ["A\\1", 'B,"2"', "C\\N"]
+        layout = "".join(
+            json.dumps(
+                {"row": 1, "column": column, "seat_type": "GOLD", "seat_number": number}
+            )
+            + "\n"
+            for column, number in enumerate(seat_numbers, 1)
+        )
+        response = self.client.post(
+            "/api/v1/screen/import/",
+            data={
+                "screen_number": 2,
+                "file": SimpleUploadedFile("layout.jsonl", layout.encode()),
+            },
+            headers=headers,
+            format="multipart",
+        )
+        Logger.info(
+            {
+                "message": "import screen layout with unusual seat numbers",
+                "response": response.content,
+                "event": "test_import_screen_layout_seat_numbers",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            self.screen_seats(response.json()["id"]),
+            {
+                (1, column): (number, "GOLD")
+                for column, number in enumerate(seat_numbers, 1)
+            },
+        )
+
+        # a tab or a line break of a seat number is refused
+        layout = json.dumps(
+            {"row": 1, "column": 1, "seat_type": "GOLD", "seat_number": "A\t1"}
+        )
+        response = self.client.post(
+            "/api/v1/screen/import/",
+            data={
+                "screen_number": 3,
+                "file": SimpleUploadedFile("layout.jsonl", layout.encode()),
+            },
+            headers=headers,
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["message"], "Line 1: seat number has control characters"
+        )
+
+    def test_import_screen_layout_command(self) -> None:
+        """
+        testcase for the importing a screen layout from a file.
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as layout:
+            layout.write("row,column,seat_type\n3,1,SILVER\n3,2,SILVER\n")
+            layout.flush()
+            out = StringIO()
+            call_command(
+                "import_screen_layout", layout.name, "--screen-number=2", stdout=out
+            )
+
+        screen = Screen.objects.get(screen_number=2)
+        self.assertEqual(out.getvalue(), "Created screen 2 with 2 seats\n")
+        self.assertEqual(
+            self.screen_seats(screen.id),
+            {(3, 1): ("C1", "SILVER"), (3, 2): ("C2", "SILVER")},
+        )
+
+    def test_create_screen_from_template(self) -> None:
+        """
+        testcase for the saving a screen as a layout template and cloning it.
+        """
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            f"/api/v1/screen/{self.screen.id}/template/",
+            data={"name": "standard"},
+            headers=headers,
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["total_seat"], 75)
+
+        response = self.client.get("/api/v1/screen/template/", headers=headers)
+        self.assertEqual([t["name"] for t in response.json()], ["standard"])
+
+        response = self.client.post(
+            "/api/v1/screen/",
+            data={"screen_number": 2, "template": "standard"},
+            headers=headers,
+            format="json",
+        )
+        Logger.info(
+            {
+                "message": "create screen from template",
+                "response": response.content,
+                "event": "test_create_screen_from_template",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response["total_seat"], 75)
+        self.assertEqual(len(response["seat_type"]), 3)
+        self.assertEqual(
+            self.screen_seats(response["id"]), self.screen_seats(self.screen.id)
+        )
+
+        response = self.client.post(
+            "/api/v1/screen/",
+            data={
+                "screen_number": 3,
+                "template": "standard",
+                "seat_types": [
+                    {"seat_type": "GOLD", "rows": 1, "columns": 1, "order": 1}
+                ],
+            },
+            headers=headers,
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_create_screen_as_user_type(self) -> None:
         """
         testcase for the adding screen as user type.
@@ -100,9 +419,9 @@ class ScreenAPITestCase(APIBaseTestCase):
         response, status_code = response.json(), response.status_code
 
         self.assertEqual(status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response), 1)
-        self.assertEqual(response[0]["screen_number"], 1)
-        self.assertEqual(response[0]["total_seat"], 75)
+        self.assertEqual(len(response["results"]), 1)
+        self.assertEqual(response["results"][0]["screen_number"], 1)
+        self.assertEqual(response["results"][0]["total_seat"], 75)
 
     def test_list_screen_as_user_type(self) -> None:
         """
@@ -121,9 +440,9 @@ class ScreenAPITestCase(APIBaseTestCase):
         response, status_code = response.json(), response.status_code
 
         self.assertEqual(status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response), 1)
-        self.assertEqual(response[0]["screen_number"], 1)
-        self.assertEqual(response[0]["total_seat"], 75)
+        self.assertEqual(len(response["results"]), 1)
+        self.assertEqual(response["results"][0]["screen_number"], 1)
+        self.assertEqual(response["results"][0]["total_seat"], 75)
 
     def test_delete_screen_as_owner(self) -> None:
         """
@@ -254,7 +573,7 @@ class MovieAPITestCase(APIBaseTestCase):
         data, status_code = response.json(), response.status_code
 
         self.assertEqual(status_code, status.HTTP_200_OK)
-        self.assertEqual(len(data), 1)
+        self.assertEqual(len(data["results"]), 1)
 
     def test_list_movie_as_user_type(self) -> None:
         """
@@ -273,7 +592,127 @@ class MovieAPITestCase(APIBaseTestCase):
         response, status_code = response.json(), response.status_code
 
         self.assertEqual(status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response), 1)
+        self.assertEqual(len(response["results"]), 1)
+
+    def test_list_movie_not_modified(self) -> None:
+        """
+        testcase for the conditional list of movie.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.get("/api/v1/movie/", headers=headers)
+        etag = response["ETag"]
+        not_modified = self.client.get(
+            "/api/v1/movie/", headers={**headers, "If-None-Match": etag}
+        )
+        Logger.info(
+            {
+                "message": "get unchanged list of movie",
+                "response": not_modified.content,
+                "event": "test_list_movie_not_modified",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Surrogate-Key"], "movie")
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified.content, b"")
+        self.assertEqual(not_modified["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(
+                f"/api/v1/movie/{self.movie.id}/",
+                {
+                    "title": "updated movie",
+                    "description": "updated description",
+                    "release_date": "2020-01-01",
+                },
+                headers={"Authorization": f"Token {self.owner_token}"},
+            )
+        modified = self.client.get(
+            "/api/v1/movie/", headers={**headers, "If-None-Match": etag}
+        )
+        detail = self.client.get(f"/api/v1/movie/{self.movie.id}/", headers=headers)
+
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(modified["ETag"], etag)
+        self.assertEqual(modified.json()["results"][0]["title"], "updated movie")
+        self.assertEqual(detail["Surrogate-Key"], f"movie:{self.movie.id}")
+
+    def test_search_movie(self) -> None:
+        """
+        testcase for the search of movie by title and description.
+        """
+        new_movie(
+            DEFAULT_DATABASE,
+            "The Dark Knight",
+            "batman fights the joker in gotham",
+            "2008-07-18",
+        )
+        new_movie(DEFAULT_DATABASE, "Inception", "a thief inside dreams", "2010-07-16")
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.get("/api/v1/movie/search/?q=knight", headers=headers)
+        described = self.client.get("/api/v1/movie/search/?q=joker", headers=headers)
+        Logger.info(
+            {
+                "message": "search movie",
+                "response": response.content,
+                "event": "test_search_movie",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Surrogate-Key"], "movie")
+        self.assertEqual(
+            [movie["title"] for movie in response.json()["results"]],
+            ["The Dark Knight"],
+        )
+        self.assertEqual(described.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [movie["title"] for movie in described.json()["results"]],
+            ["The Dark Knight"],
+        )
+
+    def test_search_movie_misspelled(self) -> None:
+        """
+        testcase for the search of movie with a typo in the title.
+        """
+        if connection.vendor == "postgresql" and not trigram_enabled():
+            self.skipTest("typo matching needs the pg_trgm extension")
+        new_movie(DEFAULT_DATABASE, "Inception", "a thief inside dreams", "2010-07-16")
+        response = self.client.get(
+            "/api/v1/movie/search/?q=incepton",
+            headers={"Authorization": f"Token {self.user_token}"},
+        )
+        Logger.info(
+            {
+                "message": "search movie with typo",
+                "response": response.content,
+                "event": "test_search_movie_misspelled",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"][0]["title"], "Inception")
+
+    def test_search_movie_without_query(self) -> None:
+        """
+        testcase for the search of movie without a query.
+        """
+        response = self.client.get(
+            "/api/v1/movie/search/?q=",
+            headers={"Authorization": f"Token {self.user_token}"},
+        )
+        Logger.info(
+            {
+                "message": "search movie without query",
+                "response": response.content,
+                "event": "test_search_movie_without_query",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("q", response.json())
 
     def test_update_movie_as_owner(self) -> None:
         """
@@ -497,95 +936,621 @@ class ScreenSeatTypeAPITestCase(APIBaseTestCase):
 
         self.assertEqual(status_code, status.HTTP_200_OK)
 
-    def test_update_show_seat_price_as_owner(self) -> None:
+    def test_list_show_not_modified_until_booking(self) -> None:
         """
-        testcase for the update of show seat price.
+        testcase for the conditional list of show after a booking.
         """
-        headers = {"Authorization": f"Token {self.owner_token}"}
-        response = self.client.put(
-            f"/api/v1/show/{self.show_detail.id}/price/{self.show_seat_prices[0].id}/",
-            {"price": 220},
-            headers=headers,
-        )
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.get("/api/v1/show/list/", headers=headers)
+        etag = response["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get(
+                "/api/v1/show/list/", headers={**headers, "If-None-Match": etag}
+            )
         Logger.info(
             {
-                "message": "update show seat_price as owner ",
-                "response": response.content,
-                "event": "test_update_show_seat_price_as_owner",
+                "message": "get unchanged list of show",
+                "response": not_modified.content,
+                "event": "test_list_show_not_modified_until_booking",
             }
         )
-        response, status_code = response.json(), response.status_code
 
-        self.assertEqual(status_code, status.HTTP_200_OK)
-        self.assertEqual(response["message"], "Price updated successfully")
-        self.assertEqual(int(response["price"]), 220)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertFalse(
+            [query for query in queries if 'FROM "movie_showdetail"' in query["sql"]]
+        )
+        self.assertEqual(response["Surrogate-Key"], "show movie screen")
+
+        booked_show = BookedShowDetail.objects.get(show_detail=self.show_detail)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = self.client.post(
+                f"/api/v1/show/detail/{booked_show.id}/book/",
+                {"seats": [self.seats[0].id]},
+                headers=headers,
+            )
+        modified = self.client.get(
+            "/api/v1/show/list/", headers={**headers, "If-None-Match": etag}
+        )
 
-    def test_update_show_seat_price_as_user_type(self) -> None:
+        self.assertEqual(booking.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(modified.json()["results"][0]["seats"]), 74)
+
+    def test_list_show_seat_version_coalesced(self) -> None:
         """
-        testcase for the update of show seat price as user type.
+        testcase for the seat ledger version bumped once for close bookings.
         """
         headers = {"Authorization": f"Token {self.user_token}"}
-        response = self.client.put(
-            f"/api/v1/show/{self.show_detail.id}/price/{self.show_seat_prices[0].id}/",
-            {"price": 220},
-            headers=headers,
+        booked_show = BookedShowDetail.objects.get(show_detail=self.show_detail)
+        for seat in self.seats[:2]:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    f"/api/v1/show/detail/{booked_show.id}/book/",
+                    {"seats": [seat.id]},
+                    headers=headers,
+                )
+        seat_version = TableVersion.objects.filter(table=BookedSeat._meta.db_table)
+
+        self.assertEqual(seat_version.get().version, 1)
+
+        # the second booking is not counted yet, no response is not modified
+        etag = self.client.get("/api/v1/show/list/", headers=headers)["ETag"]
+        response = self.client.get(
+            "/api/v1/show/list/", headers={**headers, "If-None-Match": etag}
         )
         Logger.info(
             {
-                "message": "update show seat_price as user ",
+                "message": "get list of show right after bookings",
                 "response": response.content,
-                "event": "test_update_show_seat_price_as_user_type",
+                "event": "test_list_show_seat_version_coalesced",
             }
         )
-        status_code = response.status_code
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["results"][0]["seats"]), 73)
 
-        self.assertEqual(status_code, status.HTTP_403_FORBIDDEN)
-        self.assertEqual(
-            response.data["detail"],
-            "You do not have permission to perform this action.",
+        seat_version.update(updated_at=timezone.now() - timedelta(minutes=1))
+        etag = self.client.get("/api/v1/show/list/", headers=headers)["ETag"]
+        response = self.client.get(
+            "/api/v1/show/list/", headers={**headers, "If-None-Match": etag}
         )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
 
-    def test_update_show_detail_as_owner(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/v1/show/detail/{booked_show.id}/book/",
+                {"seats": [self.seats[2].id]},
+                headers=headers,
+            )
+        self.assertEqual(seat_version.get().version, 2)
+
+    def test_list_show_sparse_fields(self) -> None:
         """
-        testcase for the update of show detail.
+        testcase for the list of show with only the asked fields.
         """
-        headers = {"Authorization": f"Token {self.owner_token}"}
-        response = self.client.put(
-            f"/api/v1/show/detail/{self.show_detail.id}/",
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/v1/show/list/?fields=id,title,start_time,end_time,screen",
+                headers=headers,
+            )
+        Logger.info(
             {
-                "movie": self.movie.id,
-                "start_time": "09:00",
-                "end_time": "12:00",
-                "screen": self.screen.id,
-                "start_date": "2031-12-01",
-                "end_date": "2031-12-31",
-            },
-            headers=headers,
+                "message": "get list of show with sparse fields",
+                "response": response.content,
+                "event": "test_list_show_sparse_fields",
+            }
         )
+        shows = response.json()["results"]
+        sql = " ".join(query["sql"] for query in queries)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(shows[0]), ["id", "start_time", "end_time", "screen", "title"]
+        )
+        self.assertNotIn('FROM "movie_showseatprice"', sql)
+        self.assertNotIn('FROM "movie_bookedshowdetail"', sql)
+        self.assertNotIn("description", sql)
+        self.assertNotIn("end_date", sql)
+
+    def test_list_show_expand_fields(self) -> None:
+        """
+        testcase for the list of show with expanded fields.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.get("/api/v1/show/list/?expand=seats", headers=headers)
         Logger.info(
             {
-                "message": "update show_detail as owner ",
+                "message": "get list of show with expanded seats",
                 "response": response.content,
-                "event": "test_update_show_detail_as_owner",
+                "event": "test_list_show_expand_fields",
             }
         )
-        response, status_code = response.json(), response.status_code
+        show = response.json()["results"][0]
 
-        self.assertEqual(status_code, status.HTTP_200_OK)
-        self.assertEqual(response["movie"], str(self.movie.id))
-        self.assertEqual(response["start_time"], "09:00:00")
-        self.assertEqual(response["end_time"], "12:00:00")
-        self.assertEqual(response["screen"], self.screen.id)
-        self.assertEqual(response["start_date"], "2031-12-01")
-        self.assertEqual(response["end_date"], "2031-12-31")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(show["seats"]), 75)
+        self.assertEqual(show["title"], self.movie.title)
+        self.assertNotIn("show_prices", show)
+        self.assertNotIn("booked_show", show)
 
-    def test_update_show_detail_as_user_type(self) -> None:
+        response = self.client.get(
+            "/api/v1/show/list/?fields=id,rating", headers=headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["fields"], "Unknown fields: rating")
+
+    def new_evening_show(self) -> ShowDetail:
+        show_detail = new_show_detail(
+            database=DEFAULT_DATABASE,
+            movie=self.movie,
+            screen=self.screen,
+            start_time="19:00",
+            end_time="21:00",
+            end_date="2030-12-03",
+        )
+        new_booked_show_detail(database=DEFAULT_DATABASE, show_detail=show_detail)
+        return show_detail
+
+    def test_list_show_filtered(self) -> None:
         """
-        testcase for the update of show detail as user type.
+        testcase for the list of show filtered by movie, screen, date and time.
         """
+        evening_show = self.new_evening_show()
         headers = {"Authorization": f"Token {self.user_token}"}
-        response = self.client.put(
-            f"/api/v1/show/detail/{self.show_detail.id}/",
+        response = self.client.get(
+            f"/api/v1/show/list/?movie={self.movie.id}&date=2030-12-01"
+            "&time_from=18:00&expand=booked_show",
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "get filtered list of show",
+                "response": response.content,
+                "event": "test_list_show_filtered",
+            }
+        )
+        shows = response.json()["results"]
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([show["id"] for show in shows], [evening_show.id])
+        self.assertEqual(
+            [booked_show["show_date"] for booked_show in shows[0]["booked_show"]],
+            ["2030-12-01"],
+        )
+
+        response = self.client.get(
+            "/api/v1/show/list/?date_from=2030-12-02&date_to=2030-12-31",
+            headers=headers,
+        )
+        self.assertEqual(
+            [show["id"] for show in response.json()["results"]], [evening_show.id]
+        )
+
+        response = self.client.get(
+            f"/api/v1/show/list/?screen={self.screen.id}&time_to=13:00",
+            headers=headers,
+        )
+        self.assertEqual(
+            [show["id"] for show in response.json()["results"]], [self.show_detail.id]
+        )
+
+        response = self.client.get(
+            "/api/v1/show/list/?date_from=2030-12-03&date_to=2030-12-01",
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_show_filters_use_indexes(self) -> None:
+        """
+        testcase for the indexes used by the filters of the show list.
+        """
+        if connection.vendor != "postgresql":
+            self.skipTest("the query plans are those of postgresql")
+        self.new_evening_show()
+        # a year of shows that have ended, as the dates of most shows have
+        first_date = date(2029, 1, 1)
+        screen = new_screen(database=DEFAULT_DATABASE, screen_number=2, total_seat=75)
+        ShowDetail.objects.bulk_create(
+            ShowDetail(
+                movie=self.movie,
+                screen=screen,
+                start_time="12:00",
+                end_time="13:00",
+                available_seats=75,
+                start_date=first_date + timedelta(days=day),
+                end_date=first_date + timedelta(days=day),
+            )
+            for day in range(365)
+        )
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with connection.cursor() as cursor:
+            # the tables are tiny, the plans are those of the populated tables
+            cursor.execute("ANALYZE movie_showdetail")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        plans = {}
+        for query_string, index in [
+            (f"movie={self.movie.id}&time_from=18:00", "show_movie_time_idx"),
+            (f"screen={self.screen.id}&time_to=13:00", "show_screen_time_idx"),
+            ("date_from=2030-12-02&date_to=2030-12-03", "show_end_date_idx"),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    f"/api/v1/show/list/?{query_string}&fields=id", headers=headers
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            (sql,) = [
+                query["sql"]
+                for query in queries
+                if query["sql"].startswith('SELECT "movie_showdetail"."id"')
+            ]
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {sql}")
+                plans[index] = "\n".join(row[0] for row in cursor.fetchall())
+        Logger.info(
+            {
+                "message": "query plans of filtered list of show",
+                "response": plans,
+                "event": "test_list_show_filters_use_indexes",
+            }
+        )
+
+        for index, plan in plans.items():
+            self.assertIn(index, plan)
+
+    def count_list_show_queries(self) -> int:
+        self.clear_caches()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/show/list/", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_list_show_query_count(self) -> None:
+        """
+        testcase for the query count of the show list as the shows grow.
+        """
+        single_show_queries = self.count_list_show_queries()
+
+        for screen_number in range(2, 7):
+            screen = new_screen(
+                database=DEFAULT_DATABASE, screen_number=screen_number, total_seat=75
+            )
+            seat_types = new_screen_seat_types_mappings(
+                database=DEFAULT_DATABASE,
+                seat_type=["SILVER", "GOLD", "PLATINUM"],
+                screen=screen,
+            )
+            seats = new_seats(
+                database=DEFAULT_DATABASE, rows=15, columns=5, types=seat_types
+            )
+            show_detail = new_show_detail(
+                database=DEFAULT_DATABASE,
+                movie=self.movie,
+                screen=screen,
+                start_time="12:00",
+                end_time="13:00",
+                end_date="2030-12-03",
+            )
+            booked_shows = new_booked_show_detail(
+                database=DEFAULT_DATABASE, show_detail=show_detail
+            )
+            booking = Booking.objects.create(
+                user=self.user, showtime=show_detail, booked_show=booked_shows[0]
+            )
+            BookedSeat.objects.create(
+                booked_show=booked_shows[0], seat=seats[0], booking=booking
+            )
+
+        many_shows_queries = self.count_list_show_queries()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.get("/api/v1/show/list/", headers=headers)
+        Logger.info(
+            {
+                "message": "get list of many shows",
+                "response": response.content,
+                "event": "test_list_show_query_count",
+            }
+        )
+        shows = response.json()["results"]
+
+        self.assertEqual(many_shows_queries, single_show_queries)
+        self.assertEqual(len(shows), 6)
+        self.assertEqual(sorted(len(show["seats"]) for show in shows), [74] * 5 + [75])
+
+    def test_update_show_seat_price_as_owner(self) -> None:
+        """
+        testcase for the update of show seat price.
+        """
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.put(
+            f"/api/v1/show/{self.show_detail.id}/price/{self.show_seat_prices[0].id}/",
+            {"price": 220},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "update show seat_price as owner ",
+                "response": response.content,
+                "event": "test_update_show_seat_price_as_owner",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(response["message"], "Price updated successfully")
+        self.assertEqual(int(response["price"]), 220)
+        self.assertEqual(ShowCatalog.objects.get().max_price, 220)
+
+    def test_update_show_seat_price_as_user_type(self) -> None:
+        """
+        testcase for the update of show seat price as user type.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.put(
+            f"/api/v1/show/{self.show_detail.id}/price/{self.show_seat_prices[0].id}/",
+            {"price": 220},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "update show seat_price as user ",
+                "response": response.content,
+                "event": "test_update_show_seat_price_as_user_type",
+            }
+        )
+        status_code = response.status_code
+
+        self.assertEqual(status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(
+            response.data["detail"],
+            "You do not have permission to perform this action.",
+        )
+
+    def test_update_show_detail_as_owner(self) -> None:
+        """
+        testcase for the update of show detail.
+        """
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.put(
+            f"/api/v1/show/detail/{self.show_detail.id}/",
+            {
+                "movie": self.movie.id,
+                "start_time": "09:00",
+                "end_time": "12:00",
+                "screen": self.screen.id,
+                "start_date": "2031-12-01",
+                "end_date": "2031-12-31",
+            },
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "update show_detail as owner ",
+                "response": response.content,
+                "event": "test_update_show_detail_as_owner",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(response["movie"], str(self.movie.id))
+        self.assertEqual(response["start_time"], "09:00:00")
+        self.assertEqual(response["end_time"], "12:00:00")
+        self.assertEqual(response["screen"], self.screen.id)
+        self.assertEqual(response["start_date"], "2031-12-01")
+        self.assertEqual(response["end_date"], "2031-12-31")
+
+    def create_show(self, start_time: str, end_time: str, end_date: str):
+        return self.client.post(
+            "/api/v1/show/detail/",
+            data={
+                "movie": self.movie.id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "screen": self.screen.id,
+                "start_date": "2030-11-30",
+                "end_date": end_date,
+                "show_prices": [
+                    {"seat_type": self.screen_seat_types[0].id, "price": 120}
+                ],
+            },
+            headers={"Authorization": f"Token {self.owner_token}"},
+            format="json",
+        )
+
+    def test_create_show_detail_overlapping(self) -> None:
+        """
+        testcase for the create of show detail partly overlapping another show.
+        """
+        response = self.create_show("12:30", "14:00", "2030-12-05")
+        Logger.info(
+            {
+                "message": "create overlapping show_detail",
+                "response": response.content,
+                "event": "test_create_show_detail_overlapping",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["non_field_errors"],
+            ["Another show is ongoing in same time and same screen"],
+        )
+        # a show starting as the other one ends does not overlap it
+        response = self.create_show("13:00", "14:00", "2030-12-05")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # an overlap on the last of its dates alone is caught too
+        response = self.create_show("11:00", "12:30", "2030-12-01")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_show_detail_overlapping(self) -> None:
+        """
+        testcase for the update of show detail into the slot of another show.
+        """
+        evening_show = self.new_evening_show()
+        response = self.client.put(
+            f"/api/v1/show/detail/{evening_show.id}/",
+            {"start_time": "11:00", "end_time": "12:30"},
+            headers={"Authorization": f"Token {self.owner_token}"},
+        )
+        Logger.info(
+            {
+                "message": "update show_detail into overlap",
+                "response": response.content,
+                "event": "test_update_show_detail_overlapping",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        evening_show.refresh_from_db()
+        self.assertEqual(str(evening_show.start_time), "19:00:00")
+
+    def test_update_show_available_seats(self) -> None:
+        """
+        testcase for the update of the seats of a show with booked seats.
+        """
+        booked_show = self.booked_show_detail[0]
+        response = self.client.post(
+            f"/api/v1/show/detail/{booked_show.id}/book/",
+            {"seats": [self.seats[0].id, self.seats[1].id]},
+            headers={"Authorization": f"Token {self.user_token}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        url = f"/api/v1/show/detail/{self.show_detail.id}/"
+        response = self.client.put(url, {"available_seats": 70}, headers=headers)
+        Logger.info(
+            {
+                "message": "update available seats of a booked show_detail",
+                "response": response.content,
+                "event": "test_update_show_available_seats",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["available_seats"], 70)
+        booked_show.refresh_from_db()
+        self.assertEqual(booked_show.available_seats, 68)
+        self.assertEqual(
+            ShowCatalog.objects.get(booked_show=booked_show).available_seats, 68
+        )
+
+        # the seats cannot be cut below those already booked on a date
+        response = self.client.put(url, {"available_seats": 1}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["available_seats"],
+            ["Seats of a show cannot be fewer than its booked seats"],
+        )
+        self.show_detail.refresh_from_db()
+        booked_show.refresh_from_db()
+        self.assertEqual(self.show_detail.available_seats, 70)
+        self.assertEqual(booked_show.available_seats, 68)
+
+    def test_update_show_screen_with_bookings(self) -> None:
+        """
+        testcase for the update of the screen of a show with a booked seat.
+        """
+        screen = new_screen(database=DEFAULT_DATABASE, screen_number=2, total_seat=5)
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [self.seats[0].id]},
+            headers={"Authorization": f"Token {self.user_token}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.put(
+            f"/api/v1/show/detail/{self.show_detail.id}/",
+            {"screen": screen.id},
+            headers={"Authorization": f"Token {self.owner_token}"},
+        )
+        Logger.info(
+            {
+                "message": "update screen of a booked show_detail",
+                "response": response.content,
+                "event": "test_update_show_screen_with_bookings",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()["non_field_errors"],
+            ["Screen of a show with bookings or holds cannot be changed"],
+        )
+        self.show_detail.refresh_from_db()
+        self.assertEqual(self.show_detail.screen_id, self.screen.id)
+
+    def test_show_detail_slot_constraint(self) -> None:
+        """
+        testcase for the exclusion constraint of overlapping shows.
+        """
+        if connection.vendor != "postgresql":
+            self.skipTest("exclusion constraints are postgresql only")
+        with self.assertRaises(IntegrityError) as error, transaction.atomic():
+            new_show_detail(
+                database=DEFAULT_DATABASE,
+                movie=self.movie,
+                screen=self.screen,
+                start_time="12:59",
+                end_time="14:00",
+                end_date="2030-12-01",
+            )
+
+        self.assertTrue(is_show_conflict(error.exception))
+
+    @override_settings(BOOKED_SHOW_WINDOW_DAYS=3)
+    def test_create_show_detail_booked_show_window(self) -> None:
+        """
+        testcase for the dates of a new show created up front.
+        """
+        today = timezone.localdate()
+        response = self.client.post(
+            "/api/v1/show/detail/",
+            data={
+                "movie": self.movie.id,
+                "start_time": "16:00",
+                "end_time": "17:00",
+                "screen": self.screen.id,
+                "start_date": today - timedelta(days=1),
+                "end_date": today + timedelta(days=180),
+                "show_prices": [
+                    {"seat_type": self.screen_seat_types[0].id, "price": 120}
+                ],
+            },
+            headers={"Authorization": f"Token {self.owner_token}"},
+            format="json",
+        )
+        Logger.info(
+            {
+                "message": "create show_detail with booked show window",
+                "response": response.content,
+                "event": "test_create_show_detail_booked_show_window",
+            }
+        )
+        show_detail = ShowDetail.objects.get(start_time="16:00")
+        booked_shows = BookedShowDetail.objects.filter(show_detail=show_detail)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(booked_shows.values_list("show_date", flat=True)),
+            [today + timedelta(days=day) for day in range(3)],
+        )
+        self.assertEqual(ShowCatalog.objects.filter(show_detail=show_detail).count(), 3)
+
+        out = StringIO()
+        call_command("materialize_booked_shows", "--days=5", stdout=out)
+        self.assertEqual(booked_shows.count(), 5)
+        self.assertEqual(ShowCatalog.objects.filter(show_detail=show_detail).count(), 5)
+
+    def test_update_show_detail_as_user_type(self) -> None:
+        """
+        testcase for the update of show detail as user type.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.put(
+            f"/api/v1/show/detail/{self.show_detail.id}/",
             {
                 "movie": self.movie.id,
                 "start_time": "09:00",
@@ -656,43 +1621,235 @@ class ScreenSeatTypeAPITestCase(APIBaseTestCase):
         )
 
 
-class BookTicketAPITestCase(APIBaseTestCase):
+class ShowCatalogAPITestCase(APIBaseTestCase):
     databases = [DEFAULT_DATABASE]
 
     def setUp(self) -> None:
         super().setUp()
         self.seed_database(DEFAULT_DATABASE)
 
-    def test_create_book_ticket_as_owner(self) -> None:
-        """
-        testcase for the create of book ticket.
-        """
-        headers = {"Authorization": f"Token {self.owner_token}"}
-        response = self.client.post(
-            f"/api/v1/show/detail/{self.show_detail.id}/book/",
-            {"seats": [self.seats[0].id, self.seats[1].id]},
-            headers=headers,
-        )
+    def get_show_catalog(self) -> dict:
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f"/api/v1/show/catalog/?movie={self.movie.id}", headers=headers
+            )
         Logger.info(
             {
-                "message": "create book_ticket as owner ",
+                "message": "get show catalog",
                 "response": response.content,
-                "event": "test_create_book_ticket_as_owner",
+                "event": "get_show_catalog",
             }
         )
-        response, status_code = response.json(), response.status_code
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the listing reads the catalog table alone
+        catalog_queries = [
+            query["sql"] for query in queries if "movie_showcatalog" in query["sql"]
+        ]
+        self.assertEqual(len(catalog_queries), 1)
+        self.assertNotIn("JOIN", catalog_queries[0])
+        return response.json()["results"]
+
+    def test_show_catalog(self) -> None:
+        """
+        testcase for the show catalog of a scheduled show.
+        """
+        catalog = self.get_show_catalog()
+
+        self.assertEqual(len(catalog), 1)
+        self.assertEqual(catalog[0]["title"], "test movie")
+        self.assertEqual(catalog[0]["screen_number"], 1)
+        self.assertEqual(catalog[0]["starts_at"], "2030-12-01T12:00:00Z")
+        self.assertEqual(catalog[0]["min_price"], 120)
+        self.assertEqual(catalog[0]["max_price"], 200)
+        self.assertEqual(catalog[0]["available_seats"], 75)
+        self.assertEqual(
+            [
+                catalog[0]["platinum_seats"],
+                catalog[0]["gold_seats"],
+                catalog[0]["silver_seats"],
+            ],
+            [25, 25, 25],
+        )
 
-        self.assertEqual(status_code, status.HTTP_201_CREATED)
-        self.assertEqual(len(response["seats"]), 2)
+    def test_show_catalog_pages_of_shows_starting_together(self) -> None:
+        """
+        testcase for the cursor pages of shows of the catalog starting together.
+        """
+        for screen_number in [2, 3]:
+            new_booked_show_detail(
+                database=DEFAULT_DATABASE,
+                show_detail=new_show_detail(
+                    database=DEFAULT_DATABASE,
+                    movie=self.movie,
+                    screen=new_screen(
+                        database=DEFAULT_DATABASE,
+                        screen_number=screen_number,
+                        total_seat=75,
+                    ),
+                    start_time=self.show_detail.start_time,
+                    end_time=self.show_detail.end_time,
+                    end_date=self.show_detail.end_date,
+                ),
+            )
+        booked_shows = list(
+            ShowCatalog.objects.order_by("pk").values_list("pk", flat=True)
+        )
+        self.assertEqual(len(booked_shows), 3)
 
-    def test_create_book_ticket_as_user_type(self) -> None:
+        headers = {"Authorization": f"Token {self.user_token}"}
+        url, pages = f"/api/v1/show/catalog/?movie={self.movie.id}&page_size=1", []
+        # as if more shows than the offset cutoff started together
+        with mock.patch.object(ShowCatalogPagination, "offset_cutoff", 1):
+            while url and len(pages) < 5:
+                response = self.client.get(url, headers=headers)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                data = response.json()
+                pages.append(data)
+                url = data["next"]
+            Logger.info(
+                {
+                    "message": "get pages of show catalog",
+                    "response": pages,
+                    "event": "test_show_catalog_pages_of_shows_starting_together",
+                }
+            )
+            self.assertEqual(
+                [page["results"][0]["booked_show"] for page in pages], booked_shows
+            )
+
+            response = self.client.get(pages[-1]["previous"], headers=headers)
+            self.assertEqual(
+                [show["booked_show"] for show in response.json()["results"]],
+                booked_shows[1:2],
+            )
+
+    def test_show_catalog_after_booking(self) -> None:
         """
-        testcase for the create of book ticket as user type.
+        testcase for the seats left in the show catalog after booking and
+        cancellation.
         """
         headers = {"Authorization": f"Token {self.user_token}"}
+        seats = [self.seats[0], self.seats[1], self.seats[-1]]
         response = self.client.post(
-            f"/api/v1/show/detail/{self.show_detail.id}/book/",
-            {"seats": [self.seats[0].id, self.seats[1].id]},
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [seat.id for seat in seats]},
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        catalog = self.get_show_catalog()[0]
+        booked_types = [seat.type.seat_type for seat in seats]
+        self.assertEqual(catalog["available_seats"], 72)
+        for seat_type in ["PLATINUM", "GOLD", "SILVER"]:
+            self.assertEqual(
+                catalog[f"{seat_type.lower()}_seats"],
+                25 - booked_types.count(seat_type),
+            )
+
+        booking = Booking.objects.get()
+        response = self.client.delete(f"/api/v1/booking/{booking.id}/", headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        catalog = self.get_show_catalog()[0]
+        self.assertEqual(catalog["available_seats"], 75)
+        self.assertEqual(catalog["silver_seats"], 25)
+
+    def test_show_catalog_after_movie_update(self) -> None:
+        """
+        testcase for the title in the show catalog after the movie is renamed.
+        """
+        self.movie.title = "renamed movie"
+        self.movie.save()
+
+        self.assertEqual(self.get_show_catalog()[0]["title"], "renamed movie")
+
+
+class BookTicketAPITestCase(APIBaseTestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed_database(DEFAULT_DATABASE)
+
+    def test_book_ticket_by_date(self) -> None:
+        """
+        testcase for the booking of a show date not created yet.
+        """
+        show_detail = new_show_detail(
+            database=DEFAULT_DATABASE,
+            movie=self.movie,
+            screen=self.screen,
+            start_time="19:00",
+            end_time="21:00",
+            end_date="2030-12-03",
+        )
+        headers = {"Authorization": f"Token {self.user_token}"}
+        url = f"/api/v1/show/detail/{show_detail.id}/dates/2030-12-02/book/"
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url, {"seats": [self.seats[0].id]}, headers=headers
+            )
+        Logger.info(
+            {
+                "message": "book ticket by show date",
+                "response": response.content,
+                "event": "test_book_ticket_by_date",
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url, {"seats": [self.seats[1].id]}, headers=headers
+            )
+        booked_show = BookedShowDetail.objects.get(show_detail=show_detail)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(booked_show.show_date.isoformat(), "2030-12-02")
+        self.assertEqual(booked_show.available_seats, 73)
+        self.assertEqual(
+            ShowCatalog.objects.get(booked_show=booked_show).available_seats, 73
+        )
+
+        response = self.client.post(
+            f"/api/v1/show/detail/{show_detail.id}/dates/2030-12-05/book/",
+            {"seats": [self.seats[2].id]},
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "Show date is invalid")
+
+    def test_create_book_ticket_as_owner(self) -> None:
+        """
+        testcase for the create of book ticket.
+        """
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.show_detail.id}/book/",
+            {"seats": [self.seats[0].id, self.seats[1].id]},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "create book_ticket as owner ",
+                "response": response.content,
+                "event": "test_create_book_ticket_as_owner",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response["seats"]), 2)
+
+    def test_create_book_ticket_as_user_type(self) -> None:
+        """
+        testcase for the create of book ticket as user type.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.show_detail.id}/book/",
+            {"seats": [self.seats[0].id, self.seats[1].id]},
             headers=headers,
         )
         Logger.info(
@@ -742,3 +1899,1377 @@ class BookTicketAPITestCase(APIBaseTestCase):
         response, status_code = response.json(), response.status_code
 
         self.assertEqual(status_code, status.HTTP_200_OK)
+
+    def test_list_booked_ticket_pages(self) -> None:
+        """
+        testcase for the cursor pages of booked ticket list.
+        """
+        booked_show = BookedShowDetail.objects.get(show_detail=self.show_detail)
+        for seat in self.seats[:5]:
+            booking = Booking.objects.create(
+                user=self.user, showtime=self.show_detail, booked_show=booked_show
+            )
+            booking.seats.add(seat)
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        url, pages, seats = "/api/v1/booking/?page_size=2", 0, []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, headers=headers)
+            data = response.json()
+            Logger.info(
+                {
+                    "message": "get page of booked ticket list",
+                    "response": response.content,
+                    "event": "test_list_booked_ticket_pages",
+                }
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", data)
+            self.assertFalse(
+                [query for query in queries if "COUNT(" in query["sql"].upper()]
+            )
+            url, pages = data["next"], pages + 1
+            seats += [seat for booking in data["results"] for seat in booking["seats"]]
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(seats, [seat.id for seat in reversed(self.seats[:5])])
+
+    def test_create_book_ticket_already_booked(self) -> None:
+        """
+        testcase for the booking of an already booked seat.
+        """
+        self.test_create_book_ticket_as_owner()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.show_detail.id}/book/",
+            {"seats": [self.seats[1].id, self.seats[2].id]},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "create book_ticket for already booked seat",
+                "response": response.content,
+                "event": "test_create_book_ticket_already_booked",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response["message"], "Seat is already booked")
+        self.assertEqual(
+            BookedSeat.objects.filter(booked_show=self.booked_show_detail[0]).count(),
+            2,
+        )
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_create_book_ticket_decrements_available_seats(self) -> None:
+        """
+        testcase for the available seats counter after booking.
+        """
+        self.test_create_book_ticket_as_owner()
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(booked_show.available_seats, 73)
+
+    def test_create_book_ticket_no_seats_available(self) -> None:
+        """
+        testcase for the booking when the counter would go negative.
+        """
+        booked_show = self.booked_show_detail[0]
+        BookedShowDetail.objects.filter(id=booked_show.id).update(available_seats=1)
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{booked_show.id}/book/",
+            {"seats": [self.seats[0].id, self.seats[1].id]},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "create book_ticket without available seats",
+                "response": response.content,
+                "event": "test_create_book_ticket_no_seats_available",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+        booked_show.refresh_from_db()
+
+        self.assertEqual(status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response["message"], "No seats available")
+        self.assertEqual(booked_show.available_seats, 1)
+        self.assertFalse(BookedSeat.objects.filter(booked_show=booked_show).exists())
+        self.assertFalse(Booking.objects.exists())
+
+    def test_delete_booked_ticket_releases_seats(self) -> None:
+        """
+        testcase for the delete of booked ticket.
+        """
+        self.test_create_book_ticket_as_owner()
+        booking = Booking.objects.get()
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.delete(f"/api/v1/booking/{booking.id}/", headers=headers)
+        Logger.info(
+            {
+                "message": "delete booked ticket",
+                "response": response.content,
+                "event": "test_delete_booked_ticket_releases_seats",
+            }
+        )
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(booked_show.available_seats, 75)
+        self.assertFalse(BookedSeat.objects.filter(booked_show=booked_show).exists())
+
+    def test_delete_booked_ticket_of_other_user(self) -> None:
+        """
+        testcase for the delete of a booked ticket of another user.
+        """
+        self.test_create_book_ticket_as_owner()
+        booking = Booking.objects.get()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.delete(f"/api/v1/booking/{booking.id}/", headers=headers)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Booking.objects.exists())
+
+    def cancel_bookings(self, token: str, data: dict):
+        headers = {"Authorization": f"Token {token}"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/api/v1/booking/cancel/", data, format="json", headers=headers
+            )
+        return response, len(queries)
+
+    def test_cancel_bookings_as_user_type(self) -> None:
+        """
+        testcase for the bulk cancel of booked tickets.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        booked_show = self.booked_show_detail[0]
+        booking_ids = []
+        for seats in ([0], [1, 2], [3, 4, 5], [6, 7, 8, 9]):
+            response = self.client.post(
+                f"/api/v1/show/detail/{booked_show.id}/book/",
+                {"seats": [self.seats[index].id for index in seats]},
+                headers=headers,
+            )
+            booking_ids.append(Booking.objects.latest("id").id)
+
+        response, single_queries = self.cancel_bookings(
+            self.user_token, {"bookings": booking_ids[:1]}
+        )
+        self.assertEqual(response.json()["cancelled"], 1)
+
+        response, bulk_queries = self.cancel_bookings(
+            self.user_token, {"bookings": booking_ids[1:]}
+        )
+        Logger.info(
+            {
+                "message": "cancel booked tickets as user",
+                "response": response.content,
+                "event": "test_cancel_bookings_as_user_type",
+            }
+        )
+        booked_show.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["cancelled"], 3)
+        # the query count does not grow with the number of bookings and seats
+        self.assertEqual(bulk_queries, single_queries)
+        self.assertEqual(booked_show.available_seats, 75)
+        self.assertFalse(Booking.objects.exists())
+        self.assertFalse(BookedSeat.objects.exists())
+        self.assertEqual(seat_index.get(booked_show.id, self.screen.id), 0)
+
+    def test_cancel_bookings_of_booked_show_as_owner(self) -> None:
+        """
+        testcase for the cancel of every booked ticket of a show date by owner.
+        """
+        self.test_create_book_ticket_as_owner()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [self.seats[5].id]},
+            headers=headers,
+        )
+
+        # a user only cancels their own bookings
+        response, _ = self.cancel_bookings(
+            self.user_token, {"booked_show": self.booked_show_detail[0].id}
+        )
+        self.assertEqual(response.json()["cancelled"], 1)
+
+        self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [self.seats[5].id]},
+            headers=headers,
+        )
+        response, _ = self.cancel_bookings(
+            self.owner_token, {"booked_show": self.booked_show_detail[0].id}
+        )
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["cancelled"], 2)
+        self.assertEqual(booked_show.available_seats, 75)
+
+    def test_cancel_bookings_without_bookings(self) -> None:
+        """
+        testcase for the bulk cancel without bookings or booked show.
+        """
+        response, _ = self.cancel_bookings(self.user_token, {})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BOOKING_SQL_FAST_PATH=True)
+    def test_create_book_ticket_sql_fast_path(self) -> None:
+        """
+        testcase for the booking of seats with a single SQL statement.
+        """
+        if connection.vendor != "postgresql":
+            self.skipTest("the single statement booking needs postgresql")
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        seats = [self.seats[0].id, self.seats[1].id]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+                {"seats": seats},
+                headers=headers,
+            )
+        Logger.info(
+            {
+                "message": "create book_ticket with the sql fast path",
+                "response": response.content,
+                "event": "test_create_book_ticket_sql_fast_path",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+        booking = Booking.objects.get()
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sorted(response["seats"]), sorted(seats))
+        self.assertEqual(booked_show.available_seats, 73)
+        self.assertEqual(
+            sorted(BookedSeat.objects.values_list("seat_id", flat=True)), sorted(seats)
+        )
+        self.assertEqual(sorted(booking.seats.values_list("id", flat=True)), seats)
+        self.assertEqual(ShowCatalog.objects.get().available_seats, 73)
+        # the seats are claimed by one write statement
+        writes = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].lstrip().startswith(("INSERT", "UPDATE", "WITH"))
+        ]
+        self.assertEqual(len(writes), 1)
+
+        # a taken seat falls back to the ORM path and its answer
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [self.seats[1].id, self.seats[2].id]},
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_create_book_ticket_best_available(self) -> None:
+        """
+        testcase for the booking of best available seats of a seat type.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/?count=3&seat_type=GOLD",
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "create book_ticket of best available seats",
+                "response": response.content,
+                "event": "test_create_book_ticket_best_available",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+        seats = Seat.objects.filter(id__in=response["seats"]).order_by("col")
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response["seats"]), 3)
+        self.assertEqual({seat.type.seat_type for seat in seats}, {"GOLD"})
+        self.assertEqual({seat.raw for seat in seats}, {"8"})
+        self.assertEqual([seat.col for seat in seats], ["2", "3", "4"])
+
+    def test_create_book_ticket_flash_sale(self) -> None:
+        """
+        testcase for the booking of a show in flash sale mode.
+        """
+        ShowDetail.objects.filter(id=self.show_detail.id).update(flash_sale=True)
+        headers = {"Authorization": f"Token {self.user_token}"}
+        url = f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/"
+
+        response = self.client.post(
+            url, {"seats": [self.seats[0].id, self.seats[1].id]}, headers=headers
+        )
+        Logger.info(
+            {
+                "message": "create book_ticket in flash sale",
+                "response": response.content,
+                "event": "test_create_book_ticket_flash_sale",
+            }
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()["seats"]), 2)
+
+        response = self.client.post(url, {"seats": [self.seats[1].id]}, headers=headers)
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(booked_show.available_seats, 73)
+        # the queue of the show is dropped once no request is submitting
+        self.assertEqual(_queues, {})
+
+    def test_flash_sale_batch_error(self) -> None:
+        """
+        testcase for the requests of a flash sale batch that fails.
+        """
+        booked_show = self.booked_show_detail[0]
+        queue = FlashSaleQueue(booked_show.id, max_batch=10, max_size=10)
+        started, release = threading.Event(), threading.Event()
+
+        def failing_batch(booked_show, batch) -> None:
+            started.set()
+            release.wait(5)
+            raise RuntimeError("the database went away")
+
+        def submit(seat_id: int):
+            return queue.submit(self.user, booked_show, [seat_id], timeout=5)
+
+        with mock.patch(
+            "movie.flash_sale.commit_batch", failing_batch
+        ), ThreadPoolExecutor(max_workers=3) as executor:
+            leader = executor.submit(submit, self.seats[0].id)
+            started.wait(5)
+            # the next two requests are queued into one batch
+            waiters = [executor.submit(submit, seat.id) for seat in self.seats[1:3]]
+            while len(queue._pending) < 2:
+                threading.Event().wait(0.01)
+            release.set()
+            errors = [future.exception(timeout=5) for future in [leader] + waiters]
+        Logger.info(
+            {
+                "message": "flash sale batch error",
+                "response": [repr(error) for error in errors],
+                "event": "test_flash_sale_batch_error",
+            }
+        )
+
+        # the leader of each batch raises its error, the others are told of it
+        self.assertIsInstance(errors[0], RuntimeError)
+        self.assertIsInstance(errors[1], RuntimeError)
+        self.assertIsInstance(errors[2], FlashSaleBatchError)
+        self.assertIsInstance(errors[2].__cause__, RuntimeError)
+
+
+class SeatAvailabilityIndexTestCase(APIBaseTestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed_database(DEFAULT_DATABASE)
+
+    def get_show_seats(self) -> list:
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.get(
+            f"/api/v1/show/{self.show_detail.id}/detail/", headers=headers
+        )
+        Logger.info(
+            {
+                "message": "get show detail seats",
+                "response": response.content,
+                "event": "get_show_seats",
+            }
+        )
+        return response.json()["seats"]
+
+    def test_show_seats_updated_after_booking(self) -> None:
+        """
+        testcase for the seat availability after booking and cancellation.
+        """
+        self.assertEqual(len(self.get_show_seats()), 75)
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+                {"seats": [self.seats[0].id, self.seats[1].id]},
+                headers=headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # the cached bitmap is updated in place, no rebuild from the ledger
+        with self.assertNumQueries(0):
+            booked = seat_index.get(self.booked_show_detail[0].id, self.screen.id)
+        self.assertEqual(bin(booked).count("1"), 2)
+
+        seats = self.get_show_seats()
+        self.assertEqual(len(seats), 73)
+        self.assertNotIn(self.seats[0].id, [seat["id"] for seat in seats])
+
+        booking = Booking.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/v1/booking/{booking.id}/", headers=headers)
+        self.assertEqual(len(self.get_show_seats()), 75)
+
+    def get_show_date_seats(self, show_date: str):
+        headers = {"Authorization": f"Token {self.user_token}"}
+        return self.client.get(
+            f"/api/v1/show/detail/{self.show_detail.id}/dates/{show_date}/seats/",
+            headers=headers,
+        )
+
+    def test_show_date_seats(self) -> None:
+        """
+        testcase for the seat availability of one show date.
+        """
+        next_date = self.booked_show_detail[0].show_date + timedelta(days=1)
+        ShowDetail.objects.filter(id=self.show_detail.id).update(end_date=next_date)
+        BookedShowDetail.objects.create(
+            show_detail=self.show_detail, show_date=next_date, available_seats=75
+        )
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+                {"seats": [self.seats[0].id, self.seats[1].id]},
+                headers=headers,
+            )
+
+        response = self.get_show_date_seats("2030-12-01")
+        Logger.info(
+            {
+                "message": "get seats of a show date",
+                "response": response.content,
+                "event": "test_show_date_seats",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(response["available_seats"], 73)
+        self.assertEqual(len(response["seats"]), 73)
+        self.assertNotIn(self.seats[0].id, [seat["id"] for seat in response["seats"]])
+
+        # a booking of another date does not take seats of this one
+        response = self.get_show_date_seats(next_date.isoformat())
+        self.assertEqual(len(response.json()["seats"]), 75)
+
+        # the seats come from the bitmap, not from the bookings of the show
+        with CaptureQueriesContext(connection) as queries:
+            self.get_show_date_seats("2030-12-01")
+        self.assertFalse(
+            any('"movie_booking' in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_show_date_seats_created_on_lookup(self) -> None:
+        """
+        testcase for the seat availability of a show date not created yet.
+        """
+        show_detail = new_show_detail(
+            database=DEFAULT_DATABASE,
+            movie=self.movie,
+            screen=self.screen,
+            start_time="19:00",
+            end_time="21:00",
+            end_date="2030-12-03",
+        )
+        headers = {"Authorization": f"Token {self.user_token}"}
+        url = f"/api/v1/show/detail/{show_detail.id}/dates/2030-12-02/seats/"
+        response = self.client.get(url, headers=headers)
+        Logger.info(
+            {
+                "message": "get seats of a show date created on lookup",
+                "response": response.content,
+                "event": "test_show_date_seats_created_on_lookup",
+            }
+        )
+        booked_show = BookedShowDetail.objects.get(show_detail=show_detail)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], booked_show.id)
+        self.assertEqual(len(response.json()["seats"]), 75)
+        self.assertEqual(booked_show.show_date.isoformat(), "2030-12-02")
+        self.assertEqual(
+            self.client.get(url, headers=headers).json()["id"], booked_show.id
+        )
+
+    def test_show_date_seats_without_show(self) -> None:
+        """
+        testcase for the seat availability of a date without show.
+        """
+        self.assertEqual(
+            self.get_show_date_seats("2030-12-05").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.get_show_date_seats("2030-13-01").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+    def test_show_date_seat_map(self) -> None:
+        """
+        testcase for the compact seat map of one show date.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+                {"seats": [self.seats[0].id, self.seats[1].id]},
+                headers=headers,
+            )
+
+        url = f"/api/v1/show/detail/{self.show_detail.id}/dates/2030-12-01/seats/"
+        response = self.client.get(
+            url, headers={**headers, "Accept": "application/vnd.theater.seatmap+json"}
+        )
+        Logger.info(
+            {
+                "message": "get seat map of a show date",
+                "response": response.content,
+                "event": "test_show_date_seat_map",
+            }
+        )
+        seat_map = response.json()
+        free = int.from_bytes(base64.b64decode(seat_map["free"]), "little")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["Content-Type"], "application/vnd.theater.seatmap+json"
+        )
+        self.assertEqual(bin(free).count("1"), 73)
+        self.assertEqual(
+            seat_map["legend"], [["SILVER", 25], ["GOLD", 25], ["PLATINUM", 25]]
+        )
+        position = seat_map["seats"]["id"].index(self.seats[0].id)
+        self.assertFalse(free & 1 << position)
+
+        # a client holding the current layout only gets the availability
+        layout = f"{self.screen.id}:{seat_map['layout']['version']}"
+        response = self.client.get(
+            f"{url}?format=seatmap&layout={layout}", headers=headers
+        )
+        self.assertEqual(response.json()["free"], seat_map["free"])
+        self.assertNotIn("seats", response.json())
+
+    def test_show_date_seat_map_of_other_screen(self) -> None:
+        """
+        testcase for the compact seat map of a show moved to another screen.
+        """
+        screen = new_screen(database=DEFAULT_DATABASE, screen_number=2, total_seat=5)
+        seat_types = new_screen_seat_types_mappings(
+            database=DEFAULT_DATABASE, seat_type=["GOLD"], screen=screen
+        )
+        other_seats = new_seats(
+            database=DEFAULT_DATABASE, rows=1, columns=5, types=seat_types
+        )
+        headers = {"Authorization": f"Token {self.user_token}"}
+        url = (
+            f"/api/v1/show/detail/{self.show_detail.id}/dates/2030-12-01/seats/"
+            "?format=seatmap"
+        )
+        layout = self.client.get(url, headers=headers).json()["layout"]
+
+        # the new screen is at the layout version of the old one
+        Screen.objects.filter(id=screen.id).update(layout_version=layout["version"])
+        ShowDetail.objects.filter(id=self.show_detail.id).update(screen=screen)
+        response = self.client.get(
+            f"{url}&layout={layout['screen']}:{layout['version']}", headers=headers
+        )
+        Logger.info(
+            {
+                "message": "get seat map of a show moved to another screen",
+                "response": response.content,
+                "event": "test_show_date_seat_map_of_other_screen",
+            }
+        )
+        seat_map = response.json()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(seat_map["layout"]["version"], layout["version"])
+        self.assertEqual(seat_map["layout"]["screen"], screen.id)
+        self.assertEqual(seat_map["seats"]["id"], [seat.id for seat in other_seats])
+
+    def test_book_seat_of_other_screen(self) -> None:
+        """
+        testcase for the booking of a seat outside the show screen.
+        """
+        screen = new_screen(database=DEFAULT_DATABASE, screen_number=2, total_seat=5)
+        seat_types = new_screen_seat_types_mappings(
+            database=DEFAULT_DATABASE, seat_type=["GOLD"], screen=screen
+        )
+        other_seats = new_seats(
+            database=DEFAULT_DATABASE, rows=1, columns=5, types=seat_types
+        )
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [other_seats[0].id]},
+            headers=headers,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "Seat is invalid")
+
+    def test_show_seats_with_seat_of_other_screen(self) -> None:
+        """
+        testcase for the seat availability with a booked seat of another screen.
+        """
+        screen = new_screen(database=DEFAULT_DATABASE, screen_number=2, total_seat=5)
+        seat_types = new_screen_seat_types_mappings(
+            database=DEFAULT_DATABASE, seat_type=["GOLD"], screen=screen
+        )
+        other_seat = new_seats(
+            database=DEFAULT_DATABASE, rows=1, columns=1, types=seat_types
+        )[0]
+        # a ledger row backfilled from a booking of a seat off the show screen
+        booking = Booking.objects.create(
+            user=self.user,
+            showtime=self.show_detail,
+            booked_show=self.booked_show_detail[0],
+        )
+        BookedSeat.objects.create(
+            booked_show=self.booked_show_detail[0], seat=other_seat, booking=booking
+        )
+        seat_index.clear()
+
+        self.assertEqual(len(self.get_show_seats()), 75)
+        response = self.client.get(
+            "/api/v1/show/list/", headers={"Authorization": f"Token {self.user_token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def book_seats(self, seats: list):
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+                {"seats": seats},
+                headers=headers,
+            )
+        # the seat table is only read for the booked seats of the response
+        seat_queries = [
+            query
+            for query in queries.captured_queries
+            if '"movie_seat"' in query["sql"]
+            and '"movie_booking_seats"' not in query["sql"]
+        ]
+        return response, seat_queries
+
+    def test_book_ticket_from_cached_layout(self) -> None:
+        """
+        testcase for the booking from the cached screen layout.
+        """
+        response, _ = self.book_seats([self.seats[0].id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response, seat_queries = self.book_seats([self.seats[1].id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(seat_queries, [])
+
+        # another worker starts from the shared cache, not the seat table
+        invalidate_screen_layout()
+        response, seat_queries = self.book_seats([self.seats[2].id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(seat_queries, [])
+
+    def test_book_ticket_after_layout_change(self) -> None:
+        """
+        testcase for the booking of a seat added to the screen layout.
+        """
+        response, _ = self.book_seats([self.seats[0].id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.screen.refresh_from_db()
+        layout_version = self.screen.layout_version
+
+        # a new seat type bumps the layout version of the screen
+        seat_type = ScreenSeatTypesMapping.objects.create(
+            seat_type="GOLD", screen=self.screen
+        )
+        new_seat = new_seats(
+            database=DEFAULT_DATABASE, rows=1, columns=1, types=[seat_type]
+        )[0]
+        self.screen.refresh_from_db()
+        self.assertEqual(self.screen.layout_version, layout_version + 1)
+
+        # the version read with the show reloads the layout cached before
+        response, seat_queries = self.book_seats([new_seat.id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(seat_queries), 1)
+        self.assertEqual(
+            get_screen_layout(self.screen.id).version, self.screen.layout_version
+        )
+
+    def test_seat_index_memory_usage(self) -> None:
+        """
+        testcase for the memory of a fully booked 1,500 seat bitmap.
+        """
+        index = SeatAvailabilityIndex(max_entries=2, ttl=60)
+        index._entries[1] = ((1 << 1500) - 1, 0, 1)
+
+        # one bit per seat plus the fixed int header
+        self.assertLessEqual(index.memory_usage(), 1500 // 8 + 40)
+
+
+@override_settings(SEAT_EVENTS_NOTIFY=False)
+class SeatEventsAPITestCase(APIBaseTestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed_database(DEFAULT_DATABASE)
+        self.url = f"/api/v1/show/detail/{self.booked_show_detail[0].id}/events/"
+
+    def book_seats(self, seats: list) -> None:
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+                {"seats": seats},
+                headers=headers,
+            )
+
+    async def test_stream_seat_events(self) -> None:
+        """
+        testcase for the live seat events of a booked show.
+        """
+        response = await self.async_client.get(
+            self.url, headers={"Authorization": f"Token {self.user_token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+        seats = [self.seats[0].id, self.seats[1].id]
+        await sync_to_async(self.book_seats)(seats)
+        chunk = await asyncio.wait_for(anext(stream), timeout=5)
+        Logger.info(
+            {
+                "message": "stream seat events",
+                "response": chunk,
+                "event": "test_stream_seat_events",
+            }
+        )
+        await stream.aclose()
+
+        event, data = chunk.decode().strip().split("\n")
+        self.assertEqual(event, "event: booked")
+        self.assertEqual(json.loads(data.removeprefix("data: "))["seats"], seats)
+
+    @override_settings(SEAT_EVENTS_STREAM_SECONDS=0)
+    async def test_stream_seat_events_closes(self) -> None:
+        """
+        testcase for the end of a live seat events stream.
+        """
+        response = await self.async_client.get(f"{self.url}?token={self.user_token}")
+        chunks = [chunk async for chunk in response.streaming_content]
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(
+            seat_event_broker.watcher_count(self.booked_show_detail[0].id), 0
+        )
+
+    async def test_stream_seat_events_without_token(self) -> None:
+        """
+        testcase for the live seat events without authentication.
+        """
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_remote_seat_events(self) -> None:
+        """
+        testcase for the seat changes notified by another worker.
+        """
+        booked_show = self.booked_show_detail[0]
+        seat_index.get(booked_show.id, self.screen.id)
+        remote_seats_changed(
+            json.dumps(
+                {
+                    "type": "booked",
+                    "booked_show": booked_show.id,
+                    "seats": [self.seats[0].id],
+                    "screen": self.screen.id,
+                    "origin": "other-worker",
+                }
+            )
+        )
+
+        # the bitmap of this worker follows without reading the ledger
+        with self.assertNumQueries(0):
+            booked = seat_index.get(booked_show.id, self.screen.id)
+        self.assertEqual(bin(booked).count("1"), 1)
+
+    @override_settings(SEAT_EVENTS_NOTIFY=True, SEAT_EVENTS_LISTENERS_SECONDS=0)
+    def test_seat_events_notify_listeners(self) -> None:
+        """
+        testcase for the seat changes notified only while another worker listens.
+        """
+        if connection.vendor != "postgresql":
+            self.skipTest("the seat changes are notified by postgresql")
+        booked_show = self.booked_show_detail[0]
+
+        def notified() -> bool:
+            with CaptureQueriesContext(connection) as queries:
+                seats_changed(booked_show.id, [self.seats[0].id], self.screen.id, True)
+            return any("pg_notify" in query["sql"] for query in queries)
+
+        self.assertFalse(notified())
+
+        listener = connections.create_connection(DEFAULT_DATABASE)
+        listener.ensure_connection()
+        try:
+            with listener.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock_shared(%s)", [LISTENER_LOCK])
+            self.assertTrue(notified())
+        finally:
+            listener.close()
+
+
+class SeatHoldAPITestCase(APIBaseTestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed_database(DEFAULT_DATABASE)
+
+    def test_hold_seats_as_user_type(self) -> None:
+        """
+        testcase for the hold of seats.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/hold/",
+            {"seats": [self.seats[0].id, self.seats[1].id]},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "hold seats as user",
+                "response": response.content,
+                "event": "test_hold_seats_as_user_type",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response["seats"]), 2)
+        self.assertEqual(response["booked_show"], self.booked_show_detail[0].id)
+
+        self.hold_id = response["id"]
+
+    def test_hold_seats_query_count(self) -> None:
+        """
+        testcase for the queries of a hold, whatever the number of its seats.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        queries = []
+        for seats in [self.seats[:1], self.seats[1:2], self.seats[2:10]]:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.post(
+                    f"/api/v1/show/detail/{self.booked_show_detail[0].id}/hold/",
+                    {"seats": [seat.id for seat in seats]},
+                    headers=headers,
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            queries.append(len(captured))
+        Logger.info(
+            {
+                "message": "hold seats query count",
+                "response": queries,
+                "event": "test_hold_seats_query_count",
+            }
+        )
+
+        # the first hold also loads the screen layout
+        self.assertEqual(queries[1], queries[2])
+
+    def test_book_held_seat_as_other_user(self) -> None:
+        """
+        testcase for the booking of a seat held by another user.
+        """
+        self.test_hold_seats_as_user_type()
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [self.seats[1].id]},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "book held seat as owner",
+                "response": response.content,
+                "event": "test_book_held_seat_as_other_user",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_book_hold_as_user_type(self) -> None:
+        """
+        testcase for the booking of held seats.
+        """
+        self.test_hold_seats_as_user_type()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"hold": self.hold_id},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "book hold as user",
+                "response": response.content,
+                "event": "test_book_hold_as_user_type",
+            }
+        )
+        response, status_code = response.json(), response.status_code
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response["seats"]), 2)
+        self.assertEqual(booked_show.available_seats, 73)
+        self.assertFalse(SeatHold.objects.exists())
+        self.assertFalse(BookedSeat.objects.filter(booking__isnull=True).exists())
+
+    def test_book_expired_hold(self) -> None:
+        """
+        testcase for the booking of an expired hold.
+        """
+        self.test_hold_seats_as_user_type()
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"hold": self.hold_id},
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "Hold is expired or invalid")
+
+        # the expired hold is swept before seats are claimed by another user
+        headers = {"Authorization": f"Token {self.owner_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": [self.seats[0].id]},
+            headers=headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_book_swept_hold(self) -> None:
+        """
+        testcase for the booking of a hold whose seats were swept meanwhile.
+        """
+        self.test_hold_seats_as_user_type()
+        # the ledger rows of the hold deleted by a sweep after it was read
+        BookedSeat.objects.filter(hold_id=self.hold_id).delete()
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"hold": self.hold_id},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "book swept hold as user",
+                "response": response.content,
+                "event": "test_book_swept_hold",
+            }
+        )
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "Hold is expired or invalid")
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(booked_show.available_seats, 75)
+
+    @override_settings(SEAT_HOLD_MINUTES=0)
+    def test_show_date_seats_after_hold_expires(self) -> None:
+        """
+        testcase for the seats of a show date once a hold expires unswept.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        booked_show = self.booked_show_detail[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/v1/show/detail/{booked_show.id}/hold/",
+                {"seats": [self.seats[0].id, self.seats[1].id]},
+                headers=headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # the hold expires as it is made and nothing sweeps it
+        response = self.client.get(
+            f"/api/v1/show/detail/{self.show_detail.id}/dates/"
+            f"{booked_show.show_date}/seats/",
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "get show date seats after hold expired",
+                "response": response.content,
+                "event": "test_show_date_seats_after_hold_expires",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["seats"]), 75)
+        self.assertTrue(SeatHold.objects.exists())
+
+    @override_settings(CATALOG_SEAT_VERSION_SECONDS=0)
+    def test_list_show_modified_after_hold_expires(self) -> None:
+        """
+        testcase for the conditional list of show once a hold expires unswept.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_hold_seats_as_user_type()
+        response = self.client.get("/api/v1/show/list/", headers=headers)
+        self.assertEqual(len(response.json()["results"][0]["seats"]), 73)
+
+        # the time of the hold passes, nothing is written
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        seat_index.clear()
+        modified = self.client.get(
+            "/api/v1/show/list/", headers={**headers, "If-None-Match": response["ETag"]}
+        )
+        Logger.info(
+            {
+                "message": "get list of show after hold expired",
+                "response": modified.content,
+                "event": "test_list_show_modified_after_hold_expires",
+            }
+        )
+
+        self.assertEqual(modified.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(modified.json()["results"][0]["seats"]), 75)
+
+    def test_hold_limit_exceeded(self) -> None:
+        """
+        testcase for the per user hold limit.
+        """
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/hold/",
+            {"seats": [seat.id for seat in self.seats[:11]]},
+            headers=headers,
+        )
+        Logger.info(
+            {
+                "message": "hold seats over the limit",
+                "response": response.content,
+                "event": "test_hold_limit_exceeded",
+            }
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()["message"], "Hold limit exceeded")
+
+    def test_release_hold(self) -> None:
+        """
+        testcase for the release of a hold.
+        """
+        self.test_hold_seats_as_user_type()
+        headers = {"Authorization": f"Token {self.user_token}"}
+        response = self.client.delete(f"/api/v1/hold/{self.hold_id}/", headers=headers)
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(BookedSeat.objects.exists())
+
+    def test_release_hold_rolled_back(self) -> None:
+        """
+        testcase for the seat index after the release of a hold is rolled back.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.test_hold_seats_as_user_type()
+        booked_show = self.booked_show_detail[0]
+        booked = seat_index.get(booked_show.id, self.screen.id)
+        self.assertEqual(bin(booked).count("1"), 2)
+
+        with transaction.atomic():
+            delete_seat_holds(SeatHold.objects.filter(id=self.hold_id))
+            transaction.set_rollback(True)
+
+        self.assertEqual(seat_index.get(booked_show.id, self.screen.id), booked)
+        self.assertTrue(SeatHold.objects.filter(id=self.hold_id).exists())
+
+    def test_expire_seat_holds_command(self) -> None:
+        """
+        testcase for the expired hold sweep command.
+        """
+        self.test_hold_seats_as_user_type()
+        SeatHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("expire_seat_holds", stdout=out)
+
+        self.assertIn("Released 2 held seats", out.getvalue())
+        self.assertFalse(BookedSeat.objects.exists())
+
+
+class IdempotentBookingAPITestCase(APIBaseTestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed_database(DEFAULT_DATABASE)
+
+    def book(self, seats: list, key: str = "booking-key"):
+        headers = {
+            "Authorization": f"Token {self.user_token}",
+            "Idempotency-Key": key,
+        }
+        return self.client.post(
+            f"/api/v1/show/detail/{self.booked_show_detail[0].id}/book/",
+            {"seats": seats},
+            headers=headers,
+        )
+
+    def test_replay_booking_as_user_type(self) -> None:
+        """
+        testcase for the retry of a booking with the same idempotency key.
+        """
+        response = self.book([self.seats[0].id, self.seats[1].id])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with CaptureQueriesContext(connection) as queries:
+            replayed = self.book([self.seats[0].id, self.seats[1].id])
+        Logger.info(
+            {
+                "message": "replay booking as user",
+                "response": replayed.content,
+                "event": "test_replay_booking_as_user_type",
+            }
+        )
+        booked_show = self.booked_show_detail[0]
+        booked_show.refresh_from_db()
+
+        self.assertEqual(replayed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replayed.json(), response.json())
+        self.assertEqual(replayed["Idempotent-Replayed"], "true")
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(booked_show.available_seats, 73)
+        # the replay does not touch the seat tables
+        self.assertFalse(
+            any(
+                table in query["sql"]
+                for query in queries.captured_queries
+                for table in ("movie_bookedseat", "movie_booking", "movie_seat")
+            )
+        )
+
+    def test_replay_booking_with_other_request(self) -> None:
+        """
+        testcase for the reuse of an idempotency key with another request.
+        """
+        self.book([self.seats[0].id])
+        response = self.book([self.seats[1].id])
+
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_replay_booking_with_expired_key(self) -> None:
+        """
+        testcase for the reuse of an expired idempotency key.
+        """
+        self.book([self.seats[0].id])
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.book([self.seats[1].id])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_replay_booking_in_progress(self) -> None:
+        """
+        testcase for the retry of a booking whose request is still running.
+        """
+        response = self.book([self.seats[0].id])
+        IdempotencyKey.objects.update(
+            status_code=None,
+            response=None,
+            locked_until=timezone.now() + timedelta(seconds=30),
+        )
+        replayed = self.book([self.seats[0].id])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(replayed.status_code, status.HTTP_409_CONFLICT)
+
+    def test_replay_booking_of_crashed_request(self) -> None:
+        """
+        testcase for the retry of a booking whose worker crashed before responding.
+        """
+        self.book([self.seats[0].id])
+        # the worker died before storing the response of the booking
+        IdempotencyKey.objects.update(
+            status_code=None,
+            response=None,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        response = self.book([self.seats[0].id])
+        Logger.info(
+            {
+                "message": "replay booking of crashed request",
+                "response": response.content,
+                "event": "test_replay_booking_of_crashed_request",
+            }
+        )
+        record = IdempotencyKey.objects.get()
+
+        # the retry runs the booking again and finds its seat taken
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertNotIn("in progress", response.json()["message"])
+        self.assertEqual(record.status_code, status.HTTP_409_CONFLICT)
+        self.assertIsNone(record.locked_until)
+
+    def test_expire_idempotency_keys_command(self) -> None:
+        """
+        testcase for the expired idempotency key sweep command.
+        """
+        self.book([self.seats[0].id])
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        out = StringIO()
+        call_command("expire_idempotency_keys", stdout=out)
+
+        self.assertIn("Deleted 1 idempotency keys", out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class BookTicketConcurrencyTestCase(APIBaseTransactionTestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.seed_database(DEFAULT_DATABASE)
+
+    def book_in_parallel(self, event: str) -> None:
+        if connection.vendor == "sqlite":
+            self.skipTest("sqlite serializes writers with table locks")
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        booked_show = self.booked_show_detail[0]
+        seat_ids = [seat.id for seat in self.seats]
+        seat_requests = [
+            [
+                seat_ids[(index * 7) % len(seat_ids)],
+                seat_ids[(index * 11) % len(seat_ids)],
+            ]
+            for index in range(300)
+        ]
+
+        def book(seats: list) -> int:
+            try:
+                response = APIClient().post(
+                    f"/api/v1/show/detail/{booked_show.id}/book/",
+                    {"seats": seats},
+                    headers=headers,
+                )
+                return response.status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            status_codes = list(executor.map(book, seat_requests))
+        Logger.info(
+            {
+                "message": "parallel book_ticket",
+                "booked": status_codes.count(status.HTTP_201_CREATED),
+                "conflict": status_codes.count(status.HTTP_409_CONFLICT),
+                "event": event,
+            }
+        )
+
+        booked_seats = list(
+            BookedSeat.objects.filter(booked_show=booked_show).values_list(
+                "seat", flat=True
+            )
+        )
+        bookings = Booking.objects.filter(booked_show=booked_show)
+
+        self.assertTrue(
+            set(status_codes) <= {status.HTTP_201_CREATED, status.HTTP_409_CONFLICT}
+        )
+        self.assertEqual(len(booked_seats), len(set(booked_seats)))
+        self.assertEqual(bookings.count(), status_codes.count(status.HTTP_201_CREATED))
+        self.assertEqual(
+            Booking.seats.through.objects.filter(booking__in=bookings).count(),
+            len(booked_seats),
+        )
+        booked_show.refresh_from_db()
+        self.assertEqual(booked_show.available_seats, 75 - len(booked_seats))
+
+    def test_parallel_holds_within_limit(self) -> None:
+        """
+        testcase for parallel holds of one user against the per user limit.
+        """
+        if connection.vendor == "sqlite":
+            self.skipTest("sqlite serializes writers with table locks")
+
+        headers = {"Authorization": f"Token {self.user_token}"}
+        booked_show = self.booked_show_detail[0]
+        seat_requests = [
+            [seat.id for seat in self.seats[index : index + 3]]
+            for index in range(0, 48, 3)
+        ]
+
+        def hold(seats: list) -> int:
+            try:
+                response = APIClient().post(
+                    f"/api/v1/show/detail/{booked_show.id}/hold/",
+                    {"seats": seats},
+                    headers=headers,
+                )
+                return response.status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            status_codes = list(executor.map(hold, seat_requests))
+        Logger.info(
+            {
+                "message": "parallel holds of one user",
+                "held": status_codes.count(status.HTTP_201_CREATED),
+                "event": "test_parallel_holds_within_limit",
+            }
+        )
+
+        # three holds of three seats fit the limit of ten
+        self.assertEqual(status_codes.count(status.HTTP_201_CREATED), 3)
+        self.assertEqual(BookedSeat.objects.filter(hold__user=self.user).count(), 9)
+
+    def test_parallel_book_ticket_is_not_double_booked(self) -> None:
+        """
+        testcase for hundreds of parallel bookings of overlapping seats.
+        """
+        self.book_in_parallel("test_parallel_book_ticket_is_not_double_booked")
+
+    def test_parallel_flash_sale_is_not_double_booked(self) -> None:
+        """
+        testcase for hundreds of parallel bookings of a show in flash sale mode.
+        """
+        ShowDetail.objects.filter(id=self.show_detail.id).update(flash_sale=True)
+        self.book_in_parallel("test_parallel_flash_sale_is_not_double_booked")
@@ -0,0 +1,75 @@
+# Django imports
+from django.db import connection
+from django.test import TestCase
+
+# App imports
+from movie.index_advisor import (
+    QueryShapeRecorder,
+    index_columns,
+    missing_indexes,
+    query_shape,
+    redundant_indexes,
+)
+from movie.models import BookedShowDetail, Seat
+from tests.test_helpers.constants import DEFAULT_DATABASE
+
+
+class IndexAdvisorTestCase(TestCase):
+    databases = [DEFAULT_DATABASE]
+
+    def skip_unless_postgresql(self) -> None:
+        if connection.vendor != "postgresql":
+            self.skipTest("the index advisor explains queries on postgresql")
+
+    def test_query_shape(self) -> None:
+        self.assertEqual(
+            query_shape('SELECT 1 FROM "t" WHERE "id" IN (%s, %s, %s) LIMIT 21'),
+            query_shape('SELECT 1 FROM "t" WHERE "id" IN (%s) LIMIT 1'),
+        )
+
+    def test_index_columns(self) -> None:
+        self.assertEqual(
+            index_columns(
+                "((start_time >= '12:00:00'::time without time zone) AND "
+                "(screen_id = 1))",
+                "((raw)::text = '1'::text)",
+            ),
+            ("screen_id", "raw", "start_time"),
+        )
+
+    def test_missing_index(self) -> None:
+        self.skip_unless_postgresql()
+        recorder = QueryShapeRecorder()
+        with connection.execute_wrapper(recorder):
+            list(Seat.objects.filter(raw="1"))
+            list(Seat.objects.filter(raw="2"))
+            list(
+                BookedShowDetail.objects.filter(
+                    show_detail_id=1, show_date="2030-12-01"
+                )
+            )
+
+        missing = missing_indexes(connection, recorder.shapes)
+
+        self.assertEqual(len(recorder.shapes), 2)
+        self.assertEqual(
+            [(index.table, index.columns, index.calls) for index in missing],
+            [("movie_seat", ("raw",), 2)],
+        )
+
+    def test_no_redundant_index(self) -> None:
+        self.skip_unless_postgresql()
+        # the tables of many to many fields come with both indexes
+        many_to_many = {
+            "movie_booking_seats",
+            "user_user_groups",
+            "user_user_user_permissions",
+        }
+        redundant = [
+            index.name
+            for index in redundant_indexes(connection)
+            if index.table.startswith(("movie_", "user_"))
+            and index.table not in many_to_many
+        ]
+
+        self.assertEqual(redundant, [])
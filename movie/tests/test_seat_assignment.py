@@ -0,0 +1,89 @@
+# Python imports
+from unittest import mock
+
+# Django imports
+from django.test import SimpleTestCase
+
+# App imports
+from movie.seat_assignment import find_best_seats
+from movie.seat_layout import ScreenLayout, iter_bits
+
+
+def new_layout(rows: int, columns: int, aisle: int = 0) -> ScreenLayout:
+    seats = []
+    for row in range(1, rows + 1):
+        for column in range(1, columns + 1):
+            if column == aisle:
+                continue
+            seat_type = "SILVER" if row <= rows // 2 else "GOLD"
+            seats.append((len(seats) + 1, f"{row}-{column}", seat_type, row, column))
+    return ScreenLayout.from_seats(1, seats)
+
+
+class FindBestSeatsTestCase(SimpleTestCase):
+    def seats(self, layout: ScreenLayout, seat_ids: list) -> list:
+        return [
+            (
+                layout.raws[layout.positions[seat_id]],
+                layout.cols[layout.positions[seat_id]],
+            )
+            for seat_id in seat_ids
+        ]
+
+    def test_block_in_middle_of_section(self) -> None:
+        layout = new_layout(rows=10, columns=9)
+        seat_ids = find_best_seats(layout, 0, 3, "GOLD")
+
+        self.assertEqual(self.seats(layout, seat_ids), [(8, 4), (8, 5), (8, 6)])
+
+    def test_block_does_not_cross_aisle(self) -> None:
+        layout = new_layout(rows=1, columns=9, aisle=5)
+        booked = layout.mask(layout.seat_ids[:2])
+        seat_ids = find_best_seats(layout, booked, 3)
+
+        self.assertEqual(self.seats(layout, seat_ids), [(1, 6), (1, 7), (1, 8)])
+
+    def test_near_adjacent_fallback(self) -> None:
+        layout = new_layout(rows=2, columns=4)
+        # leave 2 free seats in each row
+        booked = layout.mask(
+            [layout.seat_ids[0], layout.seat_ids[3], layout.seat_ids[4]]
+        )
+        seat_ids = find_best_seats(layout, booked, 4)
+
+        self.assertEqual(len(seat_ids), 4)
+        self.assertEqual(len(set(seat_ids)), 4)
+        self.assertFalse(layout.mask(seat_ids) & booked)
+
+    def test_not_enough_seats(self) -> None:
+        layout = new_layout(rows=2, columns=4)
+
+        self.assertEqual(find_best_seats(layout, layout.full_mask, 1), [])
+        self.assertEqual(find_best_seats(layout, 0, 5, "GOLD"), [])
+
+    def visited_seats(self, layout: ScreenLayout, booked: int, count: int) -> int:
+        visited = 0
+
+        def counting_iter_bits(mask: int):
+            nonlocal visited
+            for position in iter_bits(mask):
+                visited += 1
+                yield position
+
+        with mock.patch("movie.seat_assignment.iter_bits", counting_iter_bits):
+            find_best_seats(layout, booked, count)
+        return visited
+
+    def test_large_screen_visits_one_row(self) -> None:
+        # the timing is measured by the benchmark_seat_assignment command
+        booked = 0
+        for position in range(0, 20 * 38, 2):
+            booked |= 1 << position
+
+        # every other seat of the front rows is booked, the block is found with
+        # the bitmaps and only the seats of the chosen row are visited
+        visited = self.visited_seats(new_layout(rows=40, columns=38), booked, 6)
+        self.assertLessEqual(visited, 2 * 38)
+        self.assertEqual(
+            self.visited_seats(new_layout(rows=80, columns=38), booked, 6), visited
+        )
@@ -1,18 +1,24 @@
 # Django imports
-from django.urls import include, path
+from django.urls import include, path, register_converter
 
 # External imports
 from rest_framework.routers import SimpleRouter
 
 # Local imports
 # Local Imports
+from .converters import DateConverter
 from .views import (
     BookingViewSet,
     MovieViewSet,
     ScreenViewSet,
+    SeatHoldViewSet,
+    ShowCatalogViewSet,
     ShowDetailViewSet,
+    seat_events,
 )
 
+register_converter(DateConverter, "date")
+
 router = SimpleRouter()
 router.register("screen", ScreenViewSet, basename="screen")
 router.register("movie", MovieViewSet, basename="movie")
@@ -20,6 +26,32 @@ router.register("show/detail", ShowDetailViewSet, basename="show-detail")
 router.register("booking", BookingViewSet, basename="book-detail")
 
 urlpatterns = [
+    # ahead of the router, whose booking detail route also matches cancel
+    path(
+        "booking/cancel/",
+        BookingViewSet.as_view({"post": "cancel"}),
+        name="cancel-bookings",
+    ),
+    path(
+        "movie/search/",
+        MovieViewSet.as_view({"get": "search"}),
+        name="movie-search",
+    ),
+    path(
+        "screen/import/",
+        ScreenViewSet.as_view({"post": "import_layout"}),
+        name="screen-import",
+    ),
+    path(
+        "screen/template/",
+        ScreenViewSet.as_view({"get": "list_templates"}),
+        name="layout-templates",
+    ),
+    path(
+        "screen/<int:pk>/template/",
+        ScreenViewSet.as_view({"post": "save_template"}),
+        name="save-layout-template",
+    ),
     path("", include(router.urls)),
     path(
         "show/<int:show_id>/price/<int:show_price_id>/",
@@ -27,6 +59,11 @@ urlpatterns = [
         name="update-price",
     ),
     path("show/list/", ShowDetailViewSet.as_view({"get": "list"}), name="show-list"),
+    path(
+        "show/catalog/",
+        ShowCatalogViewSet.as_view({"get": "list"}),
+        name="show-catalog",
+    ),
     path(
         "show/<int:pk>/detail/",
         ShowDetailViewSet.as_view({"get": "retrieve"}),
@@ -37,4 +74,29 @@ urlpatterns = [
         BookingViewSet.as_view({"post": "booking"}),
         name="book-ticket",
     ),
+    path(
+        "show/detail/<int:show_id>/dates/<date:show_date>/book/",
+        BookingViewSet.as_view({"post": "booking_by_date"}),
+        name="book-ticket-by-date",
+    ),
+    path(
+        "show/detail/<int:show_id>/dates/<date:show_date>/seats/",
+        ShowDetailViewSet.as_view({"get": "date_seats"}),
+        name="show-date-seats",
+    ),
+    path(
+        "show/detail/<int:show_id>/events/",
+        seat_events,
+        name="seat-events",
+    ),
+    path(
+        "show/detail/<int:show_id>/hold/",
+        SeatHoldViewSet.as_view({"post": "hold"}),
+        name="hold-seats",
+    ),
+    path(
+        "hold/<int:pk>/",
+        SeatHoldViewSet.as_view({"delete": "destroy"}),
+        name="release-hold",
+    ),
 ]
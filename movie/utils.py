@@ -1,36 +1,100 @@
 # Python imports
-from typing import List
+import csv
+import io
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+# Django imports
+from django.conf import settings
+from django.db import connection, models, transaction
+from django.db.models import Case, F, Max, Value, When
+from django.utils import timezone
 
 # App imports
-from movie.models import Screen, ScreenSeatTypesMapping, Seat
+from movie.catalog_cache import SURROGATE_KEYS, table_changed
+from movie.models import (
+    BookedSeat,
+    BookedShowDetail,
+    Booking,
+    Screen,
+    ScreenSeatTypesMapping,
+    Seat,
+    SeatHold,
+    ShowDetail,
+)
+from movie.seat_index import seat_index
+from movie.seat_layout import get_screen_layouts
+from movie.show_catalog import adjust_catalog_seats
+from user.models import User
 
 
 def create_screen_with_seats(screen_number, seat_types: List[dict]) -> Screen:
-    screen = Screen.objects.create(screen_number=screen_number)
-    raws = 1
-    total_seat = 0
+    """
+    Creates the screen with the rows of every seat type one after the other,
+    numbered from the first row of the screen, with one statement for all seats
+    """
+    screen = Screen.objects.create(
+        screen_number=screen_number,
+        total_seat=sum(
+            seat_type["rows"] * seat_type["columns"] for seat_type in seat_types
+        ),
+    )
+
+    seats = []
+    first_row = 1
     for seat_type in seat_types:
         screen_seat = ScreenSeatTypesMapping.objects.create(
             screen=screen, seat_type=seat_type["seat_type"]
         )
+        last_row = first_row + seat_type["rows"]
+        seats += [
+            (f"{row_label(row)}{column}", row, column, screen_seat.id)
+            for row in range(first_row, last_row)
+            for column in range(1, seat_type["columns"] + 1)
+        ]
+        first_row = last_row
+    insert_seats(seats)
+
+    return screen
 
-        type_raw = seat_type["rows"] + raws
-        type_col = seat_type["columns"]
-        for i in range(raws, type_raw):
-            for j in range(type_col):
-                Seat.objects.create(
-                    seat_number=(str(i) + str(j)),
-                    raw=raws + i,
-                    col=j + 1,
-                    type=screen_seat,
-                )
-        raws = type_raw
-        total_seat += seat_type["rows"] * seat_type["columns"]
 
-    screen.total_seat = total_seat
-    screen.save()
+def insert_seats(seats: List[Tuple[str, int, int, int]]) -> None:
+    """
+    Inserts the seats given as (seat number, row, column, seat type id)
+    """
+    if connection.vendor != "postgresql":
+        Seat.objects.bulk_create(
+            Seat(seat_number=seat_number, raw=raw, col=col, type_id=type_id)
+            for seat_number, raw, col, type_id in seats
+        )
+        return
 
-    return screen
+    # COPY skips building a model and binding four parameters for every seat,
+    # which is most of the time of a bulk INSERT of a large screen
+    columns = ", ".join(
+        Seat._meta.get_field(name).column
+        for name in ["seat_number", "raw", "col", "type"]
+    )
+    # csv quotes the seat numbers of imported layouts, which may hold commas,
+    # quotes or backslashes
+    rows = io.StringIO()
+    csv.writer(rows, lineterminator="\n").writerows(seats)
+    rows.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {Seat._meta.db_table} ({columns}) FROM STDIN WITH (FORMAT csv)",
+            rows,
+        )
+
+
+def row_label(row: int) -> str:
+    # rows are lettered A to Z, then AA to ZZ and so on
+    label = ""
+    while row:
+        row, letter = divmod(row - 1, 26)
+        label = chr(ord("A") + letter) + label
+    return label
 
 
 def order_seat_types(seat_types: List[dict]) -> List[dict]:
@@ -38,3 +102,232 @@ def order_seat_types(seat_types: List[dict]) -> List[dict]:
     for seat_type in seat_types:
         seat_types_ordered[seat_type["order"] - 1] = seat_type
     return seat_types_ordered
+
+
+def claim_seats(booking: Booking, seat_ids: List[int]) -> None:
+    # the unique (booked_show, seat) constraint on the ledger decides who wins
+    # a seat, a losing booking raises IntegrityError from this single insert
+    BookedSeat.objects.bulk_create(
+        BookedSeat(
+            booked_show_id=booking.booked_show_id, seat_id=seat_id, booking=booking
+        )
+        for seat_id in seat_ids
+    )
+    Booking.seats.through.objects.bulk_create(
+        Booking.seats.through(booking=booking, seat_id=seat_id) for seat_id in seat_ids
+    )
+    transaction.on_commit(
+        lambda: seat_index.book(
+            booking.booked_show_id, seat_ids, booking.showtime.screen_id
+        )
+    )
+
+
+def adjust_available_seats(model: Type[models.Model], pk: int, seats: int) -> bool:
+    # a single conditional UPDATE holds the row lock only for the statement, it
+    # refuses to take the counter below zero instead of reading and saving it
+    queryset = model.objects.filter(pk=pk)
+    if seats < 0:
+        queryset = queryset.filter(available_seats__gte=-seats)
+    return bool(queryset.update(available_seats=F("available_seats") + seats))
+
+
+def adjust_show_seats(show_detail_id: int, seats: int) -> bool:
+    """
+    Changes the seats of a show, and the seats left of its dates from today
+    on, by the same count with conditional UPDATEs. Returns False when any
+    of them would go below zero, the caller then rolls back.
+    """
+    if not adjust_available_seats(ShowDetail, show_detail_id, seats):
+        return False
+    booked_shows = BookedShowDetail.objects.filter(
+        show_detail_id=show_detail_id, show_date__gte=timezone.localdate()
+    )
+    total = booked_shows.count()
+    if seats < 0:
+        booked_shows = booked_shows.filter(available_seats__gte=-seats)
+    if booked_shows.update(available_seats=F("available_seats") + seats) != total:
+        return False
+    # the updates send no post_save, the cached responses of the show are
+    # invalidated as the signal would
+    for model in [ShowDetail, BookedShowDetail]:
+        table_changed(model, [SURROGATE_KEYS[model], f"show:{show_detail_id}"])
+    return True
+
+
+def take_seats(booked_show_id: int, screen_id: int, seat_ids: List[int]) -> bool:
+    # the counter and the catalog row are updated last so their row locks are
+    # held only until commit
+    if not adjust_available_seats(BookedShowDetail, booked_show_id, -len(seat_ids)):
+        return False
+    adjust_catalog_seats({booked_show_id: (screen_id, seat_ids)}, booked=True)
+    return True
+
+
+def cancel_bookings(bookings: models.QuerySet) -> int:
+    """
+    Deletes the bookings and gives their seats back to the booked shows with a
+    fixed number of queries, however many bookings and seats are cancelled
+    """
+    # lock the bookings so a concurrent cancel does not release them twice
+    booking_ids = list(bookings.select_for_update().values_list("id", flat=True))
+    if not booking_ids:
+        return 0
+
+    released: Dict[int, List[int]] = defaultdict(list)
+    screen_ids: Dict[int, int] = {}
+    booked_seats = BookedSeat.objects.filter(booking_id__in=booking_ids).values_list(
+        "booked_show_id", "seat_id", "booked_show__show_detail__screen_id"
+    )
+    for booked_show_id, seat_id, screen_id in booked_seats:
+        released[booked_show_id].append(seat_id)
+        screen_ids[booked_show_id] = screen_id
+
+    # one UPDATE gives back the seats of every booked show
+    if released:
+        BookedShowDetail.objects.filter(id__in=released).update(
+            available_seats=F("available_seats")
+            + Case(
+                *[
+                    When(id=booked_show_id, then=Value(len(seat_ids)))
+                    for booked_show_id, seat_ids in released.items()
+                ],
+                output_field=models.IntegerField(),
+            )
+        )
+
+    adjust_catalog_seats(
+        {
+            booked_show_id: (screen_ids[booked_show_id], seat_ids)
+            for booked_show_id, seat_ids in released.items()
+        },
+        booked=False,
+    )
+    _, deleted = Booking.objects.filter(id__in=booking_ids).delete()
+
+    def release_index() -> None:
+        for booked_show_id, seat_ids in released.items():
+            seat_index.release(booked_show_id, seat_ids, screen_ids[booked_show_id])
+
+    transaction.on_commit(release_index)
+    return deleted.get(Booking._meta.label, 0)
+
+
+def held_seat_count(user: User) -> int:
+    return BookedSeat.objects.filter(
+        hold__user=user, hold__expires_at__gt=timezone.now()
+    ).count()
+
+
+def last_hold_expiry() -> str:
+    # a hold frees its seats by expiring, with no write to bump a table
+    # version, so the responses built from the seats also tell the last expiry
+    expires_at = SeatHold.objects.filter(expires_at__lte=timezone.now()).aggregate(
+        last=Max("expires_at")
+    )["last"]
+    return expires_at.isoformat() if expires_at else ""
+
+
+def hold_seats(
+    user: User, booked_show: BookedShowDetail, seat_ids: List[int], screen_id: int
+) -> SeatHold:
+    # held seats live in the same ledger as booked ones, so the unique
+    # (booked_show, seat) constraint also rejects a seat held by someone else
+    hold = SeatHold.objects.create(
+        user=user,
+        booked_show=booked_show,
+        expires_at=timezone.now() + timedelta(minutes=settings.SEAT_HOLD_MINUTES),
+    )
+    BookedSeat.objects.bulk_create(
+        BookedSeat(booked_show=booked_show, seat_id=seat_id, hold=hold)
+        for seat_id in seat_ids
+    )
+    transaction.on_commit(
+        lambda: seat_index.book(
+            booked_show.id, seat_ids, screen_id, expires_at=hold.expires_at
+        )
+    )
+    return hold
+
+
+def confirm_hold(booking: Booking, hold: SeatHold) -> Optional[List[int]]:
+    """
+    Hands the held ledger rows over to the booking as they are, nothing is
+    re-checked against the other booked seats of the show. Returns None when
+    the rows were swept meanwhile, the booking must then be rolled back.
+    """
+    seat_ids = list(
+        BookedSeat.objects.filter(hold=hold).values_list("seat_id", flat=True)
+    )
+    # every seat of the booking is backed by a ledger row it took over
+    updated = BookedSeat.objects.filter(hold=hold).update(booking=booking, hold=None)
+    if not seat_ids or updated != len(seat_ids):
+        return None
+    Booking.seats.through.objects.bulk_create(
+        Booking.seats.through(booking=booking, seat_id=seat_id) for seat_id in seat_ids
+    )
+    hold.delete()
+    return seat_ids
+
+
+def delete_seat_holds(holds: models.QuerySet) -> int:
+    booked_seats = list(
+        BookedSeat.objects.filter(hold__in=holds).values_list(
+            "booked_show_id", "seat_id", "booked_show__show_detail__screen_id"
+        )
+    )
+    if not booked_seats:
+        return 0
+
+    holds.delete()
+    released: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for booked_show_id, seat_id, screen_id in booked_seats:
+        released[(booked_show_id, screen_id)].append(seat_id)
+
+    def release_index() -> None:
+        for (booked_show_id, screen_id), seat_ids in released.items():
+            seat_index.release(booked_show_id, seat_ids, screen_id)
+
+    transaction.on_commit(release_index)
+    return len(booked_seats)
+
+
+def expire_seat_holds(booked_show_id: Optional[int] = None) -> int:
+    # expires_at is indexed, alone and per booked show, so the sweep only reads
+    # the expired holds instead of scanning the ledger
+    holds = SeatHold.objects.filter(expires_at__lte=timezone.now())
+    if booked_show_id is not None:
+        holds = holds.filter(booked_show_id=booked_show_id)
+    return delete_seat_holds(holds)
+
+
+def free_seats_by_show(shows: Iterable[ShowDetail]) -> Dict[int, List[dict]]:
+    """
+    Returns the seats free on every date of each show, with one query for the
+    uncached bitmaps and one for the uncached screen layouts of all shows
+    """
+    booked_show_ids: Dict[int, List[int]] = {}
+    screen_ids: Dict[int, int] = {}
+    for show in shows:
+        booked_shows = getattr(show, "booked_show", None)
+        if booked_shows is None:
+            booked_shows = show.booked_show_detail.all()
+        booked_show_ids[show.id] = [booked_show.id for booked_show in booked_shows]
+        screen_ids.update(dict.fromkeys(booked_show_ids[show.id], show.screen_id))
+
+    # the layouts first, so the bitmaps are built for their current version
+    versions = {
+        show.screen_id: show.screen.layout_version
+        for show in shows
+        if ShowDetail.screen.is_cached(show)
+    }
+    layouts = get_screen_layouts((show.screen_id for show in shows), versions)
+    bitmaps = seat_index.get_shows(screen_ids)
+
+    free_seats = {}
+    for show in shows:
+        booked = 0
+        for booked_show_id in booked_show_ids[show.id]:
+            booked |= bitmaps[booked_show_id]
+        free_seats[show.id] = layouts[show.screen_id].free_seats(booked)
+    return free_seats
@@ -1,36 +1,99 @@
+# Python imports
+import asyncio
+import codecs
+import json
+from datetime import date, time
+from typing import AsyncIterator, List, Optional
+
 # Django imports
-from django.db import transaction
-from django.db.models import Prefetch
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch, QuerySet
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 
 # External imports
 from rest_framework import status, viewsets
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 # App imports
+from theater.pagination import KeysetPagination
 from theater.permissions import AdminPermission
+from user.models import User, UserTypes
 
 # Local imports
+from .booked_shows import get_booked_show
+from .booking_sql import book_seats_sql, booking_sql_enabled
+from .catalog_cache import catalog_cache
+from .flash_sale import submit_flash_sale
+from .idempotency import idempotent
+from .layout_import import (
+    LayoutImportError,
+    clone_layout_template,
+    import_screen_layout,
+    layout_seats,
+    save_layout_template,
+)
 from .models import (
+    BookedSeat,
     BookedShowDetail,
     Booking,
+    LayoutTemplate,
     Movie,
     Screen,
     ScreenSeatTypesMapping,
-    Seat,
+    SeatHold,
+    ShowCatalog,
     ShowDetail,
     ShowSeatPrice,
 )
+from .renderers import SeatMapRenderer
+from .search import search_movies
+from .seat_assignment import find_best_seats
+from .seat_events import seat_event_broker
+from .seat_index import seat_index
+from .seat_layout import get_screen_layout
 from .serializers import (
     AddScreenSerializer,
+    BestAvailableSerializer,
     BookingSerializer,
+    BookSeatsSerializer,
+    CancelBookingSerializer,
+    ConfirmHoldSerializer,
+    ImportLayoutSerializer,
+    LayoutTemplateSerializer,
+    MovieSearchSerializer,
     MovieSerializer,
     ScreenSerializer,
+    SeatHoldSerializer,
+    ShowCatalogFilterSerializer,
+    ShowCatalogSerializer,
+    ShowDateSeatMapSerializer,
+    ShowDateSeatsSerializer,
+    ShowDetailFilterSerializer,
     ShowDetailSerializer,
     UpdateShowSerializer,
 )
-from .utils import create_screen_with_seats, order_seat_types
+from .show_catalog import refresh_show_catalog, show_datetime, today
+from .utils import (
+    cancel_bookings,
+    claim_seats,
+    confirm_hold,
+    create_screen_with_seats,
+    delete_seat_holds,
+    expire_seat_holds,
+    held_seat_count,
+    hold_seats,
+    last_hold_expiry,
+    order_seat_types,
+    take_seats,
+)
 
 
 class ScreenViewSet(viewsets.ModelViewSet):
@@ -39,10 +102,12 @@ class ScreenViewSet(viewsets.ModelViewSet):
     permission_classes = [AdminPermission]
     queryset = Screen.objects.all()
 
+    @catalog_cache(Screen, ScreenSeatTypesMapping)
     def list(self, request) -> Response:
         queryset = Screen.objects.all().prefetch_related("seat_screen")
-        serializer = ScreenSerializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = ScreenSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @transaction.atomic
     def create(self, request) -> Response:
@@ -50,12 +115,17 @@ class ScreenViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         screen_number = serializer.validated_data["screen_number"]
-        seat_types = serializer.validated_data["seat_types"]
+        template = serializer.validated_data.get("template")
 
-        seat_types_ordered = order_seat_types(seat_types)
-        screen = create_screen_with_seats(
-            screen_number=screen_number, seat_types=seat_types_ordered
-        )
+        if template is not None:
+            screen = clone_layout_template(screen_number, template)
+        else:
+            seat_types_ordered = order_seat_types(
+                serializer.validated_data["seat_types"]
+            )
+            screen = create_screen_with_seats(
+                screen_number=screen_number, seat_types=seat_types_ordered
+            )
 
         seats = ScreenSeatTypesMapping.objects.filter(screen=screen.id).values_list(
             "seat_type", flat=True
@@ -65,6 +135,44 @@ class ScreenViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @transaction.atomic
+    def import_layout(self, request) -> Response:
+        serializer = ImportLayoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # the upload is read line by line, a line is validated before its seat
+        # is inserted and the screen is rolled back on the first invalid one
+        lines = codecs.iterdecode(data["file"], "utf-8-sig")
+        try:
+            screen = import_screen_layout(
+                data["screen_number"],
+                layout_seats(lines, data["format"]),
+                settings.LAYOUT_IMPORT_BATCH_SIZE,
+            )
+        except (LayoutImportError, UnicodeDecodeError) as error:
+            transaction.set_rollback(True)
+            return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        if "template" in data:
+            save_layout_template(data["template"], screen)
+
+        return Response(ScreenSerializer(screen).data, status=status.HTTP_201_CREATED)
+
+    def list_templates(self, request) -> Response:
+        templates = LayoutTemplate.objects.order_by("name")
+        return Response(LayoutTemplateSerializer(templates, many=True).data)
+
+    @transaction.atomic
+    def save_template(self, request, pk: int) -> Response:
+        screen = self.get_object()
+        serializer = LayoutTemplateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        template = save_layout_template(serializer.validated_data["name"], screen)
+        return Response(
+            LayoutTemplateSerializer(template).data, status=status.HTTP_201_CREATED
+        )
+
 
 class MovieViewSet(viewsets.ModelViewSet):
     serializer_class = MovieSerializer
@@ -72,34 +180,183 @@ class MovieViewSet(viewsets.ModelViewSet):
     permission_classes = [AdminPermission]
     queryset = Movie.objects.all()
 
+    @catalog_cache(Movie)
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+    @catalog_cache(Movie)
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        return super().retrieve(request, *args, **kwargs)
+
+    @catalog_cache(Movie)
+    def search(self, request) -> Response:
+        serializer = MovieSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        movies = search_movies(
+            serializer.validated_data["q"], settings.MOVIE_SEARCH_LIMIT
+        )
+        return Response({"results": MovieSerializer(movies, many=True).data})
+
+
+# the columns of ShowDetail sent as they are
+SHOW_COLUMNS = [
+    "movie",
+    "start_time",
+    "end_time",
+    "screen",
+    "start_date",
+    "end_date",
+    "flash_sale",
+]
+
 
 class ShowDetailViewSet(viewsets.ModelViewSet):
     serializer_class = ShowDetailSerializer
     http_method_names = ["get", "post", "put", "delete"]
     permission_classes = [AdminPermission]
-    queryset = (
-        ShowDetail.objects.all()
-        .prefetch_related(
-            Prefetch(
-                "show_price_detail", ShowSeatPrice.objects.all(), to_attr="show_prices"
-            ),
-        )
-        .prefetch_related(
-            Prefetch(
-                "booked_show_detail",
-                BookedShowDetail.objects.all(),
-                to_attr="booked_show",
+    queryset = ShowDetail.objects.select_related("movie", "screen").defer(
+        "movie__description"
+    )
+
+    def get_sparse_fields(self) -> Optional[List[str]]:
+        if self.action not in ["list", "retrieve"]:
+            return None
+        return ShowDetailSerializer.sparse_fields(self.request.query_params)
+
+    def get_show_filters(self) -> dict:
+        if self.action != "list":
+            return {}
+        serializer = ShowDetailFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def get_queryset(self):
+        filters = self.get_show_filters()
+        # the dates of the shows are those of the asked range alone
+        booked_shows = BookedShowDetail.objects.all()
+        if "date_from" in filters:
+            booked_shows = booked_shows.filter(show_date__gte=filters["date_from"])
+        if "date_to" in filters:
+            booked_shows = booked_shows.filter(show_date__lte=filters["date_to"])
+
+        queryset = self.select_fields(self.get_sparse_fields(), booked_shows)
+        return self.filter_shows(queryset, filters)
+
+    def select_fields(
+        self, fields: Optional[List[str]], booked_shows: QuerySet
+    ) -> QuerySet:
+        if fields is None:
+            return (
+                super()
+                .get_queryset()
+                .prefetch_related(
+                    Prefetch(
+                        "show_price_detail",
+                        ShowSeatPrice.objects.all(),
+                        to_attr="show_prices",
+                    ),
+                    Prefetch("booked_show_detail", booked_shows, to_attr="booked_show"),
+                )
             )
-        )
+
+        # only the columns, joins and prefetches of the asked fields are read
+        columns = ["id"] + [field for field in fields if field in SHOW_COLUMNS]
+        queryset = ShowDetail.objects.all()
+        if "title" in fields:
+            queryset = queryset.select_related("movie")
+            columns += ["movie", "movie__title"]
+        if {"available_seats", "screen_number", "seats"} & set(fields):
+            queryset = queryset.select_related("screen")
+            columns += [
+                "screen",
+                "screen__screen_number",
+                "screen__total_seat",
+                "screen__layout_version",
+            ]
+        if "show_prices" in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "show_price_detail",
+                    ShowSeatPrice.objects.all(),
+                    to_attr="show_prices",
+                )
+            )
+        if "booked_show" in fields or "seats" in fields:
+            queryset = queryset.prefetch_related(
+                Prefetch("booked_show_detail", booked_shows, to_attr="booked_show")
+            )
+        return queryset.only(*columns)
+
+    def filter_shows(self, queryset: QuerySet, filters: dict) -> QuerySet:
+        # every filter is answered by the movie or screen and start time
+        # indexes of the shows, or by their end date index
+        if "movie" in filters:
+            queryset = queryset.filter(movie_id=filters["movie"])
+        if "screen" in filters:
+            queryset = queryset.filter(screen_id=filters["screen"])
+        if "time_from" in filters:
+            queryset = queryset.filter(start_time__gte=filters["time_from"])
+        if "time_to" in filters:
+            queryset = queryset.filter(start_time__lte=filters["time_to"])
+        # the dates of a show are only created once booked, so the shows are
+        # matched by their run
+        if "date_from" in filters:
+            queryset = queryset.filter(end_date__gte=filters["date_from"])
+        if "date_to" in filters:
+            queryset = queryset.filter(start_date__lte=filters["date_to"])
+        return queryset
+
+    def get_serializer_context(self) -> dict:
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
+
+    def get_renderers(self) -> list:
+        # the seats of a show date can also be sent as a compact seat map
+        renderers = super().get_renderers()
+        if self.action == "date_seats":
+            renderers.append(SeatMapRenderer())
+        return renderers
+
+    @catalog_cache(
+        ShowDetail,
+        ShowSeatPrice,
+        BookedShowDetail,
+        BookedSeat,
+        Movie,
+        Screen,
+        ScreenSeatTypesMapping,
+        etag_func=lambda request: last_hold_expiry(),
     )
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
 
     @transaction.atomic
     def update(self, request, pk) -> Response:
         serializer = UpdateShowSerializer(data=request.data, instance=self.get_object())
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        refresh_show_catalog([pk])
+        return Response(serializer.data)
+
+    def date_seats(self, request, show_id: int, show_date: date) -> Response:
+        show_detail = get_object_or_404(
+            ShowDetail.objects.select_related("screen"), id=show_id
+        )
+        booked_show = get_booked_show(show_detail, show_date)
+        if booked_show is None:
+            raise Http404
+        if request.accepted_renderer.format == SeatMapRenderer.format:
+            serializer = ShowDateSeatMapSerializer(
+                booked_show,
+                context={"layout": request.query_params.get("layout")},
+            )
+        else:
+            serializer = ShowDateSeatsSerializer(booked_show)
         return Response(serializer.data)
 
+    @transaction.atomic
     def update_price(self, request, show_id: int, show_price_id: int) -> Response:
         show_price = get_object_or_404(
             ShowSeatPrice, id=show_price_id, show_detail_id=show_id
@@ -107,57 +364,141 @@ class ShowDetailViewSet(viewsets.ModelViewSet):
 
         show_price.price = request.data.get("price", 0)
         show_price.save()
+        refresh_show_catalog([show_id])
         return Response(
             {"message": "Price updated successfully", "price": show_price.price},
             status=status.HTTP_200_OK,
         )
 
 
+class ShowCatalogPagination(KeysetPagination):
+    # the shows starting together are paged in the order of their key
+    ordering = ("starts_at", "pk")
+
+
+class ShowCatalogViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = ShowCatalogSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ShowCatalogPagination
+
+    def get_queryset(self):
+        # the shows from today on, read from the catalog table alone and
+        # in the order of its start time index
+        serializer = ShowCatalogFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return ShowCatalog.objects.filter(
+            starts_at__gte=show_datetime(timezone.localdate(), time.min),
+            **serializer.validated_data,
+        )
+
+    @catalog_cache(
+        ShowDetail,
+        ShowSeatPrice,
+        BookedShowDetail,
+        BookedSeat,
+        Movie,
+        Screen,
+        ScreenSeatTypesMapping,
+        etag_func=lambda request: today(),
+    )
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+
 class BookingViewSet(viewsets.ModelViewSet):
     serializer_class = BookingSerializer
     http_method_names = ["get", "post", "delete"]
     permission_classes = [IsAuthenticated]
     queryset = Booking.objects.all()
 
+    def get_queryset(self):
+        # managers and owners can cancel the bookings of every user
+        if getattr(self.request.user, "user_type", None) in [
+            UserTypes.MANAGER,
+            UserTypes.OWNER,
+        ]:
+            return Booking.objects.all()
+        return Booking.objects.filter(user=self.request.user.id)
+
     def list(self, request) -> Response:
-        queryset = Booking.objects.filter(user=request.user.id).prefetch_related(
-            "showtime"
+        queryset = (
+            Booking.objects.filter(user=request.user.id)
+            .select_related("showtime__movie", "showtime__screen")
+            .prefetch_related("seats")
         )
-        serializer = BookingSerializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = BookingSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @transaction.atomic
-    def booking(self, request, show_id: int) -> Response:
-        user = request.user
-        booked_show = get_object_or_404(BookedShowDetail, id=show_id)
-        show_detail = booked_show.show_detail
+    def destroy(self, request, pk) -> Response:
+        if not cancel_bookings(self.get_queryset().filter(id=pk)):
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-        serializer = BookingSerializer(data=request.data)
+    @transaction.atomic
+    def cancel(self, request) -> Response:
+        serializer = CancelBookingSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        # get booked seat list
-        booked_seats = (
-            Booking.objects.filter(
-                booked_show=booked_show,
-                showtime=show_detail,
+        bookings = self.get_queryset()
+        if "bookings" in serializer.validated_data:
+            bookings = bookings.filter(id__in=serializer.validated_data["bookings"])
+        if "booked_show" in serializer.validated_data:
+            bookings = bookings.filter(
+                booked_show=serializer.validated_data["booked_show"]
             )
-            .values_list("seats", flat=True)
-            .distinct()
-        )
 
-        # get booked seat
-        seats = serializer.validated_data["seats"]
-        seat_list = [seat.id for seat in seats]
-        seat_check = Seat.objects.filter(id__in=seat_list).values_list("id", flat=True)
+        cancelled = cancel_bookings(bookings)
+        return Response({"cancelled": cancelled}, status=status.HTTP_200_OK)
 
-        # check if any seat is already booked
-        if bool(set(seat_check).intersection(set(booked_seats))):
+    @idempotent
+    def booking(self, request, show_id: int) -> Response:
+        return self.book(request, show_id)
+
+    @idempotent
+    def booking_by_date(self, request, show_id: int, show_date: date) -> Response:
+        show_detail = get_object_or_404(
+            ShowDetail.objects.select_related("screen"), id=show_id
+        )
+        booked_show = get_booked_show(show_detail, show_date)
+        if booked_show is None:
             return Response(
-                {"message": "Seat is already booked"},
-                status=status.HTTP_400_BAD_REQUEST,
+                {"message": "Show date is invalid"}, status=status.HTTP_400_BAD_REQUEST
             )
+        return self.book(request, booked_show.id)
+
+    def book(self, request, show_id: int) -> Response:
+        if (
+            "hold" not in request.data
+            and "count" not in request.query_params
+            and booking_sql_enabled()
+        ):
+            response = self.book_seats_sql(request, show_id)
+            if response is not None:
+                return response
+
+        user = request.user
+        booked_show = get_object_or_404(
+            BookedShowDetail.objects.select_related("show_detail__screen"), id=show_id
+        )
+        show_detail = booked_show.show_detail
+        # the screen row carries the layout version, so a layout edited by another
+        # worker is reloaded here and every later lookup reuses it
+        layout = get_screen_layout(
+            show_detail.screen_id, show_detail.screen.layout_version
+        )
+
+        if "hold" in request.data:
+            return self.book_hold(request, booked_show)
+
+        if "count" in request.query_params:
+            return self.book_best_available(request, booked_show)
+
+        serializer = BookSeatsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        total_seat = len(seats)
+        seat_ids = list(dict.fromkeys(serializer.validated_data["seats"]))
         show_date = booked_show.show_date
 
         # check if show date is valid
@@ -172,35 +513,304 @@ class BookingViewSet(viewsets.ModelViewSet):
                 {"message": "Show date is invalid"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # check if seats are available
-        if (
-            show_detail.available_seats <= 0
-            and total_seat > show_detail.available_seats
-        ):
+        # check the seats against the screen layout instead of the seat table
+        if not layout.contains(seat_ids):
             return Response(
-                {"message": "No seats available"}, status=status.HTTP_400_BAD_REQUEST
+                {"message": "Seat is invalid"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # check if show is available
-        booked_show_check = BookedShowDetail.objects.filter(
-            show_detail=show_detail, show_date=show_date
+        if show_detail.flash_sale:
+            return self.book_flash_sale(user, booked_show, seat_ids)
+        return self.book_seats(user, booked_show, seat_ids)
+
+    def book_seats_sql(self, request, show_id: int) -> Optional[Response]:
+        # any request the statement refuses takes the ORM path below, which
+        # sweeps expired holds and answers with the reason
+        serializer = BookSeatsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return None
+
+        seat_ids = list(dict.fromkeys(serializer.validated_data["seats"]))
+        try:
+            booking_id = book_seats_sql(request.user.id, show_id, seat_ids)
+        except IntegrityError:
+            return None
+        if booking_id is None:
+            return None
+
+        booked_ticket = (
+            Booking.objects.select_related("showtime__movie", "showtime__screen")
+            .prefetch_related("seats")
+            .get(id=booking_id)
         )
-        if not booked_show_check:
+        booking_data = BookingSerializer(booked_ticket).data
+        return Response(booking_data, status=status.HTTP_201_CREATED)
+
+    @transaction.atomic
+    def book_seats(
+        self, user, booked_show: BookedShowDetail, seat_ids: List[int]
+    ) -> Response:
+        # check the seats against the booked seat bitmap
+        screen_id = booked_show.show_detail.screen_id
+        booked_mask = get_screen_layout(screen_id).mask(seat_ids)
+        expire_seat_holds(booked_show.id)
+        if seat_index.get(booked_show.id, screen_id) & booked_mask:
             return Response(
-                {"message": "No show available"}, status=status.HTTP_400_BAD_REQUEST
+                {"message": "Seat is already booked"},
+                status=status.HTTP_409_CONFLICT,
             )
 
-        booked_show.available_seats -= total_seat
-        booked_show.save()
+        try:
+            booked_ticket = self.claim_booking(user, booked_show, seat_ids)
+        except IntegrityError:
+            return Response(
+                {"message": "Seat is already booked"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return self.booked_response(booked_show, booked_ticket, seat_ids)
+
+    def book_flash_sale(
+        self, user, booked_show: BookedShowDetail, seat_ids: List[int]
+    ) -> Response:
+        # the queue commits this booking in a batch with the others of the show
+        pending = submit_flash_sale(
+            user, booked_show, seat_ids, timeout=settings.FLASH_SALE_WAIT_SECONDS
+        )
+
+        if pending.status == status.HTTP_201_CREATED:
+            booking_data = BookingSerializer(pending.booking).data
+            return Response(booking_data, status=status.HTTP_201_CREATED)
+        if pending.status == status.HTTP_409_CONFLICT:
+            message = "Seat is already booked"
+        elif pending.status == status.HTTP_400_BAD_REQUEST:
+            message = "No seats available"
+        else:
+            # a full queue or a wait past the timeout, a failed batch raises
+            message = "Booking is busy, please try again"
+        return Response({"message": message}, status=pending.status)
+
+    @transaction.atomic
+    def book_hold(self, request, booked_show: BookedShowDetail) -> Response:
+        serializer = ConfirmHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # locked so a concurrent confirm or sweep of the hold waits for this one
+        hold = (
+            SeatHold.objects.select_for_update()
+            .filter(
+                id=serializer.validated_data["hold"],
+                user=request.user,
+                booked_show=booked_show,
+                expires_at__gt=timezone.now(),
+            )
+            .first()
+        )
+        if hold is None:
+            return Response(
+                {"message": "Hold is expired or invalid"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # book a ticket for a user
+        # book a ticket for a user from the held seats
         booked_ticket = Booking.objects.create(
-            user=user,
-            showtime=show_detail,
+            user=request.user,
+            showtime=booked_show.show_detail,
             booked_show=booked_show,
         )
-        booked_ticket.seats.set(seats)
-        booked_ticket.save()
+        seat_ids = confirm_hold(booked_ticket, hold)
+        if seat_ids is None:
+            transaction.set_rollback(True)
+            return Response(
+                {"message": "Hold is expired or invalid"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.booked_response(booked_show, booked_ticket, seat_ids)
+
+    @transaction.atomic
+    def book_best_available(self, request, booked_show: BookedShowDetail) -> Response:
+        serializer = BestAvailableSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        count = serializer.validated_data["count"]
+        seat_type = serializer.validated_data.get("seat_type")
+        screen_id = booked_show.show_detail.screen_id
+        layout = get_screen_layout(screen_id)
+        expire_seat_holds(booked_show.id)
+
+        # a picked seat can be taken meanwhile, pick again from a fresh bitmap
+        for _ in range(settings.BEST_AVAILABLE_ATTEMPTS):
+            booked = seat_index.get(booked_show.id, screen_id)
+            seat_ids = find_best_seats(layout, booked, count, seat_type)
+            if not seat_ids:
+                return Response(
+                    {"message": "No seats available"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            try:
+                booked_ticket = self.claim_booking(request.user, booked_show, seat_ids)
+            except IntegrityError:
+                seat_index.invalidate(booked_show.id)
+                continue
+            return self.booked_response(booked_show, booked_ticket, seat_ids)
+
+        return Response(
+            {"message": "Seat is already booked"}, status=status.HTTP_409_CONFLICT
+        )
+
+    def claim_booking(
+        self, user, booked_show: BookedShowDetail, seat_ids: List[int]
+    ) -> Booking:
+        # the savepoint undoes the booking when the ledger rejects a seat
+        with transaction.atomic():
+            booked_ticket = Booking.objects.create(
+                user=user,
+                showtime=booked_show.show_detail,
+                booked_show=booked_show,
+            )
+            claim_seats(booked_ticket, seat_ids)
+        return booked_ticket
+
+    def booked_response(
+        self, booked_show: BookedShowDetail, booked_ticket: Booking, seat_ids: List[int]
+    ) -> Response:
+        screen_id = booked_show.show_detail.screen_id
+        if not take_seats(booked_show.id, screen_id, seat_ids):
+            transaction.set_rollback(True)
+            return Response(
+                {"message": "No seats available"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
         booking_data = BookingSerializer(booked_ticket).data
         return Response(booking_data, status=status.HTTP_201_CREATED)
+
+
+class SeatHoldViewSet(viewsets.ModelViewSet):
+    serializer_class = SeatHoldSerializer
+    http_method_names = ["post", "delete"]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return SeatHold.objects.filter(user=self.request.user.id)
+
+    @transaction.atomic
+    def hold(self, request, show_id: int) -> Response:
+        user = request.user
+        booked_show = get_object_or_404(
+            BookedShowDetail.objects.select_related("show_detail__screen"), id=show_id
+        )
+
+        serializer = SeatHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        seat_ids = list(dict.fromkeys(serializer.validated_data["seats"]))
+        screen_id = booked_show.show_detail.screen_id
+        layout = get_screen_layout(
+            screen_id, booked_show.show_detail.screen.layout_version
+        )
+
+        # check the seats against the screen layout
+        if not layout.contains(seat_ids):
+            return Response(
+                {"message": "Seat is invalid"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # check the per user hold limit, the user row is locked so the holds
+        # of the same user are counted one after the other
+        expire_seat_holds(booked_show.id)
+        User.objects.select_for_update().only("id").get(id=user.id)
+        if held_seat_count(user) + len(seat_ids) > settings.SEAT_HOLD_MAX_SEATS:
+            return Response(
+                {"message": "Hold limit exceeded"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if seat_index.get(booked_show.id, screen_id) & layout.mask(seat_ids):
+            return Response(
+                {"message": "Seat is already booked"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            with transaction.atomic():
+                hold = hold_seats(user, booked_show, seat_ids, screen_id)
+        except IntegrityError:
+            transaction.set_rollback(True)
+            return Response(
+                {"message": "Seat is already booked"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        hold.seats = seat_ids
+        serializer = SeatHoldSerializer(hold)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @transaction.atomic
+    def destroy(self, request, pk) -> Response:
+        hold = self.get_object()
+        delete_seat_holds(SeatHold.objects.filter(id=hold.id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+async def seat_events(request, show_id: int) -> HttpResponse:
+    """
+    Streams the seats booked and released for a BookedShowDetail as server-sent
+    events. Browsers cannot set headers on an EventSource, so the token can also
+    be sent as `?token=`.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"message": "Seat events are only served over ASGI"},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    user = await sync_to_async(token_user)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    if not await BookedShowDetail.objects.filter(id=show_id).aexists():
+        raise Http404
+
+    response = StreamingHttpResponse(
+        stream_seat_events(show_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def token_user(request) -> Optional[User]:
+    key = request.GET.get("token")
+    authorization = request.headers.get("Authorization", "").split()
+    if len(authorization) == 2 and authorization[0] == "Token":
+        key = authorization[1]
+    if not key:
+        return None
+
+    try:
+        user, _ = TokenAuthentication().authenticate_credentials(key)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+async def stream_seat_events(booked_show_id: int) -> AsyncIterator[str]:
+    subscription = seat_event_broker.subscribe(booked_show_id)
+    # the stream ends after a while and the client reconnects, so a watcher gone
+    # without the server noticing is not kept forever
+    loop = asyncio.get_running_loop()
+    closes_at = loop.time() + settings.SEAT_EVENTS_STREAM_SECONDS
+    try:
+        yield f"retry: {settings.SEAT_EVENTS_HEARTBEAT_SECONDS * 1000}\n\n"
+        while loop.time() < closes_at:
+            event = await subscription.get(
+                min(settings.SEAT_EVENTS_HEARTBEAT_SECONDS, closes_at - loop.time())
+            )
+            if event is None:
+                # a comment keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        seat_event_broker.unsubscribe(subscription)
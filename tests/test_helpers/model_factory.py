@@ -16,6 +16,7 @@ from movie.models import (
     ShowDetail,
     ShowSeatPrice,
 )
+from movie.show_catalog import refresh_show_catalog
 from user.models import User
 
 
@@ -130,4 +131,6 @@ def new_booked_show_detail(
                 available_seats=show_detail.available_seats,
             )
         )
-    return BookedShowDetail.objects.using(database).bulk_create(booked_show)
+    booked_show = BookedShowDetail.objects.using(database).bulk_create(booked_show)
+    refresh_show_catalog([show_detail.id])
+    return booked_show
@@ -1,7 +1,12 @@
+# Django imports
+from django.core.cache import cache
+
 # External imports
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 
 # App imports
+from movie.seat_index import seat_index
+from movie.seat_layout import invalidate_screen_layout
 from user.models import UserTypes
 
 # Local imports
@@ -18,9 +23,11 @@ from .model_factory import (
 )
 
 
-class APIBaseTestCase(APITestCase):
-    def setUp(self) -> None:
-        self.database = None
+class SeedDatabaseMixin:
+    def clear_caches(self) -> None:
+        seat_index.clear()
+        invalidate_screen_layout()
+        cache.clear()
 
     def seed_database(self, db: str):
         if self.database is not None:
@@ -119,3 +126,15 @@ class APIBaseTestCase(APITestCase):
         self.booked_show_detail = new_booked_show_detail(
             database=db, show_detail=self.show_detail
         )
+
+
+class APIBaseTestCase(SeedDatabaseMixin, APITestCase):
+    def setUp(self) -> None:
+        self.database = None
+        self.clear_caches()
+
+
+class APIBaseTransactionTestCase(SeedDatabaseMixin, APITransactionTestCase):
+    def setUp(self) -> None:
+        self.database = None
+        self.clear_caches()
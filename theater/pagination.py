@@ -0,0 +1,95 @@
+# Python imports
+import json
+from functools import reduce
+from operator import or_
+
+# Django imports
+from django.db.models import Q
+
+# External imports
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    KeysetPagination: It pages a list on its primary key, newest first, so any
+    page is read with one range scan of an index and no row count is taken.
+
+    An ordering of several fields, the last of them unique, is paged on all of
+    them. DRF keeps the first field alone in the cursor and skips the rows
+    sharing its value by offset, which stops at the offset cutoff of 1000 rows.
+    """
+
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        self.ordering = self.get_ordering(request, queryset, view)
+        cursor = super().decode_cursor(request)
+        if (
+            cursor is not None
+            and cursor.position is not None
+            and len(self.ordering) > 1
+        ):
+            values = self.keyset_values(cursor.position)
+            queryset = queryset.filter(self.after_keyset(values, cursor.reverse))
+            self.keyset = cursor.position
+
+        page = super().paginate_queryset(queryset, request, view)
+        if page is None or self.keyset is None:
+            return page
+        # the position was taken out of the cursor, the queryset is filtered on it
+        if self.cursor.reverse:
+            self.has_next, self.next_position = True, self.keyset
+        else:
+            self.has_previous, self.previous_position = True, self.keyset
+        if self.template is not None:
+            self.display_page_controls = True
+        return page
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if self.keyset is not None:
+            return cursor._replace(position=None)
+        return cursor
+
+    def keyset_values(self, position: str) -> list:
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def after_keyset(self, values: list, reverse: bool) -> Q:
+        # (a, b) > (x, y) as a > x or (a = x and b > y), bounded by a >= x so
+        # the index of the first field is range scanned
+        fields = [order.lstrip("-") for order in self.ordering]
+        lookups = [
+            "lt" if reverse != order.startswith("-") else "gt"
+            for order in self.ordering
+        ]
+        after = reduce(
+            or_,
+            (
+                Q(**dict(zip(fields[:index], values[:index])))
+                & Q(**{f"{fields[index]}__{lookups[index]}": values[index]})
+                for index in range(len(fields))
+            ),
+        )
+        bound = "gte" if lookups[0] == "gt" else "lte"
+        return Q(**{f"{fields[0]}__{bound}": values[0]}) & after
+
+    def _get_position_from_instance(self, instance, ordering):
+        if len(ordering) == 1:
+            return super()._get_position_from_instance(instance, ordering)
+        fields = [order.lstrip("-") for order in ordering]
+        if isinstance(instance, dict):
+            values = [instance[field] for field in fields]
+        else:
+            values = [getattr(instance, field) for field in fields]
+        return json.dumps([str(value) for value in values])
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "movie",
     "user",
     "rest_framework",
@@ -130,6 +131,8 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.TokenAuthentication",
     ),
+    "DEFAULT_PAGINATION_CLASS": "theater.pagination.KeysetPagination",
+    "PAGE_SIZE": int(os.environ.get("PAGE_SIZE", 20)),
 }
 
 LOGGING = {
@@ -191,6 +194,74 @@ SENDER_EMAIL = os.environ.get("SENDER_EMAIL", None)
 SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD", None)
 
 
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.environ.get("CACHE_LOCATION", ""),
+    }
+}
+
+# Screen seat layouts kept in process, backed by the shared cache
+SCREEN_LAYOUT_CACHE_SIZE = int(os.environ.get("SCREEN_LAYOUT_CACHE_SIZE", 1000))
+SCREEN_LAYOUT_CACHE_TIMEOUT = int(
+    os.environ.get("SCREEN_LAYOUT_CACHE_TIMEOUT", 24 * 60 * 60)
+)
+
+# In-process bitmap index of booked seats per show date
+SEAT_INDEX_MAX_ENTRIES = int(os.environ.get("SEAT_INDEX_MAX_ENTRIES", 20000))
+SEAT_INDEX_TTL = int(os.environ.get("SEAT_INDEX_TTL", 30))
+
+# Seat holds before booking
+SEAT_HOLD_MINUTES = int(os.environ.get("SEAT_HOLD_MINUTES", 10))
+SEAT_HOLD_MAX_SEATS = int(os.environ.get("SEAT_HOLD_MAX_SEATS", 10))
+
+# Attempts to pick best available seats again after losing one to another booking
+BEST_AVAILABLE_ATTEMPTS = int(os.environ.get("BEST_AVAILABLE_ATTEMPTS", 3))
+
+# Flash sale queue of shows flagged with flash_sale
+FLASH_SALE_BATCH_SIZE = int(os.environ.get("FLASH_SALE_BATCH_SIZE", 50))
+FLASH_SALE_QUEUE_SIZE = int(os.environ.get("FLASH_SALE_QUEUE_SIZE", 1000))
+FLASH_SALE_WAIT_SECONDS = int(os.environ.get("FLASH_SALE_WAIT_SECONDS", 10))
+
+# Book seats with a single SQL statement on PostgreSQL instead of the ORM path
+BOOKING_SQL_FAST_PATH = os.environ.get("BOOKING_SQL_FAST_PATH", "False") == "True"
+
+# Live seat events streamed to watchers, shared between workers with NOTIFY
+SEAT_EVENTS_NOTIFY = os.environ.get("SEAT_EVENTS_NOTIFY", "True") == "True"
+SEAT_EVENTS_QUEUE_SIZE = int(os.environ.get("SEAT_EVENTS_QUEUE_SIZE", 100))
+SEAT_EVENTS_HEARTBEAT_SECONDS = int(os.environ.get("SEAT_EVENTS_HEARTBEAT_SECONDS", 15))
+SEAT_EVENTS_STREAM_SECONDS = int(os.environ.get("SEAT_EVENTS_STREAM_SECONDS", 300))
+# Seconds between the checks for a worker listening to the seat changes, no
+# NOTIFY is sent while none listens
+SEAT_EVENTS_LISTENERS_SECONDS = int(os.environ.get("SEAT_EVENTS_LISTENERS_SECONDS", 5))
+
+# Catalog responses kept by a caching proxy until their surrogate keys are purged
+CATALOG_SURROGATE_MAX_AGE = int(os.environ.get("CATALOG_SURROGATE_MAX_AGE", 86400))
+SURROGATE_PURGE_URL = os.environ.get("SURROGATE_PURGE_URL", "")
+# Seconds within which the bookings of all shows bump the seat ledger version
+# once, the catalog responses are not answered with 304 meanwhile
+CATALOG_SEAT_VERSION_SECONDS = float(os.environ.get("CATALOG_SEAT_VERSION_SECONDS", 1))
+
+# Most movies answered by a search
+MOVIE_SEARCH_LIMIT = int(os.environ.get("MOVIE_SEARCH_LIMIT", 20))
+
+# Days from today whose booked shows are created with a show and by the daily
+# materialize_booked_shows command, the later dates are created when booked
+BOOKED_SHOW_WINDOW_DAYS = int(os.environ.get("BOOKED_SHOW_WINDOW_DAYS", 14))
+
+# Seats of an imported screen layout inserted together
+LAYOUT_IMPORT_BATCH_SIZE = int(os.environ.get("LAYOUT_IMPORT_BATCH_SIZE", 5000))
+
+# Stored responses of requests sent with an Idempotency-Key header
+IDEMPOTENCY_KEY_HOURS = int(os.environ.get("IDEMPOTENCY_KEY_HOURS", 24))
+
+# Seconds a request holds its idempotency key before a retry may take it over,
+# longer than any request runs so only the key of a crashed worker is taken
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", 60))
+
+
 SWAGGER_SETTINGS = {
     "USE_SESSION_AUTH": True,
     "SECURITY_DEFINITIONS": {
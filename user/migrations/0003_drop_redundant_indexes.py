@@ -0,0 +1,21 @@
+# Generated by Django 4.2.4 on 2026-10-18 06:35
+
+# Django imports
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user", "0002_alter_user_user_type"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="user",
+            options={"verbose_name": "user", "verbose_name_plural": "users"},
+        ),
+        migrations.AlterUniqueTogether(
+            name="user",
+            unique_together=set(),
+        ),
+    ]
@@ -50,11 +50,5 @@ class User(AbstractUser, TimeLogMixin):
     otp = models.CharField(max_length=6, null=True, blank=True)
     otp_expiration = models.DateTimeField(null=True, blank=True)
 
-    class Meta:
-        unique_together = (
-            "email",
-            "username",
-        )
-
     def __str__(self) -> str:
         return self.email